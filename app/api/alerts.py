@@ -1,26 +1,135 @@
 """Alert API endpoints."""
-from typing import Any
+import csv
+import io
+import json
+from typing import AsyncIterator, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
-from app.schemas.alert import AlertCreate, AlertResponse, TestAlertResponse
-from app.services.alert_service import create_alert, list_alerts
-from app.services.simulation_service import simulate_failure
+from app.api.deps import conditional_get, sparse_fields
+from app.core.database import get_read_session, get_session
+from app.core.responses import model_list_response, row_list_response
+from app.schemas.alert import AlertResponse, TestAlertResponse
+from app.services.alert_service import (
+    create_test_alert,
+    list_alert_rows,
+    list_alerts,
+    stream_alert_rows,
+)
+from app.services.dispatch_service import get_alert_dispatcher, summarize_outbox
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
 
 @router.get("", response_model=list[AlertResponse])
 async def list_alerts_endpoint(
-    session: AsyncSession = Depends(get_session),
-) -> list[AlertResponse]:
+    response: Response,
+    fields: Optional[tuple[str, ...]] = Depends(sparse_fields(AlertResponse)),
+    _: None = Depends(conditional_get("alert")),
+    session: AsyncSession = Depends(get_read_session),
+) -> ORJSONResponse:
     """
     List all alerts.
+    
+    - **fields**: Optional comma-separated list of fields to return, e.g.
+      `id,incident_id,created_at`
     """
+    if fields is not None:
+        rows = await list_alert_rows(session, fields)
+        return row_list_response(fields, rows, response.headers)
     alerts = await list_alerts(session)
-    return [AlertResponse.model_validate(a) for a in alerts]
+    return model_list_response(AlertResponse, alerts, response.headers)
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def _encode_ndjson(session: AsyncSession) -> AsyncIterator[str]:
+    """Encode streamed alert rows as newline-delimited JSON."""
+    async for rows in stream_alert_rows(session):
+        yield "".join(
+            json.dumps(
+                {
+                    "id": alert_id,
+                    "incident_id": incident_id,
+                    "created_at": created_at.isoformat(),
+                    "payload": payload,
+                }
+            )
+            + "\n"
+            for alert_id, incident_id, created_at, payload in rows
+        )
+
+
+async def _encode_csv(session: AsyncSession) -> AsyncIterator[str]:
+    """Encode streamed alert rows as CSV with the payload as a JSON column."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "incident_id", "created_at", "payload"])
+    yield buffer.getvalue()
+    async for rows in stream_alert_rows(session):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            (alert_id, incident_id, created_at.isoformat(), json.dumps(payload))
+            for alert_id, incident_id, created_at, payload in rows
+        )
+        yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_alerts_endpoint(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    session: AsyncSession = Depends(get_read_session),
+) -> StreamingResponse:
+    """
+    Stream every alert as NDJSON or CSV.
+    
+    - **format**: `ndjson` (default) or `csv`
+    
+    Rows are read with a server-side cursor and written out chunk by chunk,
+    so memory use does not grow with the size of the table.
+    """
+    encode = _encode_ndjson if format == "ndjson" else _encode_csv
+
+    async def body() -> AsyncIterator[str]:
+        # Dependency teardown runs before the body is sent; the session
+        # reconnects lazily for the stream and is released once it ends.
+        try:
+            async for chunk in encode(session):
+                yield chunk
+        finally:
+            await session.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="alerts.{format}"',
+        },
+    )
+
+
+@router.get("/outbox")
+async def outbox_endpoint(
+    session: AsyncSession = Depends(get_read_session),
+) -> dict:
+    """
+    Delivery progress of the alert outbox.
+    
+    Returns row counts per channel and status (`pending`, `delivered`,
+    `failed`) and, when delivery is enabled, the dispatcher's counters.
+    """
+    dispatcher = get_alert_dispatcher()
+    return {
+        "channels": await summarize_outbox(session),
+        "dispatcher": dispatcher.stats() if dispatcher is not None else None,
+    }
 
 
 @router.post("/test", response_model=TestAlertResponse)
@@ -32,52 +141,14 @@ async def test_alert_endpoint(
     
     This endpoint is for testing alert creation without simulating a failure.
     """
-    # Create a dummy incident and alert for testing
-    # First, we need to get or create a test monitor
-    from app.models.monitor import Monitor
-    from sqlmodel import select
-    
-    # Get first monitor or create a test one
-    statement = select(Monitor)
-    result = await session.execute(statement)
-    monitor = result.scalars().first()
-    
-    if not monitor:
+    created = await create_test_alert(session)
+    if not created:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No monitors available for test alert. Create a monitor first.",
         )
     
-    # Create test payload
-    test_payload: dict[str, Any] = {
-        "type": "test",
-        "message": "This is a test alert",
-        "monitor_id": monitor.id,
-        "monitor_name": monitor.name,
-    }
-    
-    # Create a test incident and alert
-    from app.models.incident import Incident
-    
-    incident = Incident(
-        monitor_id=monitor.id,
-        error_type="test",
-        status="open",
-    )
-    session.add(incident)
-    await session.commit()
-    await session.refresh(incident)
-    
-    from app.models.alert import Alert
-    
-    alert = Alert(
-        incident_id=incident.id,
-        payload=test_payload,
-    )
-    session.add(alert)
-    await session.commit()
-    await session.refresh(alert)
-    
+    alert, test_payload = created
     return TestAlertResponse(
         message="Test alert created successfully",
         alert_id=alert.id,
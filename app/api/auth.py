@@ -3,13 +3,16 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
+from app.core.security import token_cache
 from app.schemas.user import TokenResponse, UserCreate, UserLogin, UserResponse
 from app.services.auth_service import (
     authenticate_user,
     create_access_token_for_user,
     create_user,
     get_user_by_email,
+    user_cache,
 )
+from app.services.hashing_service import get_password_hasher
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -59,3 +62,22 @@ async def login(
     
     access_token = create_access_token_for_user(user)
     return TokenResponse(access_token=access_token)
+
+
+@router.get("/cache-stats")
+async def cache_stats() -> dict:
+    """
+    Hit/miss counters for the decoded-token and user caches.
+    """
+    return {
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+    }
+
+
+@router.get("/hasher-stats")
+async def hasher_stats() -> dict:
+    """
+    Worker count, queue depth and throughput of the password hasher.
+    """
+    return get_password_hasher().stats()
@@ -1,14 +1,16 @@
 """API dependencies."""
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, Response, status
 from jose import JWTError
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
-from app.core.security import decode_token
+from app.core.database import get_read_session, get_session
+from app.core.security import decode_token_cached
+from app.core.versions import etag_for, etag_matches, table_versions
 from app.models.user import User
-from app.services.auth_service import get_user_by_email
+from app.services.auth_service import get_user_by_email_cached
 
 
 async def get_current_user(
@@ -24,7 +26,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,7 +42,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = await get_user_by_email(session, email)
+    user = await get_user_by_email_cached(session, email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -73,7 +75,7 @@ async def get_current_user_with_header(
         )
     
     token = parts[1]
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -89,7 +91,7 @@ async def get_current_user_with_header(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = await get_user_by_email(session, email)
+    user = await get_user_by_email_cached(session, email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -98,3 +100,65 @@ async def get_current_user_with_header(
         )
     
     return user
+
+
+def conditional_get(*tables: str) -> Callable[..., Awaitable[None]]:
+    """
+    Dependency for GET endpoints whose response depends only on ``tables``.
+    
+    Sets a strong ETag from the tables' change versions and answers a
+    matching ``If-None-Match`` with 304 before the endpoint runs, so only
+    the version lookup is queried and nothing is serialized. Declare it
+    ahead of the session dependency so the version is read before any data;
+    the tag can then only be older than the data, never newer.
+    """
+    async def check(
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_read_session),
+    ) -> None:
+        etag = etag_for(await table_versions(session, tables))
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag},
+            )
+        response.headers["ETag"] = etag
+    
+    return check
+
+
+def sparse_fields(
+    schema: type[BaseModel],
+) -> Callable[[Optional[str]], Optional[tuple[str, ...]]]:
+    """
+    Dependency parsing a ``?fields=a,b`` selection of ``schema``'s fields.
+    
+    Returns the requested names in order without duplicates, or None when
+    the parameter is absent so the endpoint serves full objects. Unknown
+    names are rejected with 400.
+    """
+    allowed = tuple(schema.model_fields)
+    description = "Comma-separated subset of: " + ", ".join(allowed)
+    
+    def parse(
+        fields: Optional[str] = Query(default=None, description=description),
+    ) -> Optional[tuple[str, ...]]:
+        if fields is None:
+            return None
+        names = tuple(dict.fromkeys(n.strip() for n in fields.split(",") if n.strip()))
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}",
+            )
+        if not names:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No fields selected",
+            )
+        return names
+    
+    return parse
@@ -1,11 +1,36 @@
 """Incident API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    WebSocket,
+    status,
+)
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
+from app.api.deps import conditional_get, sparse_fields
+from app.core.config import settings
+from app.core.database import get_read_session, get_session
+from app.core.responses import model_list_response, row_list_response
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+)
 from app.schemas.incident import IncidentResponse, IncidentResolve
+from app.services.feed_service import Subscription, get_broadcaster
 from app.services.incident_service import (
     get_incident,
+    list_incident_rows,
     list_incidents,
     resolve_incident,
 )
@@ -15,19 +40,142 @@ router = APIRouter(prefix="/incidents", tags=["incidents"])
 
 @router.get("", response_model=list[IncidentResponse])
 async def list_incidents_endpoint(
-    session: AsyncSession = Depends(get_session),
-) -> list[IncidentResponse]:
+    response: Response,
+    monitor_id: Optional[int] = None,
+    incident_status: Optional[str] = Query(default=None, alias="status"),
+    error_type: Optional[str] = None,
+    started_after: Optional[datetime] = None,
+    started_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[tuple[str, ...]] = Depends(sparse_fields(IncidentResponse)),
+    _: None = Depends(conditional_get("incident")),
+    session: AsyncSession = Depends(get_read_session),
+) -> ORJSONResponse:
+    """
+    List incidents, newest first, one page at a time.
+    
+    - **monitor_id**, **status**, **error_type**: Optional exact-match filters
+    - **started_after** / **started_before**: Optional time range on `started_at`
+    - **cursor**: Value of the `X-Next-Cursor` header from the previous page
+    - **limit**: Page size
+    - **fields**: Optional comma-separated list of fields to return, e.g.
+      `id,status,monitor_id`
+    
+    The `X-Next-Cursor` response header is set when more rows are available.
+    """
+    after = None
+    if cursor:
+        after = decode_cursor(cursor)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+    
+    # Fetch one extra row to learn whether another page exists
+    filters = dict(
+        monitor_id=monitor_id,
+        status=incident_status,
+        error_type=error_type,
+        started_after=started_after,
+        started_before=started_before,
+        after=after,
+        limit=limit + 1,
+    )
+    if fields is None:
+        incidents = await list_incidents(session, **filters)
+    else:
+        incidents = await list_incident_rows(session, fields, **filters)
+    if len(incidents) > limit:
+        incidents = incidents[:limit]
+        last = incidents[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.started_at, last.id)
+    if fields is None:
+        return model_list_response(IncidentResponse, incidents, response.headers)
+    return row_list_response(fields, incidents, response.headers)
+
+
+async def _encode_sse(subscription: Subscription) -> AsyncIterator[bytes]:
+    """Encode feed events as Server-Sent Events, with keepalive comments."""
+    try:
+        # Sent at once so clients and proxies see the stream open
+        yield b": connected\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(), settings.FEED_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                break
+            yield event.sse()
+    finally:
+        subscription.close()
+
+
+@router.get("/stream")
+async def incident_stream_endpoint(
+    last_event_id: Optional[str] = Query(default=None),
+    last_event_id_header: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+) -> StreamingResponse:
     """
-    List all incidents.
+    Stream incident and alert events as Server-Sent Events.
+    
+    - **last_event_id**: Resume after this event id; browsers send the
+      `Last-Event-ID` header on reconnect instead
+    
+    Events are `incident.created`, `incident.updated`, `incident.resolved`
+    and `alert.created`; `scenario.applied` summarises a bulk failure
+    scenario instead. A `reset` event means events were missed (the
+    client fell behind, or its last event id is too old); refetch
+    `GET /incidents` and carry on from the reset's id.
     """
-    incidents = await list_incidents(session)
-    return [IncidentResponse.model_validate(i) for i in incidents]
+    subscription = get_broadcaster().subscribe(last_event_id_header or last_event_id)
+    return StreamingResponse(
+        _encode_sse(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def incident_websocket_endpoint(
+    websocket: WebSocket, last_event_id: Optional[str] = None
+) -> None:
+    """
+    Stream incident and alert events over a WebSocket, one JSON message per
+    event. Same events and resume semantics as `GET /incidents/stream`.
+    """
+    await websocket.accept()
+    subscription = get_broadcaster().subscribe(last_event_id)
+    
+    async def forward() -> None:
+        async for event in subscription:
+            await websocket.send_text(event.json().decode())
+        # The feed shut down
+        await websocket.close()
+    
+    sender = asyncio.create_task(forward())
+    try:
+        # Clients send nothing; reading only notices when they go away
+        while not sender.done():
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        subscription.close()
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
 
 
 @router.get("/{incident_id}", response_model=IncidentResponse)
 async def get_incident_endpoint(
     incident_id: int,
-    session: AsyncSession = Depends(get_session),
+    _: None = Depends(conditional_get("incident")),
+    session: AsyncSession = Depends(get_read_session),
 ) -> IncidentResponse:
     """
     Get a specific incident by ID.
@@ -1,10 +1,22 @@
 """Monitor API endpoints."""
-from pydantic import BaseModel
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_session
-from app.schemas.monitor import MonitorCreate, MonitorResponse, MonitorUpdate
+from app.api.deps import conditional_get
+from app.core.database import get_read_session, get_session
+from app.core.responses import model_list_response
+from app.schemas.monitor import (
+    MonitorCreate,
+    MonitorResponse,
+    MonitorUpdate,
+    MonitorUptimeResponse,
+)
+from app.schemas.scenario import ScenarioDefinition, ScenarioResult
 from app.services.monitor_service import (
     create_monitor,
     delete_monitor,
@@ -12,7 +24,13 @@ from app.services.monitor_service import (
     list_monitors,
     update_monitor,
 )
-from app.services.simulation_service import simulate_failure
+from app.services.scenario_service import apply_scenario
+from app.services.simulation_service import simulate_failure, simulate_failures_bulk
+from app.services.uptime_service import (
+    DEFAULT_SLO_TARGET,
+    get_uptime_report,
+    get_uptime_reports,
+)
 
 router = APIRouter(prefix="/monitors", tags=["monitors"])
 
@@ -37,19 +55,62 @@ async def create_monitor_endpoint(
 
 @router.get("", response_model=list[MonitorResponse])
 async def list_monitors_endpoint(
-    session: AsyncSession = Depends(get_session),
-) -> list[MonitorResponse]:
+    response: Response,
+    _: None = Depends(conditional_get("monitor")),
+    session: AsyncSession = Depends(get_read_session),
+) -> ORJSONResponse:
     """
     List all monitors.
     """
     monitors = await list_monitors(session)
-    return [MonitorResponse.model_validate(m) for m in monitors]
+    return model_list_response(MonitorResponse, monitors, response.headers)
+
+
+# Upper bound on monitors per batch uptime request
+MAX_UPTIME_BATCH = 1000
+
+
+def _check_window(start: Optional[datetime], end: Optional[datetime]) -> None:
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+
+
+@router.get("/uptime", response_model=list[MonitorUptimeResponse])
+async def batch_uptime_endpoint(
+    monitor_ids: list[int] = Query(
+        alias="monitor_id", min_length=1, max_length=MAX_UPTIME_BATCH
+    ),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    slo: float = Query(default=DEFAULT_SLO_TARGET, gt=0, lt=100),
+    session: AsyncSession = Depends(get_read_session),
+) -> list[MonitorUptimeResponse]:
+    """
+    Uptime reports for several monitors over the same window.
+    
+    - **monitor_id**: Repeat once per monitor; unknown monitors are omitted
+    - **start** / **end**: Window (default: the 30 days up to now)
+    - **slo**: Availability target in percent, for the error budget
+    """
+    _check_window(start, end)
+    reports = await get_uptime_reports(
+        session, monitor_ids, start=start, end=end, slo_target=slo
+    )
+    return [
+        MonitorUptimeResponse.model_validate(reports[monitor_id])
+        for monitor_id in dict.fromkeys(monitor_ids)
+        if monitor_id in reports
+    ]
 
 
 @router.get("/{monitor_id}", response_model=MonitorResponse)
 async def get_monitor_endpoint(
     monitor_id: int,
-    session: AsyncSession = Depends(get_session),
+    _: None = Depends(conditional_get("monitor")),
+    session: AsyncSession = Depends(get_read_session),
 ) -> MonitorResponse:
     """
     Get a specific monitor by ID.
@@ -65,6 +126,33 @@ async def get_monitor_endpoint(
     return MonitorResponse.model_validate(monitor)
 
 
+@router.get("/{monitor_id}/uptime", response_model=MonitorUptimeResponse)
+async def uptime_endpoint(
+    monitor_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    slo: float = Query(default=DEFAULT_SLO_TARGET, gt=0, lt=100),
+    session: AsyncSession = Depends(get_read_session),
+) -> MonitorUptimeResponse:
+    """
+    Uptime, error-budget burn and MTTR for a monitor over a window.
+    
+    - **monitor_id**: Monitor ID
+    - **start** / **end**: Window (default: the 30 days up to now)
+    - **slo**: Availability target in percent, for the error budget
+    """
+    _check_window(start, end)
+    report = await get_uptime_report(
+        session, monitor_id, start=start, end=end, slo_target=slo
+    )
+    if not report:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Monitor not found",
+        )
+    return MonitorUptimeResponse.model_validate(report)
+
+
 @router.delete("/{monitor_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_monitor_endpoint(
     monitor_id: int,
@@ -90,6 +178,79 @@ class SimulateFailurePayload(BaseModel):
     latency_ms: int | None = None
 
 
+class SimulateFailureBatchItem(SimulateFailurePayload):
+    """A single entry of a batch failure simulation."""
+
+    monitor_id: int
+
+
+# Upper bound on entries per batch request
+MAX_SIMULATE_FAILURE_BATCH = 10_000
+
+
+class SimulateFailureBatchPayload(BaseModel):
+    """Payload for simulating many failures at once."""
+
+    failures: list[SimulateFailureBatchItem] = Field(
+        min_length=1, max_length=MAX_SIMULATE_FAILURE_BATCH
+    )
+
+
+@router.post("/simulate-failures", status_code=status.HTTP_201_CREATED)
+async def simulate_failures_batch_endpoint(
+    payload: SimulateFailureBatchPayload,
+    session: AsyncSession = Depends(get_session),
+) -> dict:
+    """
+    Simulate failures for many monitors in one request.
+    
+    All incidents and alerts are written in a single transaction.
+    Entries referring to unknown monitors are reported per item.
+    
+    - **failures**: List of `{monitor_id, failure_type, latency_ms}` entries
+    """
+    results = await simulate_failures_bulk(
+        session,
+        [
+            (item.monitor_id, item.failure_type, item.latency_ms)
+            for item in payload.failures
+        ],
+    )
+    succeeded = sum(1 for r in results if r["success"])
+    
+    return {
+        "requested": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
+
+
+@router.post(
+    "/simulate-scenario",
+    response_model=ScenarioResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def simulate_scenario_endpoint(
+    definition: ScenarioDefinition,
+    session: AsyncSession = Depends(get_session),
+) -> ScenarioResult:
+    """
+    Apply a failure scenario across many monitors at once.
+    
+    - **name**: Scenario name, echoed in the result and the live feed
+    - **seed**: Seed for monitor selection and per-monitor jitter
+    - **start**: Optional scenario start (default: so it ends now)
+    - **phases**: `outage`, `degradation` or `cascade` phases
+    
+    The same definition and seed always produce the same timeline. Every
+    affected monitor gets one incident and one alert per phase, written in
+    short transactions; with incident dedup enabled, failures still
+    running are added to the open incident of their monitor and type.
+    """
+    return await apply_scenario(session, definition)
+
+
 @router.post("/{monitor_id}/simulate-failure", status_code=status.HTTP_201_CREATED)
 async def simulate_failure_endpoint(
     monitor_id: int,
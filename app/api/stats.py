@@ -0,0 +1,67 @@
+"""Statistics API endpoints."""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import conditional_get
+from app.core.database import get_read_session
+from app.core.responses import model_list_response
+from app.schemas.stats import IncidentBucketResponse, IncidentSummaryResponse
+from app.services.stats_service import list_incident_buckets, summarize_incidents
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/incidents", response_model=list[IncidentBucketResponse])
+async def incident_buckets_endpoint(
+    response: Response,
+    monitor_id: Optional[int] = None,
+    error_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    _: None = Depends(conditional_get("incident_rollup")),
+    session: AsyncSession = Depends(get_read_session),
+) -> ORJSONResponse:
+    """
+    Incident counts per monitor, error type and hour, oldest first.
+    
+    - **monitor_id**, **error_type**: Optional exact-match filters
+    - **start** / **end**: Optional time range; `start` is rounded down to the hour
+    """
+    buckets = await list_incident_buckets(
+        session,
+        monitor_id=monitor_id,
+        error_type=error_type,
+        start=start,
+        end=end,
+    )
+    return model_list_response(IncidentBucketResponse, buckets, response.headers)
+
+
+@router.get("/incidents/summary", response_model=list[IncidentSummaryResponse])
+async def incident_summary_endpoint(
+    monitor_id: Optional[int] = None,
+    error_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    _: None = Depends(conditional_get("incident_rollup")),
+    session: AsyncSession = Depends(get_read_session),
+) -> list[IncidentSummaryResponse]:
+    """
+    Opened, resolved and still-open totals per monitor and error type,
+    with mean time to resolve.
+    
+    - **monitor_id**, **error_type**: Optional exact-match filters
+    - **start** / **end**: Optional time range on incident start
+    """
+    summary = await summarize_incidents(
+        session,
+        monitor_id=monitor_id,
+        error_type=error_type,
+        start=start,
+        end=end,
+    )
+    return [IncidentSummaryResponse(**row) for row in summary]
@@ -0,0 +1,162 @@
+"""Benchmark JSON serialization of large list responses.
+
+Seeds a throwaway SQLite file with alerts and times ``GET /alerts`` through
+the ASGI stack three ways: the previous endpoint, which validated every row
+into ``AlertResponse`` and had FastAPI validate and encode the list again
+for ``response_model``; the current endpoint, which validates once and
+encodes with orjson; and the current endpoint with a ``?fields=`` selection
+that skips the ORM and the JSON payload column. Responses are fetched
+in-process, one at a time, so the timings show what serializing a large
+page costs on top of its query.
+
+Usage:
+    python -m app.benchmarks.json_response --rows 10000 100000 --requests 10
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.benchmarks._stats import percentile
+from app.core.database import create_engines, get_read_session
+from app.main import app
+from app.models.alert import Alert
+from app.models.incident import Incident
+from app.models.monitor import Monitor
+from app.schemas.alert import AlertResponse
+from app.services.alert_service import list_alerts
+
+INSERT_BATCH = 10_000
+
+
+def double_validating_app() -> FastAPI:
+    """An app serving ``GET /alerts`` the way it was served before."""
+    baseline = FastAPI()
+
+    @baseline.get("/alerts", response_model=list[AlertResponse])
+    async def list_alerts_endpoint(
+        session: AsyncSession = Depends(get_read_session),
+    ) -> list[AlertResponse]:
+        alerts = await list_alerts(session)
+        return [AlertResponse.model_validate(a) for a in alerts]
+
+    return baseline
+
+
+async def seed(write_session, rows: int) -> None:
+    """Insert ``rows`` alerts with payloads shaped like simulated failures."""
+    started_at = datetime.utcnow() - timedelta(days=1)
+    async with write_session() as session:
+        session.add(Monitor(name="monitor", url="https://example.com"))
+        session.add(Incident(monitor_id=1, error_type="500", started_at=started_at))
+        await session.commit()
+        for offset in range(0, rows, INSERT_BATCH):
+            await session.execute(
+                Alert.__table__.insert(),
+                [
+                    {
+                        "incident_id": 1,
+                        "payload": {
+                            "incident_id": 1,
+                            "monitor_id": 1,
+                            "monitor_name": "monitor",
+                            "monitor_url": "https://example.com",
+                            "failure_type": "500",
+                            "latency_ms": None,
+                            "message": (
+                                f"Monitor 'monitor' encountered a 500 failure ({i})"
+                            ),
+                        },
+                        "created_at": started_at + timedelta(seconds=i),
+                    }
+                    for i in range(offset, min(offset + INSERT_BATCH, rows))
+                ],
+            )
+        await session.commit()
+
+
+async def measure(
+    target: FastAPI, path: str, read_session, requests: int
+) -> tuple[list[float], int]:
+    """Time ``requests`` sequential GETs of ``path``; returns latencies and size."""
+    async def override():
+        async with read_session() as session:
+            yield session
+
+    target.dependency_overrides[get_read_session] = override
+    latencies: list[float] = []
+    size = 0
+    try:
+        async with AsyncClient(app=target, base_url="http://bench") as client:
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+                size = len(response.content)
+    finally:
+        target.dependency_overrides.pop(get_read_session, None)
+    return latencies, size
+
+
+async def run(rows: int, requests: int) -> None:
+    """Seed ``rows`` alerts and benchmark both endpoints against them."""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        writer, reader = create_engines(url)
+        write_session = sessionmaker(
+            writer, class_=AsyncSession, expire_on_commit=False
+        )
+        read_session = sessionmaker(reader, class_=AsyncSession, expire_on_commit=False)
+
+        async with writer.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        await seed(write_session, rows)
+
+        results = []
+        variants = (
+            ("before", double_validating_app(), "/alerts"),
+            ("orjson", app, "/alerts"),
+            ("fields", app, "/alerts?fields=id,incident_id,created_at"),
+        )
+        for label, target, path in variants:
+            # One warm-up request so schema and adapter construction is excluded
+            await measure(target, path, read_session, 1)
+            latencies, size = await measure(target, path, read_session, requests)
+            results.append((label, latencies, size))
+
+        await writer.dispose()
+        await reader.dispose()
+
+    baseline = statistics.median(results[0][1])
+    for label, samples, size in results:
+        median = statistics.median(samples)
+        print(
+            f"rows={rows:<7} {label:<7} "
+            f"p50={median:8.1f}ms p99={percentile(samples, 99):8.1f}ms "
+            f"req/s={1000 / median:6.2f} speedup={baseline / median:4.2f}x "
+            f"bytes={size}"
+        )
+
+
+async def main(rows: list[int], requests: int) -> None:
+    """Benchmark every requested table size."""
+    for count in rows:
+        await run(count, requests)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.requests))
@@ -0,0 +1,485 @@
+"""Load-test every API router at several data scales.
+
+For each scale, a child process seeds a throwaway SQLite file with that many
+incidents and alerts (and one monitor per hundred incidents) using
+``app.commands.generate_data``, starts the application against it with its
+normal lifespan (monitor registry, open incident index, write queue), and
+drives each endpoint scenario at every concurrency level.
+
+By default the clients call the app in-process through the httpx ASGI
+transport, which measures routing, validation, services and SQLite under
+concurrency but leaves out socket I/O; ``--transport uvicorn`` serves the
+same app from a uvicorn subprocess and measures over a real socket instead.
+
+Each (scale, scenario, concurrency) reports p50/p95/p99 latency,
+throughput, errors and the serving process's RSS. ``--output`` writes the
+results as JSON; ``--compare`` checks a run against an earlier file and
+exits non-zero when p99 latency or throughput regressed past
+``--threshold``.
+
+Full-table reads and bcrypt-bound auth scenarios run ``--heavy-requests``
+requests instead of ``--requests``. The SSE and WebSocket feeds are
+long-lived streams and are not load-tested here.
+
+Usage:
+    python -m app.benchmarks.load_test --scales 1000 100000 --concurrency 1 16 64 \\
+        --requests 200 --output results.json [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import httpx
+
+from app.benchmarks._stats import percentile
+
+# The rest of the application is imported inside each scale's child
+# process, after DATABASE_URL points at that scale's database; see run_scale
+
+FAILURE_TYPES = ("timeout", "500", "502", "503", "latency", "dns")
+PASSWORD = "bench-password"
+
+
+def rss_mb(pid: Optional[int] = None) -> tuple[float, float]:
+    """Current and peak resident set size of a process (this one by default)."""
+    try:
+        status = Path(f"/proc/{pid or 'self'}/status").read_text()
+    except OSError:
+        # No procfs: only this process's peak is known (KiB on Linux)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return peak, peak
+    fields = dict(line.split(":", 1) for line in status.splitlines() if ":" in line)
+    current = int(fields["VmRSS"].split()[0]) / 1024
+    return current, int(fields["VmHWM"].split()[0]) / 1024
+
+
+@dataclass
+class Context:
+    """Seeded row counts plus counters for scenarios that consume ids."""
+
+    monitors: int
+    incidents: int
+    registered: itertools.count = field(default_factory=itertools.count)
+    # Monitors created by monitors.create, handed to monitors.delete in order
+    created: list[int] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One endpoint and how to build its requests."""
+
+    name: str
+    method: str
+    path: Callable[[random.Random, Context], str]
+    body: Optional[Callable[[random.Random, Context], Any]] = None
+    expect: int = 200
+    # Full-table reads and bcrypt-bound requests run fewer iterations
+    heavy: bool = False
+    # Called with each successful response
+    record: Optional[Callable[[httpx.Response, Context], None]] = None
+
+
+def _monitor(rng: random.Random, ctx: Context) -> int:
+    return rng.randint(1, ctx.monitors)
+
+
+def _incident(rng: random.Random, ctx: Context) -> int:
+    return rng.randint(1, ctx.incidents)
+
+
+def _created_monitor(rng: random.Random, ctx: Context) -> str:
+    return f"/monitors/{ctx.created.pop(0)}"
+
+
+SCENARIOS = (
+    Scenario("root", "GET", lambda r, c: "/"),
+    Scenario("health", "GET", lambda r, c: "/health"),
+    # auth
+    Scenario(
+        "auth.register", "POST", lambda r, c: "/auth/register",
+        lambda r, c: {
+            "email": f"load{next(c.registered)}@example.com", "password": PASSWORD
+        },
+        expect=201, heavy=True,
+    ),
+    Scenario(
+        "auth.login", "POST", lambda r, c: "/auth/login",
+        lambda r, c: {"email": "bench@example.com", "password": PASSWORD},
+        heavy=True,
+    ),
+    Scenario("auth.cache_stats", "GET", lambda r, c: "/auth/cache-stats"),
+    Scenario("auth.hasher_stats", "GET", lambda r, c: "/auth/hasher-stats"),
+    # monitors
+    Scenario("monitors.list", "GET", lambda r, c: "/monitors"),
+    Scenario("monitors.get", "GET", lambda r, c: f"/monitors/{_monitor(r, c)}"),
+    Scenario(
+        "monitors.uptime", "GET", lambda r, c: f"/monitors/{_monitor(r, c)}/uptime"
+    ),
+    Scenario(
+        "monitors.batch_uptime", "GET",
+        lambda r, c: "/monitors/uptime?" + "&".join(
+            f"monitor_id={_monitor(r, c)}" for _ in range(10)
+        ),
+    ),
+    Scenario(
+        "monitors.create", "POST", lambda r, c: "/monitors",
+        lambda r, c: {"name": "load", "url": "https://load.example.com"},
+        expect=201, record=lambda response, c: c.created.append(response.json()["id"]),
+    ),
+    Scenario(
+        "monitors.simulate_failure", "POST",
+        lambda r, c: f"/monitors/{_monitor(r, c)}/simulate-failure",
+        lambda r, c: {"failure_type": r.choice(FAILURE_TYPES)},
+        expect=201,
+    ),
+    Scenario(
+        "monitors.simulate_failures", "POST",
+        lambda r, c: "/monitors/simulate-failures",
+        lambda r, c: {"failures": [
+            {"monitor_id": _monitor(r, c), "failure_type": r.choice(FAILURE_TYPES)}
+            for _ in range(100)
+        ]},
+        expect=201,
+    ),
+    Scenario("monitors.delete", "DELETE", _created_monitor, expect=204),
+    # incidents
+    Scenario("incidents.list", "GET", lambda r, c: "/incidents?limit=100"),
+    Scenario(
+        "incidents.list_filtered", "GET",
+        lambda r, c: (
+            f"/incidents?monitor_id={_monitor(r, c)}&status=resolved&limit=100"
+        ),
+    ),
+    Scenario(
+        "incidents.list_fields", "GET",
+        lambda r, c: "/incidents?fields=id,status,monitor_id,started_at&limit=100",
+    ),
+    Scenario("incidents.get", "GET", lambda r, c: f"/incidents/{_incident(r, c)}"),
+    Scenario(
+        "incidents.resolve", "POST",
+        lambda r, c: f"/incidents/{_incident(r, c)}/resolve", lambda r, c: {},
+    ),
+    # alerts
+    Scenario("alerts.list", "GET", lambda r, c: "/alerts", heavy=True),
+    Scenario(
+        "alerts.list_fields", "GET",
+        lambda r, c: "/alerts?fields=id,incident_id,created_at", heavy=True,
+    ),
+    Scenario("alerts.export", "GET", lambda r, c: "/alerts/export", heavy=True),
+    Scenario("alerts.outbox", "GET", lambda r, c: "/alerts/outbox"),
+    Scenario("alerts.test", "POST", lambda r, c: "/alerts/test"),
+    # stats
+    Scenario(
+        "stats.incidents", "GET",
+        lambda r, c: f"/stats/incidents?monitor_id={_monitor(r, c)}",
+    ),
+    Scenario("stats.summary", "GET", lambda r, c: "/stats/incidents/summary"),
+)
+
+
+async def seed(database_url: str, scale: int) -> Context:
+    """
+    Seed ``scale`` incidents and alerts and one monitor per hundred
+    incidents with the synthetic data generator, plus a login user.
+    """
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+    from sqlmodel import SQLModel
+
+    from app.commands.generate_data import GenerateOptions, generate_data
+    from app.core.database import create_engines
+    from app.core.security import hash_password
+    from app.models.user import User
+
+    writer, reader = create_engines(database_url)
+    factory = sessionmaker(writer, class_=AsyncSession, expire_on_commit=False)
+    async with writer.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with factory() as session:
+        session.add(User(
+            email="bench@example.com", hashed_password=hash_password(PASSWORD)
+        ))
+        await session.commit()
+        result = await generate_data(
+            session,
+            GenerateOptions(
+                monitors=max(10, scale // 100),
+                incidents=scale,
+                alerts=scale,
+                seed=scale,
+            ),
+        )
+
+    await writer.dispose()
+    await reader.dispose()
+    return Context(monitors=result.monitors, incidents=result.incidents)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    ctx: Context,
+    concurrency: int,
+    requests: int,
+) -> dict[str, Any]:
+    """Send ``requests`` requests from ``concurrency`` concurrent workers."""
+    rng = random.Random(f"{scenario.name}-{concurrency}")
+    remaining = iter(range(requests))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            path = scenario.path(rng, ctx)
+            body = scenario.body(rng, ctx) if scenario.body else None
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, path, json=body)
+                ok = response.status_code == scenario.expect
+            except httpx.HTTPError:
+                ok = False
+            else:
+                if ok and scenario.record:
+                    scenario.record(response, ctx)
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "throughput_rps": round(requests / elapsed, 2),
+    }
+
+
+async def run_scenarios(
+    client: httpx.AsyncClient,
+    ctx: Context,
+    args: argparse.Namespace,
+    pid: Optional[int],
+    scale: int,
+) -> list[dict[str, Any]]:
+    """Run every selected scenario at every concurrency level."""
+    selected = [
+        s for s in SCENARIOS
+        if not args.scenarios or any(s.name.startswith(p) for p in args.scenarios)
+    ]
+    results = []
+    for concurrency in args.concurrency:
+        for scenario in selected:
+            requests = args.heavy_requests if scenario.heavy else args.requests
+            if scenario.name == "monitors.delete":
+                # Deletes the monitors monitors.create made, so seeded data stays
+                requests = min(requests, len(ctx.created))
+                if not requests:
+                    continue
+            result = await run_scenario(client, scenario, ctx, concurrency, requests)
+            current, peak = rss_mb(pid)
+            result = {
+                "transport": args.transport,
+                "scale": scale,
+                "scenario": scenario.name,
+                "concurrency": concurrency,
+                **result,
+                "rss_mb": round(current, 1),
+                "peak_rss_mb": round(peak, 1),
+            }
+            print(
+                f"scale={scale:<8} c={concurrency:<4} {scenario.name:<27} "
+                f"p50={result['p50_ms']:9.2f}ms p95={result['p95_ms']:9.2f}ms "
+                f"p99={result['p99_ms']:9.2f}ms rps={result['throughput_rps']:9.1f} "
+                f"errors={result['errors']:<4} rss={result['rss_mb']:.0f}MB",
+                flush=True,
+            )
+            results.append(result)
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(
+    ctx: Context, args: argparse.Namespace, scale: int
+) -> list[dict[str, Any]]:
+    """Serve the app from a uvicorn subprocess and drive it over TCP."""
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        env=os.environ.copy(),
+    )
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=300
+        ) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    (await client.get("/health")).raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    if time.monotonic() > deadline or server.poll() is not None:
+                        raise RuntimeError("uvicorn did not start")
+                    await asyncio.sleep(0.1)
+            return await run_scenarios(client, ctx, args, server.pid, scale)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def run_asgi(
+    ctx: Context, args: argparse.Namespace, scale: int
+) -> list[dict[str, Any]]:
+    """Drive the app in-process through the httpx ASGI transport."""
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=300
+        ) as client:
+            return await run_scenarios(client, ctx, args, None, scale)
+
+
+def run_scale(scale: int, args: argparse.Namespace, conn) -> None:
+    """Child process: seed a database for ``scale`` and benchmark against it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite+aiosqlite:///{Path(tmp) / 'load.db'}"
+        os.environ["DATABASE_URL"] = database_url
+        # Alert delivery and probing would compete with the measured requests
+        os.environ["SCHEDULER_ENABLED"] = "false"
+        os.environ["ALERT_CHANNELS"] = "{}"
+
+        async def main() -> list[dict[str, Any]]:
+            started = time.perf_counter()
+            ctx = await seed(database_url, scale)
+            print(
+                f"scale={scale}: seeded {ctx.monitors} monitors, {scale} incidents "
+                f"and alerts in {time.perf_counter() - started:.1f}s",
+                flush=True,
+            )
+            if args.transport == "uvicorn":
+                return await run_uvicorn(ctx, args, scale)
+            return await run_asgi(ctx, args, scale)
+
+        conn.send(asyncio.run(main()))
+        conn.close()
+
+
+def compare(
+    results: list[dict[str, Any]], baseline_path: str, threshold: float
+) -> list[str]:
+    """Describe results whose p99 or throughput regressed past ``threshold``."""
+    baseline = {
+        (r["transport"], r["scale"], r["scenario"], r["concurrency"]): r
+        for r in json.loads(Path(baseline_path).read_text())["results"]
+    }
+    regressions = []
+    for result in results:
+        key = (
+            result["transport"], result["scale"], result["scenario"],
+            result["concurrency"],
+        )
+        before = baseline.get(key)
+        if before is None:
+            continue
+        p99 = result["p99_ms"] / before["p99_ms"] - 1 if before["p99_ms"] else 0.0
+        rps = (
+            1 - result["throughput_rps"] / before["throughput_rps"]
+            if before["throughput_rps"] else 0.0
+        )
+        if p99 > threshold or rps > threshold:
+            regressions.append(
+                f"scale={key[1]} c={key[3]} {key[2]}: "
+                f"p99 {before['p99_ms']:.2f} -> {result['p99_ms']:.2f}ms ({p99:+.0%}), "
+                f"rps {before['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} "
+                f"({-rps:+.0%})"
+            )
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    """Benchmark every scale in its own process and report the results."""
+    context = multiprocessing.get_context("spawn")
+    results: list[dict[str, Any]] = []
+    for scale in args.scales:
+        receiver, sender = context.Pipe(duplex=False)
+        child = context.Process(target=run_scale, args=(scale, args, sender))
+        child.start()
+        sender.close()
+        results.extend(receiver.recv())
+        child.join()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "meta": {
+                "created_at": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "transport": args.transport,
+                "requests": args.requests,
+                "heavy_requests": args.heavy_requests,
+            },
+            "results": results,
+        }, indent=2))
+        print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=[1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--heavy-requests", type=int, default=5)
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument(
+        "--scenarios", nargs="*",
+        help=(
+            "Only run scenarios whose names start with these prefixes, "
+            "e.g. incidents auth.login"
+        ),
+    )
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    sys.exit(main(parser.parse_args()))
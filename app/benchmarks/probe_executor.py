@@ -0,0 +1,140 @@
+"""Benchmark the pooled probe executor against local mock servers.
+
+The mock hosts run in a child process so their CPU time does not skew the
+client measurements. The same batch of checks runs twice, once through
+``ProbeExecutor`` (shared keep-alive pool, cached DNS) and once with a
+fresh client per check, and the benchmark reports throughput, latency
+percentiles and the connection reuse rate.
+
+Usage:
+    python -m app.benchmarks.probe_executor --monitors 1000 --hosts 20 --rounds 3
+"""
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import time
+
+import httpx
+
+from app.benchmarks._stats import percentile
+from app.services.probe_service import ProbeExecutor
+from app.services.scheduler_service import ProbeTarget
+
+
+async def start_mock_server() -> tuple[asyncio.AbstractServer, int, dict]:
+    """Start a keep-alive HTTP server that always answers 200."""
+    stats = {"connections": 0}
+
+    async def handle(reader, writer):
+        stats["connections"] += 1
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, backlog=4096)
+    return server, server.sockets[0].getsockname()[1], stats
+
+
+def serve_mock_hosts(hosts: int, conn) -> None:
+    """Child process: run ``hosts`` mock servers until told to stop."""
+
+    async def serve() -> None:
+        servers = [await start_mock_server() for _ in range(hosts)]
+        conn.send([port for _, port, _ in servers])
+        await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+        conn.send(sum(stats["connections"] for _, _, stats in servers))
+
+    asyncio.run(serve())
+
+
+def report(
+    label: str, elapsed: float, latencies: list[float], connections: int
+) -> None:
+    """Print one result line."""
+    print(
+        f"{label:<10} checks={len(latencies):>6} "
+        f"rate={len(latencies) / elapsed:>8.0f}/s "
+        f"p50={statistics.median(latencies):6.2f}ms "
+        f"p99={percentile(latencies, 99):6.2f}ms "
+        f"connections={connections}"
+    )
+
+
+async def run_pooled(
+    targets: list[ProbeTarget], rounds: int, per_host: int
+) -> list[float]:
+    """Check every target ``rounds`` times through the shared executor."""
+    executor = ProbeExecutor(max_connections_per_host=per_host)
+    latencies: list[float] = []
+    for _ in range(rounds):
+        results = await asyncio.gather(*(executor.check(t) for t in targets))
+        latencies.extend(r.total_ms for r in results)
+    await executor.aclose()
+    print(
+        f"{'':<10} reuse_rate={executor.reuse_rate:.1%} "
+        f"dns_hits={executor.dns.hits} dns_misses={executor.dns.misses}"
+    )
+    return latencies
+
+
+async def run_unpooled(
+    targets: list[ProbeTarget], rounds: int, per_host: int
+) -> list[float]:
+    """Check every target ``rounds`` times opening a new connection each time."""
+    limits: dict[str, asyncio.Semaphore] = {}
+    ssl_context = httpx.create_ssl_context()
+    latencies: list[float] = []
+
+    async def check(target: ProbeTarget) -> None:
+        netloc = httpx.URL(target.url).netloc.decode()
+        limit = limits.setdefault(netloc, asyncio.Semaphore(per_host))
+        async with limit:
+            began = time.perf_counter()
+            async with httpx.AsyncClient(verify=ssl_context) as client:
+                await client.get(target.url)
+            latencies.append((time.perf_counter() - began) * 1000)
+
+    for _ in range(rounds):
+        await asyncio.gather(*(check(t) for t in targets))
+    return latencies
+
+
+async def main(monitors: int, hosts: int, rounds: int, per_host: int) -> None:
+    """Run both variants, each against its own fresh set of mock hosts."""
+    for label, runner in (("pooled", run_pooled), ("unpooled", run_unpooled)):
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=serve_mock_hosts, args=(hosts, child), daemon=True
+        )
+        process.start()
+        ports = parent.recv()
+        targets = [
+            ProbeTarget(
+                i, f"http://localhost:{ports[i % hosts]}/health/{i}", 200, 60
+            )
+            for i in range(1, monitors + 1)
+        ]
+        started = time.perf_counter()
+        latencies = await runner(targets, rounds, per_host)
+        elapsed = time.perf_counter() - started
+        parent.send("stop")
+        connections = parent.recv()
+        process.join()
+        report(label, elapsed, latencies, connections)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--monitors", type=int, default=1000)
+    parser.add_argument("--hosts", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--per-host", type=int, default=6)
+    args = parser.parse_args()
+    asyncio.run(main(args.monitors, args.hosts, args.rounds, args.per_host))
@@ -0,0 +1,157 @@
+"""Benchmark read latency while a write-heavy simulation runs.
+
+For each storage profile, seeds a throwaway SQLite file, measures paged
+incident reads on the read engine while idle, then again while a separate
+writer process runs batched failure simulations in a loop, the way a second
+worker would. Keeping the writers out of process means the numbers reflect
+database locking rather than event-loop contention.
+
+Usage:
+    python -m app.benchmarks.storage_profile --reads 500 --writers 2 --batch 500
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.benchmarks._stats import percentile
+from app.core.database import STORAGE_PROFILES, create_engines
+from app.models.monitor import Monitor
+from app.services.incident_service import list_incidents
+from app.services.simulation_service import simulate_failures_bulk
+
+MONITORS = 50
+SEED_INCIDENTS = 20_000
+
+
+async def measure_reads(read_session, reads: int) -> tuple[list[float], int]:
+    """Time ``reads`` paged incident queries; returns latencies and errors."""
+    rng = random.Random(0)
+    latencies: list[float] = []
+    errors = 0
+    for _ in range(reads):
+        started = time.perf_counter()
+        try:
+            async with read_session() as session:
+                await list_incidents(
+                    session, monitor_id=rng.randint(1, MONITORS), limit=100
+                )
+        except Exception:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, errors
+
+
+async def write_loop(url: str, profile: str, writers: int, batch: int, conn) -> None:
+    """Run ``writers`` back-to-back batch simulation loops until told to stop."""
+    writer, _ = create_engines(url, profile)
+    write_session = sessionmaker(writer, class_=AsyncSession, expire_on_commit=False)
+    stop = asyncio.Event()
+    counts = {"writes": 0, "errors": 0}
+
+    async def loop() -> None:
+        rng = random.Random()
+        async with write_session() as session:
+            while not stop.is_set():
+                try:
+                    await simulate_failures_bulk(
+                        session,
+                        [
+                            (rng.randint(1, MONITORS), "500", None)
+                            for _ in range(batch)
+                        ],
+                    )
+                    counts["writes"] += batch
+                except Exception:
+                    await session.rollback()
+                    counts["errors"] += 1
+
+    tasks = [asyncio.create_task(loop()) for _ in range(writers)]
+    conn.send("ready")
+    await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+    stop.set()
+    await asyncio.gather(*tasks)
+    await writer.dispose()
+    conn.send(counts)
+
+
+def run_writers(url: str, profile: str, writers: int, batch: int, conn) -> None:
+    """Child process entry point for the write load."""
+    asyncio.run(write_loop(url, profile, writers, batch, conn))
+
+
+async def run_profile(profile: str, reads: int, writers: int, batch: int) -> None:
+    """Seed a fresh database and benchmark one storage profile."""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}"
+        writer, reader = create_engines(url, profile)
+        write_session = sessionmaker(
+            writer, class_=AsyncSession, expire_on_commit=False
+        )
+        read_session = sessionmaker(reader, class_=AsyncSession, expire_on_commit=False)
+
+        async with writer.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with write_session() as session:
+            session.add_all(
+                Monitor(name=f"monitor-{i}", url=f"https://example.com/{i}")
+                for i in range(MONITORS)
+            )
+            await session.commit()
+            await simulate_failures_bulk(
+                session,
+                [(i % MONITORS + 1, "timeout", None) for i in range(SEED_INCIDENTS)],
+            )
+
+        idle, _ = await measure_reads(read_session, reads)
+
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=run_writers, args=(url, profile, writers, batch, child), daemon=True
+        )
+        process.start()
+        parent.recv()
+        started = time.perf_counter()
+        loaded, read_errors = await measure_reads(read_session, reads)
+        elapsed = time.perf_counter() - started
+        parent.send("stop")
+        counts = parent.recv()
+        process.join()
+
+        await writer.dispose()
+        await reader.dispose()
+
+    for label, samples in (("idle", idle), ("writes", loaded)):
+        print(
+            f"{profile:<11} {label:<7} "
+            f"p50={statistics.median(samples):7.2f}ms "
+            f"p99={percentile(samples, 99):7.2f}ms"
+        )
+    print(
+        f"{'':<11} {'':<7} writes/s={counts['writes'] / elapsed:.0f} "
+        f"write_errors={counts['errors']} read_errors={read_errors}"
+    )
+
+
+async def main(reads: int, writers: int, batch: int) -> None:
+    """Benchmark every storage profile."""
+    for profile in STORAGE_PROFILES:
+        await run_profile(profile, reads, writers, batch)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.reads, args.writers, args.batch))
@@ -0,0 +1,36 @@
+"""Rebuild incident rollup buckets from the incidents table.
+
+Usage: python -m app.commands.backfill_stats [--chunk-size N]
+
+Run this after importing incidents outside the service layer, or to repair
+rollups. The rebuild holds the write lock for its duration.
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.database import async_session, init_db
+from app.core.logging import logger
+from app.services.stats_service import rebuild_incident_rollups
+
+
+async def backfill_stats(chunk_size: int) -> None:
+    """Recompute every incident rollup bucket."""
+    await init_db()
+    started = time.perf_counter()
+    async with async_session() as session:
+        processed = await rebuild_incident_rollups(session, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - started
+    logger.info(f"✓ Rebuilt incident rollups from {processed} incidents in {elapsed:.2f}s")
+
+
+def main():
+    """Entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(backfill_stats(args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
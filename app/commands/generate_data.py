@@ -0,0 +1,427 @@
+"""Generate a synthetic dataset of monitors, incidents and alerts.
+
+Usage: python -m app.commands.generate_data [--monitors N] [--incidents M]
+       [--alerts K] [--days D] [--seed S] [--storm-fraction F]
+       [--chunk-size C] [--user EMAIL:PASSWORD]
+
+Output is deterministic for a given seed and set of options, with
+timestamps relative to the current time. Rows are appended to whatever is
+already in the database:
+
+- Monitors differ in how flaky they are (log-normal weights), so a few of
+  them produce most of the incidents.
+- Incidents are spread over the last ``--days`` days in id order. Their
+  failure types follow a fixed mix and their resolution times are
+  log-normal with a per-type median; incidents that would still be running
+  now stay open.
+- ``--storm-fraction`` of the incidents arrive in storms: bursts of one
+  dominant failure type hitting a group of monitors within minutes.
+- Alerts go to every incident first (while they last), then to incidents
+  in proportion to how long they stayed open, the way re-alerts would.
+
+Rows are built a chunk at a time and written with executemany Core inserts
+in large transactions, and the incident rollups are updated per chunk, so
+memory stays flat however many rows are requested. Like ``backfill_stats``,
+run this while the API is stopped: its caches do not see these writes.
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.clock import utcnow
+from app.core.database import async_session, init_db
+from app.core.logging import logger
+from app.core.versions import bump_version
+from app.models.alert import Alert
+from app.models.incident import Incident
+from app.models.monitor import Monitor
+from app.services.monitor_registry import MonitorRecord
+from app.services.simulation_service import build_alert_payload
+from app.services.stats_service import record_incident_history
+
+# Failure type -> (share of incidents, median resolution time in seconds)
+FAILURE_TYPES: dict[str, tuple[float, float]] = {
+    "timeout": (0.35, 300.0),
+    "500": (0.25, 900.0),
+    "502": (0.10, 600.0),
+    "503": (0.10, 600.0),
+    "latency": (0.15, 1200.0),
+    "dns": (0.05, 1800.0),
+}
+RESOLUTION_SIGMA = 1.2
+STORM_SPREAD_SECONDS = 120.0
+CHECK_INTERVALS = (30, 60, 60, 60, 120, 300)
+SERVICES = (
+    "api", "auth", "billing", "checkout", "search", "catalog", "payments",
+    "inventory", "notifications", "gateway", "reports", "media", "cdn",
+)
+REGIONS = ("us-east", "us-west", "eu-west", "eu-central", "ap-south", "ap-east")
+
+
+@dataclass(frozen=True)
+class GenerateOptions:
+    """What to generate."""
+
+    monitors: int = 100
+    incidents: int = 10_000
+    alerts: int = 20_000
+    days: float = 30.0
+    seed: int = 0
+    storm_fraction: float = 0.2
+    # Rows built and inserted per statement
+    chunk_size: int = 20_000
+    # Rows written per transaction
+    commit_every: int = 1_000_000
+    # End of the generated time range (default: now)
+    end: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class GenerateResult:
+    """What was generated."""
+
+    monitors: int
+    incidents: int
+    alerts: int
+    open_incidents: int
+    first_monitor_id: int
+    first_incident_id: int
+
+
+class _Writer:
+    """Buffers rows per table and writes them in chunks and transactions.
+
+    Every transaction also bumps the change versions of ``versioned``, the
+    tables the run writes to, so cached ETags are invalidated as data lands.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        tables: list,
+        chunk_size: int,
+        commit_every: int,
+        versioned: tuple[str, ...] = (),
+    ) -> None:
+        self._session = session
+        self._versioned = versioned
+        # Parents before children, so foreign keys point at written rows
+        self._buffers: dict[Any, list[dict[str, Any]]] = {t: [] for t in tables}
+        self._chunk_size = chunk_size
+        self._commit_every = commit_every
+        self._uncommitted = 0
+
+    async def add(self, table, row: dict[str, Any]) -> None:
+        buffer = self._buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self._chunk_size:
+            await self.flush(table)
+
+    async def flush(self, table) -> None:
+        """Write the buffered rows of ``table`` and of the tables before it."""
+        for parent, rows in self._buffers.items():
+            if rows:
+                await self._session.execute(insert(parent), rows)
+                self._uncommitted += len(rows)
+                self._buffers[parent] = []
+            if parent is table:
+                break
+        if self._uncommitted >= self._commit_every:
+            await self._commit()
+            self._uncommitted = 0
+
+    async def _commit(self) -> None:
+        await bump_version(self._session, *self._versioned)
+        await self._session.commit()
+
+    async def close(self) -> None:
+        await self.flush(None)
+        await self._commit()
+
+
+def _monitor_records(
+    rng: random.Random, count: int, first_id: int, created_at: datetime
+) -> list[MonitorRecord]:
+    records = []
+    for i in range(count):
+        service = rng.choice(SERVICES)
+        region = rng.choice(REGIONS)
+        number = first_id + i
+        records.append(MonitorRecord(
+            id=number,
+            name=f"{service}-{region}-{number}",
+            url=f"https://{service}.{region}.example.com/health",
+            expected_status_code=200,
+            check_interval=rng.choice(CHECK_INTERVALS),
+            is_active=rng.random() >= 0.05,
+            created_at=created_at,
+        ))
+    return records
+
+
+def _incident_starts(
+    rng: random.Random,
+    count: int,
+    start: float,
+    end: float,
+    monitors: int,
+    pick_monitors: Callable[[int], list[int]],
+    pick_types: Callable[[int], list[str]],
+    storm_fraction: float,
+) -> list[tuple[float, int, str]]:
+    """
+    ``(seconds, monitor index, failure type)`` for ``count`` incidents
+    starting between ``start`` and ``end`` seconds into the time range,
+    oldest first.
+    """
+    stormy = round(count * storm_fraction)
+    background = count - stormy
+    starts = list(zip(
+        (rng.uniform(start, end) for _ in range(background)),
+        pick_monitors(background),
+        pick_types(background),
+    ))
+    while stormy:
+        # Storm sizes are heavy-tailed: mostly a handful, sometimes hundreds
+        size = min(stormy, max(2, int(rng.paretovariate(1.2) * 5)))
+        stormy -= size
+        center = rng.uniform(start, end)
+        dominant = pick_types(1)[0]
+        blast_radius = rng.sample(range(monitors), min(monitors, max(1, size // 3)))
+        for _ in range(size):
+            starts.append((
+                min(end, center + rng.expovariate(1 / STORM_SPREAD_SECONDS)),
+                rng.choice(blast_radius),
+                dominant if rng.random() < 0.8 else pick_types(1)[0],
+            ))
+    starts.sort()
+    return starts
+
+
+def _allot(total: int, parts: int, index: int) -> int:
+    """The ``index``-th of ``parts`` near-equal integer shares of ``total``."""
+    return total * (index + 1) // parts - total * index // parts
+
+
+async def generate_data(
+    session: AsyncSession,
+    options: GenerateOptions,
+    progress: Optional[Callable[[str], None]] = None,
+) -> GenerateResult:
+    """Append a synthetic dataset; see the module docstring."""
+    if options.incidents and not options.monitors:
+        raise ValueError("Incidents need at least one monitor")
+    if options.alerts and not options.incidents:
+        raise ValueError("Alerts need at least one incident")
+
+    rng = random.Random(options.seed)
+    end = options.end or utcnow()
+    start = end - timedelta(days=options.days)
+    span = options.days * 86400
+
+    first_monitor_id = (await session.scalar(select(func.max(Monitor.id)))) or 0
+    first_incident_id = (await session.scalar(select(func.max(Incident.id)))) or 0
+    first_monitor_id += 1
+    first_incident_id += 1
+
+    monitor_table = Monitor.__table__
+    incident_table = Incident.__table__
+    alert_table = Alert.__table__
+    writer = _Writer(
+        session,
+        [monitor_table, incident_table, alert_table],
+        options.chunk_size,
+        options.commit_every,
+        ("monitor", "incident", "alert", "incident_rollup"),
+    )
+
+    monitors = _monitor_records(rng, options.monitors, first_monitor_id, start)
+    for record in monitors:
+        await writer.add(monitor_table, {
+            "id": record.id,
+            "name": record.name,
+            "url": record.url,
+            "expected_status_code": record.expected_status_code,
+            "check_interval": record.check_interval,
+            "is_active": record.is_active,
+            "created_at": record.created_at,
+        })
+    await writer.flush(monitor_table)
+
+    # Batched weighted draws: a few flaky monitors cause most incidents
+    flakiness = list(itertools.accumulate(
+        rng.lognormvariate(0, 1.5) for _ in range(options.monitors)
+    ))
+    type_names = list(FAILURE_TYPES)
+    type_weights = list(itertools.accumulate(w for w, _ in FAILURE_TYPES.values()))
+
+    def pick_monitors(k: int) -> list[int]:
+        return rng.choices(range(options.monitors), cum_weights=flakiness, k=k)
+
+    def pick_types(k: int) -> list[str]:
+        return rng.choices(type_names, cum_weights=type_weights, k=k)
+
+    chunks = max(1, math.ceil(options.incidents / options.chunk_size))
+    incident_id = first_incident_id
+    alerts = open_incidents = 0
+    for chunk in range(chunks):
+        count = _allot(options.incidents, chunks, chunk)
+        if not count:
+            continue
+        # Each chunk covers its slice of the time range, so ids follow time
+        starts = _incident_starts(
+            rng,
+            count,
+            span * chunk / chunks,
+            span * (chunk + 1) / chunks,
+            options.monitors,
+            pick_monitors,
+            pick_types,
+            options.storm_fraction,
+        )
+
+        incidents = []
+        for offset, monitor_index, failure_type in starts:
+            started_at = start + timedelta(seconds=offset)
+            median = FAILURE_TYPES[failure_type][1]
+            resolved_at = started_at + timedelta(
+                seconds=rng.lognormvariate(math.log(median), RESOLUTION_SIGMA)
+            )
+            if resolved_at > end:
+                resolved_at = None
+                open_incidents += 1
+            incidents.append(
+                (incident_id, monitors[monitor_index], failure_type, started_at, resolved_at)
+            )
+            incident_id += 1
+
+        # This chunk's share of the alerts: one per incident while they
+        # last, the rest weighted towards incidents that ran longer
+        budget = _allot(options.alerts, chunks, chunk)
+        if budget >= count:
+            per_incident = [1] * count
+            durations = list(itertools.accumulate(
+                ((resolved_at or end) - started_at).total_seconds() + 1
+                for _, _, _, started_at, resolved_at in incidents
+            ))
+            for i in rng.choices(range(count), cum_weights=durations, k=budget - count):
+                per_incident[i] += 1
+        else:
+            per_incident = [0] * count
+            for i in rng.sample(range(count), budget):
+                per_incident[i] = 1
+
+        for (id_, monitor, failure_type, started_at, resolved_at), n in zip(
+            incidents, per_incident
+        ):
+            latency_ms = (
+                int(rng.lognormvariate(math.log(3000), 0.5))
+                if failure_type == "latency" else None
+            )
+            payload = build_alert_payload(monitor, id_, failure_type, latency_ms)
+            window = ((resolved_at or end) - started_at).total_seconds()
+            created = sorted(
+                [0.0] + [rng.uniform(0, window) for _ in range(n - 1)]
+            ) if n else []
+            await writer.add(incident_table, {
+                "id": id_,
+                "monitor_id": monitor.id,
+                "error_type": failure_type,
+                "status": "open" if resolved_at is None else "resolved",
+                "started_at": started_at,
+                "resolved_at": resolved_at,
+                "occurrences": 1,
+                "last_seen_at": started_at,
+                "last_alerted_at": (
+                    started_at + timedelta(seconds=created[-1]) if created else None
+                ),
+            })
+            for offset in created:
+                await writer.add(alert_table, {
+                    "incident_id": id_,
+                    "payload": payload,
+                    "created_at": started_at + timedelta(seconds=offset),
+                })
+            alerts += n
+
+        await writer.flush(incident_table)
+        await record_incident_history(
+            session,
+            (
+                (monitor.id, failure_type, started_at, resolved_at)
+                for _, monitor, failure_type, started_at, resolved_at in incidents
+            ),
+        )
+        if progress is not None:
+            progress(
+                f"{incident_id - first_incident_id}/{options.incidents} incidents, "
+                f"{alerts}/{options.alerts} alerts"
+            )
+
+    await writer.close()
+    return GenerateResult(
+        monitors=options.monitors,
+        incidents=options.incidents,
+        alerts=alerts,
+        open_incidents=open_incidents,
+        first_monitor_id=first_monitor_id,
+        first_incident_id=first_incident_id,
+    )
+
+
+async def generate(options: GenerateOptions, user: Optional[str]) -> None:
+    """Generate a dataset in the configured database."""
+    from app.schemas.user import UserCreate
+    from app.services.auth_service import create_user
+
+    await init_db()
+    started = time.perf_counter()
+    async with async_session() as session:
+        if user:
+            email, _, password = user.partition(":")
+            await create_user(session, UserCreate(email=email, password=password))
+            logger.info(f"✓ Created user {email}")
+        result = await generate_data(session, options, progress=logger.info)
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"✓ Generated {result.monitors} monitors, {result.incidents} incidents "
+        f"({result.open_incidents} open) and {result.alerts} alerts in {elapsed:.1f}s"
+    )
+
+
+def main():
+    """Entry point."""
+    defaults = GenerateOptions()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--monitors", type=int, default=defaults.monitors)
+    parser.add_argument("--incidents", type=int, default=defaults.incidents)
+    parser.add_argument("--alerts", type=int, default=defaults.alerts)
+    parser.add_argument("--days", type=float, default=defaults.days)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--storm-fraction", type=float, default=defaults.storm_fraction)
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size)
+    parser.add_argument("--user", help="Also create a user, given as EMAIL:PASSWORD")
+    args = parser.parse_args()
+    options = GenerateOptions(
+        monitors=args.monitors,
+        incidents=args.incidents,
+        alerts=args.alerts,
+        days=args.days,
+        seed=args.seed,
+        storm_fraction=args.storm_fraction,
+        chunk_size=args.chunk_size,
+    )
+    asyncio.run(generate(options, args.user))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Simulate days of monitoring in virtual time.
+
+Usage: python -m app.commands.run_simulation [--monitors N] [--days D]
+       [--seed S] [--failure-rate R] [--start ISO-DATETIME]
+
+A discrete-event simulation: checks, outages and recoveries are events on
+a heap ordered by virtual time, and a ``VirtualClock`` jumps straight from
+one event to the next, so days of activity run as fast as the CPU allows.
+
+- The simulation creates ``--monitors`` monitors with the usual spread of
+  check intervals; each is checked on its interval from a jittered first
+  run, like the probe scheduler does.
+- A healthy monitor's check starts an outage with a per-monitor
+  probability (log-normal around ``--failure-rate``), with a failure type
+  and duration drawn as in ``generate_data``. Every check during the
+  outage fails.
+- Failed checks go through ``simulate_failure`` and recoveries through
+  ``resolve_incident``, so incidents, alerts, coalescing, alert rate
+  limits, the outbox and rollups behave exactly as in the API. Incident
+  dedup is on for the run, so an outage keeps one incident however many
+  of its checks fail.
+
+Nothing depends on the wall clock: the same seed and options against an
+empty database always produce a byte-identical database.
+"""
+import argparse
+import asyncio
+import heapq
+import itertools
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.commands.generate_data import (
+    CHECK_INTERVALS,
+    FAILURE_TYPES,
+    RESOLUTION_SIGMA,
+    REGIONS,
+    SERVICES,
+)
+from app.core.clock import VirtualClock, use_clock
+from app.core.config import settings
+from app.core.database import engine, init_db
+from app.core.logging import logger
+from app.schemas.monitor import MonitorCreate
+from app.services.incident_index import (
+    get_open_incident_index,
+    load_open_incident_index,
+    unload_open_incident_index,
+)
+from app.services.incident_service import resolve_incident
+from app.services.monitor_registry import (
+    get_monitor_registry,
+    load_monitor_registry,
+    unload_monitor_registry,
+)
+from app.services.monitor_service import create_monitor
+from app.services.scheduler_service import first_run_offset
+from app.services.simulation_service import simulate_failure
+
+# Event kinds; at equal times a recovery comes before the next check
+RECOVER = 0
+CHECK = 1
+
+
+@dataclass(frozen=True)
+class SimulationOptions:
+    """What to simulate."""
+
+    monitors: int = 20
+    days: float = 1.0
+    seed: int = 0
+    # Mean chance that a check of a healthy monitor starts an outage
+    failure_rate: float = 0.0002
+    # Virtual start time; fixed so runs do not depend on the wall clock
+    start: datetime = datetime(2024, 1, 1)
+
+
+@dataclass
+class SimulationResult:
+    """What happened during a simulation."""
+
+    start: datetime
+    end: datetime
+    events: int = 0
+    checks: int = 0
+    failed_checks: int = 0
+    outages: int = 0
+    incidents: int = 0
+    resolved: int = 0
+    alerts: int = 0
+    elapsed_seconds: float = 0.0
+
+
+@dataclass
+class _MonitorState:
+    interval: int
+    failure_probability: float
+    # Failure type of the current outage, and the incidents it opened
+    failing: Optional[str] = None
+    incident_ids: set[int] = field(default_factory=set)
+
+
+async def run_simulation(
+    session: AsyncSession, options: SimulationOptions
+) -> SimulationResult:
+    """Run a simulation against ``session``'s database; see the module docstring."""
+    if options.monitors < 1 or options.days <= 0:
+        raise ValueError("A simulation needs monitors and a positive duration")
+
+    rng = random.Random(options.seed)
+    horizon = options.days * 86400
+    clock = VirtualClock(options.start)
+    result = SimulationResult(
+        start=options.start, end=options.start + timedelta(seconds=horizon)
+    )
+    type_names = list(FAILURE_TYPES)
+    type_weights = list(itertools.accumulate(w for w, _ in FAILURE_TYPES.values()))
+    started = time.perf_counter()
+
+    # As in the API, monitors and open incidents are looked up in memory,
+    # which leaves a failed check with one UPDATE or INSERT and a commit;
+    # lookups already loaded belong to the caller and are left in place
+    owns_registry = get_monitor_registry() is None
+    owns_index = get_open_incident_index() is None
+    dedup = settings.INCIDENT_DEDUP_ENABLED
+    settings.INCIDENT_DEDUP_ENABLED = True
+    try:
+        if owns_registry:
+            await load_monitor_registry(session)
+        if owns_index:
+            await load_open_incident_index(session)
+
+        with use_clock(clock):
+            states: dict[int, _MonitorState] = {}
+            # (seconds from start, sequence, kind, monitor id); the sequence
+            # keeps the order of simultaneous events deterministic
+            heap: list[tuple[float, int, int, int]] = []
+            sequence = itertools.count()
+            for number in range(options.monitors):
+                service = rng.choice(SERVICES)
+                region = rng.choice(REGIONS)
+                monitor = await create_monitor(session, MonitorCreate(
+                    name=f"{service}-{region}-{number + 1}",
+                    url=f"https://{service}.{region}.example.com/health",
+                    check_interval=rng.choice(CHECK_INTERVALS),
+                ))
+                states[monitor.id] = _MonitorState(
+                    interval=monitor.check_interval,
+                    failure_probability=min(
+                        1.0, options.failure_rate * rng.lognormvariate(0, 1)
+                    ),
+                )
+                offset = first_run_offset(monitor.id, monitor.check_interval)
+                heapq.heappush(heap, (offset, next(sequence), CHECK, monitor.id))
+
+            while heap and heap[0][0] < horizon:
+                offset, _, kind, monitor_id = heapq.heappop(heap)
+                clock.advance_to(options.start + timedelta(seconds=offset))
+                state = states[monitor_id]
+                result.events += 1
+
+                if kind == RECOVER:
+                    for incident_id in sorted(state.incident_ids):
+                        await resolve_incident(session, incident_id)
+                        result.resolved += 1
+                    state.failing = None
+                    state.incident_ids.clear()
+                    continue
+
+                result.checks += 1
+                heapq.heappush(
+                    heap, (offset + state.interval, next(sequence), CHECK, monitor_id)
+                )
+                if state.failing is None:
+                    if rng.random() >= state.failure_probability:
+                        continue
+                    state.failing = rng.choices(type_names, cum_weights=type_weights)[0]
+                    median = FAILURE_TYPES[state.failing][1]
+                    duration = rng.lognormvariate(math.log(median), RESOLUTION_SIGMA)
+                    heapq.heappush(
+                        heap, (offset + duration, next(sequence), RECOVER, monitor_id)
+                    )
+                    result.outages += 1
+
+                outcome = await simulate_failure(session, monitor_id, state.failing)
+                result.failed_checks += 1
+                if outcome["incident_id"] not in state.incident_ids:
+                    state.incident_ids.add(outcome["incident_id"])
+                    result.incidents += 1
+                if outcome["alert_id"] is not None:
+                    result.alerts += 1
+
+            clock.advance_to(result.end)
+    finally:
+        settings.INCIDENT_DEDUP_ENABLED = dedup
+        if owns_registry:
+            unload_monitor_registry()
+        if owns_index:
+            unload_open_incident_index()
+
+    result.elapsed_seconds = time.perf_counter() - started
+    return result
+
+
+async def simulate(options: SimulationOptions) -> None:
+    """Run a simulation against the configured database."""
+    await init_db()
+    # One connection for the whole run; the file engine would otherwise
+    # open a fresh one for every transaction
+    async with engine.connect() as connection:
+        async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+            result = await run_simulation(session, options)
+    logger.info(
+        f"✓ Simulated {options.days:g} days ({result.start} to {result.end}) in "
+        f"{result.elapsed_seconds:.1f}s: {result.events} events, {result.checks} "
+        f"checks ({result.failed_checks} failed), {result.outages} outages, "
+        f"{result.incidents} incidents ({result.resolved} resolved), "
+        f"{result.alerts} alerts"
+    )
+
+
+def main():
+    """Entry point."""
+    defaults = SimulationOptions()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--monitors", type=int, default=defaults.monitors)
+    parser.add_argument("--days", type=float, default=defaults.days)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--failure-rate", type=float, default=defaults.failure_rate)
+    parser.add_argument(
+        "--start", type=datetime.fromisoformat, default=defaults.start
+    )
+    args = parser.parse_args()
+    options = SimulationOptions(
+        monitors=args.monitors,
+        days=args.days,
+        seed=args.seed,
+        failure_rate=args.failure_rate,
+        start=args.start,
+    )
+    asyncio.run(simulate(options))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Application clock.
+
+Model timestamp defaults and the services that stamp incidents and alerts
+read the time through ``utcnow`` rather than ``datetime.utcnow``. The wall
+clock is used unless a ``VirtualClock`` is installed, which lets the
+discrete-event simulation run days of activity as fast as the CPU allows
+and produce the same timestamps on every run.
+
+Token expiry in ``app.core.security`` and the monotonic timers used for
+caches and scheduling stay on real time.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, Protocol
+
+
+class Clock(Protocol):
+    """Source of the current (naive UTC) time."""
+
+    def now(self) -> datetime:
+        """Return the current time."""
+
+
+class SystemClock:
+    """The wall clock."""
+
+    def now(self) -> datetime:
+        """Return ``datetime.utcnow()``."""
+        return datetime.utcnow()
+
+
+class VirtualClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self, start: datetime) -> None:
+        self._now = start
+
+    def now(self) -> datetime:
+        """Return the current virtual time."""
+        return self._now
+
+    def advance_to(self, moment: datetime) -> None:
+        """Move to ``moment``; time never runs backwards."""
+        if moment < self._now:
+            raise ValueError(f"Cannot move the clock back to {moment}")
+        self._now = moment
+
+    def advance(self, seconds: float) -> None:
+        """Move forward by ``seconds``."""
+        self.advance_to(self._now + timedelta(seconds=seconds))
+
+
+_clock: Clock = SystemClock()
+
+
+def get_clock() -> Clock:
+    """Return the installed clock."""
+    return _clock
+
+
+def set_clock(clock: Clock) -> Clock:
+    """Install ``clock`` and return the one it replaces."""
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[Clock]:
+    """Install ``clock`` for the duration of a ``with`` block."""
+    previous = set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
+
+
+def utcnow() -> datetime:
+    """Current time according to the installed clock."""
+    return _clock.now()
@@ -20,12 +20,72 @@ class Settings(BaseSettings):
 
     # Database: default to an absolute sqlite file under the project root
     DATABASE_URL: str = f"sqlite+aiosqlite:///{BASE_DIR / 'api_pulse.db'}"
+    # SQLite pragma profile from app.core.database.STORAGE_PROFILES
+    STORAGE_PROFILE: str = "production"
+
+    # Group-commit write queue for incident and alert writes
+    WRITE_QUEUE_ENABLED: bool = True
+    WRITE_QUEUE_MAX_BATCH: int = 500
+    WRITE_QUEUE_MAX_DELAY_MS: float = 2.0
 
     # JWT
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Password hashing: stored hashes with a different cost are upgraded on login
+    BCRYPT_ROUNDS: int = 12
+    # Threads for bcrypt work (0 = min(4, CPU count))
+    PASSWORD_HASH_WORKERS: int = 0
+
+    # Authenticated-request caches
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
+    USER_CACHE_MAX_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 30.0
+
+    # Uptime report cache; reports for windows ending now expire sooner
+    UPTIME_CACHE_MAX_SIZE: int = 10_000
+    UPTIME_CACHE_TTL_SECONDS: float = 3600.0
+    UPTIME_CACHE_LIVE_TTL_SECONDS: float = 10.0
+
+    # Probe scheduler (off by default: the demo does not perform real checks)
+    SCHEDULER_ENABLED: bool = False
+    SCHEDULER_MAX_CONCURRENCY: int = 500
+    PROBE_TIMEOUT_SECONDS: float = 10.0
+    PROBE_MAX_CONNECTIONS_PER_HOST: int = 6
+    PROBE_DNS_TTL_SECONDS: float = 300.0
+
+    # Coalesce repeated failures into the monitor's open incident of the same
+    # error type instead of opening new ones; such incidents alert at most
+    # once per rate-limit window
+    INCIDENT_DEDUP_ENABLED: bool = False
+    ALERT_RATE_LIMIT_SECONDS: float = 300.0
+
+    # Alert delivery: channel name -> webhook URL. Alerts are queued in an
+    # outbox and delivered in the background; no channels, no delivery.
+    ALERT_CHANNELS: dict[str, str] = {}
+    ALERT_DISPATCH_BATCH_SIZE: int = 100
+    ALERT_DISPATCH_MAX_IN_FLIGHT: int = 8
+    ALERT_DISPATCH_MAX_ATTEMPTS: int = 8
+    ALERT_DISPATCH_BACKOFF_SECONDS: float = 1.0
+    ALERT_DISPATCH_MAX_BACKOFF_SECONDS: float = 300.0
+    ALERT_DISPATCH_TIMEOUT_SECONDS: float = 10.0
+    ALERT_DISPATCH_POLL_SECONDS: float = 1.0
+
+    # Live incident feed: events kept for resuming, and events buffered per
+    # subscriber before the oldest are dropped
+    FEED_HISTORY_SIZE: int = 1000
+    FEED_QUEUE_SIZE: int = 256
+    FEED_KEEPALIVE_SECONDS: float = 15.0
+
+    # Failure scenario engine: phases hitting at least this many monitors
+    # have their timelines computed on a process pool (0 workers = CPU count)
+    SCENARIO_PARALLEL_MIN_MONITORS: int = 50_000
+    SCENARIO_WORKERS: int = 0
+
+    # Prometheus metrics at /metrics; request timing middleware on or off
+    METRICS_ENABLED: bool = True
+
     # CORS
     ALLOWED_HOSTS: list = ["*"]
 
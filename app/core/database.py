@@ -1,30 +1,355 @@
 """Database configuration and session management."""
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import asyncio
+from collections import deque
+from time import perf_counter
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from sqlalchemy import Connection, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.schema import CreateColumn, CreateTable
 from sqlmodel import SQLModel
 
 from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import DB_CHECKOUT_SECONDS, DB_STATEMENT_SECONDS, statement_kind
 
-# Create async engine using the configured DATABASE_URL directly
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    future=True,
-)
+# SQLite pragmas applied to every new connection, per storage profile
+STORAGE_PROFILES: dict[str, dict[str, object]] = {
+    # SQLite defaults: rollback journal, readers block behind writers
+    "default": {},
+    # WAL lets readers proceed while a write is in progress; NORMAL sync
+    # only fsyncs at checkpoints, which is still durable across app crashes
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -65536,  # KiB, i.e. 64 MiB per connection
+        "mmap_size": 268435456,  # 256 MiB
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def _apply_pragmas(engine: AsyncEngine, pragmas: dict[str, object]) -> None:
+    """Run ``PRAGMA`` statements on every connection the engine opens."""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_engines(
+    database_url: str, profile: str = "default"
+) -> tuple[AsyncEngine, AsyncEngine]:
+    """
+    Create the writer and reader engines for a database.
+
+    For file-backed SQLite the reader engine has its own connection pool with
+    ``query_only`` set, so GET endpoints never contend with the writer for a
+    connection. In-memory and non-SQLite databases share a single engine.
+    """
+    writer = create_async_engine(database_url, echo=False, future=True)
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return writer, writer
+
+    pragmas = STORAGE_PROFILES[profile]
+    _apply_pragmas(writer, pragmas)
+    if url.database in (None, "", ":memory:"):
+        return writer, writer
+
+    reader = create_async_engine(database_url, echo=False, future=True)
+    _apply_pragmas(
+        reader,
+        {k: v for k, v in pragmas.items() if k != "journal_mode"}
+        | {"query_only": "ON"},
+    )
+    return writer, reader
+
+
+def _instrument(engine: AsyncEngine, name: str) -> None:
+    """Time every statement the engine executes, labelled with ``name``."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+        # Statements on one connection never overlap, so one slot is enough
+        conn.info["statement_started"] = perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = perf_counter() - conn.info["statement_started"]
+        DB_STATEMENT_SECONDS.labels(name, statement_kind(statement)).observe(elapsed)
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _checkout_started(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info["checkout_started"] = perf_counter()
 
-# Session factory
+
+@event.listens_for(Session, "after_begin")
+def _checkout_finished(session: Session, transaction, connection) -> None:
+    # Time from a session starting its transaction to holding a connection
+    started = session.info.pop("checkout_started", None)
+    if started is not None:
+        DB_CHECKOUT_SECONDS.observe(perf_counter() - started)
+
+
+# Writer and read-only engines for the configured DATABASE_URL
+engine, read_engine = create_engines(settings.DATABASE_URL, settings.STORAGE_PROFILE)
+_instrument(engine, "writer")
+if read_engine is not engine:
+    _instrument(read_engine, "reader")
+
+# Session factories
 async_session = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
+read_session = sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+def create_tables(connection: Connection) -> None:
+    """
+    Create every declared table that is missing, without its indexes.
+
+    ``create_all`` would also create the indexes, but in the iteration order
+    of each table's index set, which changes from run to run; leaving them
+    to ``ensure_indexes`` keeps the schema, and so the database file,
+    identical across runs.
+    """
+    inspector = inspect(connection)
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            connection.execute(CreateTable(table))
+
+
+def ensure_columns(connection: Connection) -> None:
+    """
+    Add any declared column missing from an existing table.
+
+    ``create_tables`` only creates missing tables, so columns added to a model
+    later are applied here with ``ALTER TABLE ... ADD COLUMN``. Such columns
+    must be nullable or have a server default. Safe to run repeatedly.
+    """
+    inspector = inspect(connection)
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+            logger.info(f"Added column {table.name}.{column.name}")
+
+
+def ensure_indexes(connection: Connection) -> None:
+    """
+    Create any declared index that is missing, in name order.
+
+    This creates the indexes of tables ``create_tables`` just made, as well
+    as indexes added to a model after its table existed. Safe to run
+    repeatedly.
+    """
+    for table in SQLModel.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            index.create(connection, checkfirst=True)
 
 
 async def init_db() -> None:
     """Initialize the database."""
     async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(create_tables)
+        await conn.run_sync(ensure_columns)
+        await conn.run_sync(ensure_indexes)
 
 
 async def get_session() -> AsyncSession:
     """Dependency to get database session."""
     async with async_session() as session:
         yield session
+
+
+async def get_read_session() -> AsyncSession:
+    """Dependency to get a read-only database session for GET endpoints."""
+    async with read_session() as session:
+        yield session
+
+
+T = TypeVar("T")
+
+# A unit of work: applies its changes to the given session without committing
+WriteOp = Callable[[AsyncSession], Awaitable[T]]
+
+
+class WriteQueue:
+    """
+    Single-writer group-commit queue.
+
+    Concurrent callers submit write operations; one background task gathers
+    them for up to ``max_delay`` seconds or ``max_batch`` items and applies
+    the whole batch in one transaction, so N writers pay for one commit
+    instead of N. Each caller's future resolves once its write is durable.
+
+    If a batch fails to commit, its operations are retried one at a time so
+    a single bad write only fails its own caller. Operations should therefore
+    create their objects inside the callable.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_batch: int = 500,
+        max_delay: float = 0.002,
+    ) -> None:
+        self._session_factory = session_factory
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._pending: deque[tuple[WriteOp, asyncio.Future]] = deque()
+        self._has_pending = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._closing = False
+        self.batches = 0
+        self.writes = 0
+
+    async def submit(self, op: WriteOp[T]) -> T:
+        """Queue a write and wait until it has been committed."""
+        if self._runner is None or self._closing:
+            raise RuntimeError("Write queue is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((op, future))
+        self._has_pending.set()
+        return await future
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._runner is None:
+            self._closing = False
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush outstanding writes and stop the writer task."""
+        if self._runner is None:
+            return
+        self._closing = True
+        self._has_pending.set()
+        await self._runner
+        self._runner = None
+
+    def _take_batch(self) -> list[tuple[WriteOp, asyncio.Future]]:
+        count = min(len(self._pending), self._max_batch)
+        return [self._pending.popleft() for _ in range(count)]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending:
+                if self._closing:
+                    return
+                self._has_pending.clear()
+                await self._has_pending.wait()
+                continue
+
+            # Give concurrent writers a short window to join this batch
+            deadline = loop.time() + self._max_delay
+            while len(self._pending) < self._max_batch and not self._closing:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._has_pending.clear()
+                try:
+                    await asyncio.wait_for(self._has_pending.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(self._take_batch())
+
+    async def _flush(self, batch: list[tuple[WriteOp, asyncio.Future]]) -> None:
+        """Apply a batch in one transaction, falling back to one per write."""
+        batch = [(op, future) for op, future in batch if not future.cancelled()]
+        if len(batch) == 1:
+            await self._flush_one(*batch[0])
+        if len(batch) <= 1:
+            return
+        try:
+            async with self._session_factory() as session:
+                results = [await op(session) for op, _ in batch]
+                await session.commit()
+                session.expunge_all()
+        except Exception:
+            logger.warning(
+                f"Group commit of {len(batch)} writes failed; retrying individually"
+            )
+            for item in batch:
+                await self._flush_one(*item)
+            return
+
+        self.batches += 1
+        self.writes += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _flush_one(self, op: WriteOp, future: asyncio.Future) -> None:
+        try:
+            async with self._session_factory() as session:
+                result = await op(session)
+                await session.commit()
+                session.expunge_all()
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+            return
+        self.batches += 1
+        self.writes += 1
+        if not future.done():
+            future.set_result(result)
+
+
+# Write queue started by the application lifespan, if enabled
+_write_queue: Optional[WriteQueue] = None
+
+
+def get_write_queue() -> Optional[WriteQueue]:
+    """Return the running write queue, if any."""
+    return _write_queue
+
+
+def start_write_queue(max_batch: int, max_delay: float) -> WriteQueue:
+    """Create and start the application write queue."""
+    global _write_queue
+    _write_queue = WriteQueue(async_session, max_batch=max_batch, max_delay=max_delay)
+    _write_queue.start()
+    return _write_queue
+
+
+async def stop_write_queue() -> None:
+    """Flush and stop the application write queue."""
+    global _write_queue
+    if _write_queue is not None:
+        queue, _write_queue = _write_queue, None
+        await queue.stop()
+
+
+async def run_write(session: AsyncSession, op: WriteOp[T]) -> T:
+    """
+    Apply a write and make it durable.
+
+    Goes through the group-commit queue when one is running; otherwise the
+    operation runs on ``session`` and is committed directly.
+    """
+    if _write_queue is not None:
+        return await _write_queue.submit(op)
+    result = await op(session)
+    await session.commit()
+    return result
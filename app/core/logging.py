@@ -11,4 +11,7 @@ logging.basicConfig(
     ],
 )
 
+# Per-request client logs would drown out everything else once probes run
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
 logger = logging.getLogger(__name__)
@@ -0,0 +1,300 @@
+"""In-process metrics in the Prometheus text format.
+
+A small registry of counters and histograms, rendered at ``/metrics`` in
+the Prometheus text exposition format (version 0.0.4). Metrics are
+recorded from:
+
+- ``MetricsMiddleware``: status of every HTTP request and latency of
+  every one but event streams, per route template so path parameters do
+  not multiply series
+- SQLAlchemy cursor events on the engines in ``app.core.database``: the
+  duration of every statement, per kind of statement
+- session events: how long a session waits for its connection
+- the services, after they commit: incidents created, coalesced and
+  resolved, and alerts written
+
+Recording is a dict lookup, a ``bisect`` and a few integer additions, so
+the instrumentation stays on in production. All of it runs on the event
+loop thread, so the counters need no locking.
+"""
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency buckets in seconds, from sub-millisecond queries to slow requests
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+    2.5, 5.0, 10.0,
+)
+
+# Exposition format media type; responses append "; charset=utf-8"
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        if not self.labelnames:
+            # Unlabelled metrics are exposed from the start, at zero
+            self.labels()
+
+    def labels(self, *values: str):
+        """The child for one combination of label values, created on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} takes labels {self.labelnames}, got {values}"
+                )
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """The metric's HELP, TYPE and sample lines."""
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+
+    type = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in sorted(self._children.items()):
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}{labels} {_format_value(child.value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # One slot per bucket plus one for values above the last bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative ``le`` buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record an observation on the unlabelled histogram."""
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterable[str]:
+        names = self.labelnames + ("le",)
+        for values, child in sorted(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                labels = _format_labels(names, values + (_format_value(bound),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """The metrics exposed together at one endpoint."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric; names must be unique."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Iterable[str] = ()
+    ) -> Counter:
+        """Create and register a counter."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Every metric in the text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "apipulse_http_requests_total",
+    "HTTP requests by route template, method and status code.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "apipulse_http_request_duration_seconds",
+    "Time from receiving an HTTP request to sending the end of its response; "
+    "event streams are not timed.",
+    ("method", "route"),
+)
+DB_STATEMENT_SECONDS = registry.histogram(
+    "apipulse_db_statement_duration_seconds",
+    "SQL statement execution time, by statement kind.",
+    ("engine", "statement"),
+)
+DB_CHECKOUT_SECONDS = registry.histogram(
+    "apipulse_db_session_checkout_seconds",
+    "Time a session waits for a database connection when it starts a transaction.",
+)
+INCIDENTS_CREATED = registry.counter(
+    "apipulse_incidents_created_total", "Incidents opened."
+)
+INCIDENTS_COALESCED = registry.counter(
+    "apipulse_incidents_coalesced_total",
+    "Failures added to an incident instead of opening their own.",
+)
+INCIDENTS_RESOLVED = registry.counter(
+    "apipulse_incidents_resolved_total", "Incidents resolved."
+)
+ALERTS_CREATED = registry.counter("apipulse_alerts_created_total", "Alerts written.")
+
+
+# Statement kinds worth telling apart; anything else is "other"
+_STATEMENT_KINDS = frozenset(
+    {"SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA", "BEGIN", "COMMIT", "WITH"}
+)
+
+
+def statement_kind(statement: str) -> str:
+    """The leading SQL keyword of a statement, for the statement label."""
+    words = statement[:16].split(None, 1)
+    keyword = words[0].upper() if words else ""
+    return keyword if keyword in _STATEMENT_KINDS else "other"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording the latency and status of HTTP requests.
+
+    The route label is the matched route's path template, read from the
+    scope after the router has handled the request; requests that match no
+    route are counted as ``unmatched``. Server-sent event streams are
+    counted but not timed: their duration is how long the client stayed
+    connected, which would swamp the latency buckets.
+    """
+
+    def __init__(
+        self, app: ASGIApp, clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        self.app = app
+        self._clock = clock
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = self._clock()
+        status: Optional[int] = None
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = any(
+                    name.lower() == b"content-type"
+                    and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", ())
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            if not streaming:
+                HTTP_REQUEST_SECONDS.labels(method, template).observe(
+                    self._clock() - started
+                )
+            HTTP_REQUESTS.labels(method, template, str(status or 500)).inc()
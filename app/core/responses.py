@@ -0,0 +1,46 @@
+"""Fast JSON response helpers."""
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+def model_list_response(
+    schema: type[BaseModel],
+    rows: Iterable[Any],
+    headers: Optional[Mapping[str, str]] = None,
+) -> ORJSONResponse:
+    """
+    Serialize ``rows`` as a JSON array of ``schema``.
+
+    Each row is validated once, straight from its attributes, and dumped to
+    plain Python objects that orjson encodes natively, datetimes and JSON
+    columns included. Endpoints return the response directly, so FastAPI
+    does not validate and encode the data a second time for
+    ``response_model``; pass the injected response's headers along so
+    headers set by dependencies are kept.
+    """
+    adapter = _list_adapter(schema)
+    content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True))
+    return ORJSONResponse(content, headers=headers)
+
+
+def row_list_response(
+    fields: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    headers: Optional[Mapping[str, str]] = None,
+) -> ORJSONResponse:
+    """
+    Serialize row tuples as a JSON array of objects keyed by ``fields``.
+
+    Rows come straight from a column select, so values are already plain
+    Python types and are encoded without any validation. Columns past the
+    end of ``fields`` (such as cursor keys) are left out.
+    """
+    return ORJSONResponse([dict(zip(fields, row)) for row in rows], headers=headers)
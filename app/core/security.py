@@ -1,4 +1,5 @@
 """Security and authentication utilities."""
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -6,10 +7,13 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import ValidationError
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 
 def hash_password(password: str) -> str:
@@ -49,3 +53,22 @@ def decode_token(token: str) -> Optional[dict]:
         return payload
     except (JWTError, ValidationError):
         return None
+
+
+# Decoded claims keyed by the raw token, kept until the token expires
+token_cache: TTLCache[str, dict] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+
+def decode_token_cached(token: str) -> Optional[dict]:
+    """Decode a JWT token, reusing the claims of a previously verified token."""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    
+    payload = decode_token(token)
+    if payload and isinstance(payload.get("exp"), (int, float)):
+        token_cache.set(token, payload, ttl=payload["exp"] - time.time())
+    return payload
@@ -0,0 +1,69 @@
+"""Per-table change-version counters.
+
+Every service-layer write bumps the version of each table it modifies in
+the same transaction as the change, via the ``table_version`` table. GET
+endpoints derive strong ETags from the versions of the tables they read,
+so an unchanged resource can be answered with 304 after a single primary
+key lookup, without running the endpoint's queries.
+
+Because the counters live in the database, writes from every worker and
+from the command-line tools move them; code that writes versioned tables
+outside the services must call ``bump_version`` before it commits.
+"""
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.table_version import TableVersion
+
+
+async def bump_version(session: AsyncSession, *tables: str) -> dict[str, int]:
+    """
+    Record that ``tables`` changed, as part of ``session``'s transaction.
+
+    Returns the tables' new versions.
+    """
+    if not tables:
+        return {}
+    dialect = session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    table = TableVersion.__table__
+    statement = (
+        insert(table)
+        .on_conflict_do_update(
+            index_elements=[table.c.name], set_={"version": table.c.version + 1}
+        )
+        .returning(table.c.name, table.c.version)
+    )
+    result = await session.execute(
+        statement, [{"name": name, "version": 1} for name in sorted(set(tables))]
+    )
+    return dict(result.all())
+
+
+async def table_versions(
+    session: AsyncSession, tables: Iterable[str]
+) -> dict[str, int]:
+    """Current versions of ``tables``; a table never written is at 0."""
+    tables = tuple(tables)
+    statement = select(TableVersion.name, TableVersion.version).where(
+        TableVersion.name.in_(tables)
+    )
+    versions = dict((await session.execute(statement)).all())
+    return {table: versions.get(table, 0) for table in tables}
+
+
+def etag_for(versions: dict[str, int]) -> str:
+    """Strong ETag for a representation built from tables at ``versions``."""
+    return '"' + ".".join(str(version) for version in versions.values()) + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header against ``etag``."""
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
@@ -4,11 +4,29 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
-from app.api import alerts, auth, incidents, monitors
+from app.api import alerts, auth, incidents, monitors, stats
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import (
+    async_session,
+    init_db,
+    start_write_queue,
+    stop_write_queue,
+)
 from app.core.logging import logger
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from app.services.dispatch_service import start_alert_dispatcher, stop_alert_dispatcher
+from app.services.feed_service import get_broadcaster
+from app.services.hashing_service import shutdown_password_hasher
+from app.services.incident_index import (
+    load_open_incident_index,
+    unload_open_incident_index,
+)
+from app.services.monitor_registry import load_monitor_registry, unload_monitor_registry
+from app.services.probe_service import ProbeExecutor
+from app.services.scenario_service import shutdown_scenario_pool
+from app.services.scheduler_service import start_scheduler, stop_scheduler
 
 # Lifespan context manager
 @asynccontextmanager
@@ -17,8 +35,53 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up API Pulse...")
     await init_db()
     logger.info("Database initialized")
+    
+    async with async_session() as session:
+        registry = await load_monitor_registry(session)
+        open_incidents = await load_open_incident_index(session)
+    logger.info(f"Monitor registry loaded with {len(registry)} monitors")
+    logger.info(f"Open incident index loaded with {len(open_incidents)} incidents")
+    
+    if settings.WRITE_QUEUE_ENABLED:
+        start_write_queue(
+            settings.WRITE_QUEUE_MAX_BATCH,
+            settings.WRITE_QUEUE_MAX_DELAY_MS / 1000,
+        )
+        logger.info("Write queue started")
+    
+    probe_executor = None
+    if settings.SCHEDULER_ENABLED:
+        probe_executor = ProbeExecutor(
+            timeout=settings.PROBE_TIMEOUT_SECONDS,
+            max_connections_per_host=settings.PROBE_MAX_CONNECTIONS_PER_HOST,
+            dns_ttl=settings.PROBE_DNS_TTL_SECONDS,
+        )
+        async with async_session() as session:
+            scheduler = await start_scheduler(
+                session,
+                probe_executor.check,
+                settings.SCHEDULER_MAX_CONCURRENCY,
+            )
+        logger.info(f"Probe scheduler started with {len(scheduler)} monitors")
+    
+    if settings.ALERT_CHANNELS:
+        start_alert_dispatcher(async_session, settings.ALERT_CHANNELS)
+        logger.info(
+            f"Alert dispatcher started for channels: {', '.join(settings.ALERT_CHANNELS)}"
+        )
+    
     yield
     logger.info("Shutting down API Pulse...")
+    get_broadcaster().close()
+    await stop_alert_dispatcher()
+    await stop_scheduler()
+    if probe_executor is not None:
+        await probe_executor.aclose()
+    await stop_write_queue()
+    shutdown_password_hasher()
+    shutdown_scenario_pool()
+    unload_monitor_registry()
+    unload_open_incident_index()
 
 
 # Create FastAPI app
@@ -27,6 +90,7 @@ app = FastAPI(
     version=settings.APP_VERSION,
     description="Deterministic API failure simulation and incident tracking system",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -38,11 +102,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics; outermost, so the time includes the other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(monitors.router)
 app.include_router(incidents.router)
 app.include_router(alerts.router)
+app.include_router(stats.router)
 
 
 # Root endpoint
@@ -62,6 +131,12 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def metrics():
+    """Request, SQL and domain metrics in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
 
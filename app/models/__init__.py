@@ -1,7 +1,13 @@
 """Models module initialization."""
 from app.models.alert import Alert
+from app.models.alert_outbox import AlertOutbox
 from app.models.incident import Incident
+from app.models.incident_rollup import IncidentRollup
 from app.models.monitor import Monitor
+from app.models.table_version import TableVersion
 from app.models.user import User
 
-__all__ = ["User", "Monitor", "Incident", "Alert"]
+__all__ = [
+    "User", "Monitor", "Incident", "IncidentRollup", "Alert", "AlertOutbox",
+    "TableVersion",
+]
@@ -4,15 +4,21 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Optional
 
-from sqlmodel import Column, DateTime, Field, JSON, SQLModel
+from sqlmodel import Column, DateTime, Field, Index, JSON, SQLModel
+
+from app.core.clock import utcnow
 
 
 class Alert(SQLModel, table=True):
     """Alert model for tracking notifications."""
 
+    __table_args__ = (
+        Index("ix_alert_incident_id_created_at", "incident_id", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    incident_id: int = Field(foreign_key="incident.id", index=True)
+    incident_id: int = Field(foreign_key="incident.id")
     payload: dict[str, Any] = Field(sa_column=Column(JSON))
     created_at: datetime = Field(
-        default_factory=datetime.utcnow, sa_column=Column(DateTime)
+        default_factory=utcnow, sa_column=Column(DateTime)
     )
@@ -0,0 +1,44 @@
+"""Alert outbox database model."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Column, DateTime, Field, Index, SQLModel
+
+from app.core.clock import utcnow
+
+
+class AlertOutbox(SQLModel, table=True):
+    """A pending or finished delivery of one alert to one channel.
+
+    Rows are inserted in the same transaction as their alert, so an alert
+    is never committed without its deliveries. ``next_attempt_at`` is
+    pushed forward both to back off after a failure and to lease a row
+    while a delivery is in flight; a row leased by a process that died is
+    picked up again once the lease runs out.
+    """
+
+    __tablename__ = "alert_outbox"
+    # Workers poll for due rows of one channel, oldest first
+    __table_args__ = (
+        Index(
+            "ix_alert_outbox_channel_status_next_attempt_at",
+            "channel",
+            "status",
+            "next_attempt_at",
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    alert_id: int = Field(foreign_key="alert.id")
+    channel: str
+    status: str = Field(default="pending")  # pending, delivered, failed
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(
+        default_factory=utcnow, sa_column=Column(DateTime)
+    )
+    last_error: Optional[str] = None
+    delivered_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime)
+    )
@@ -4,19 +4,44 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlmodel import Column, DateTime, Field, SQLModel
+from sqlmodel import Column, DateTime, Field, Index, SQLModel
+
+from app.core.clock import utcnow
 
 
 class Incident(SQLModel, table=True):
     """Incident model for tracking failures."""
 
+    # Composite indexes match the filters of list_incidents and the uptime
+    # queries; each ends in started_at (then rowid) so newest-first ordering
+    # is read straight from the index instead of a temporary sort.
+    __table_args__ = (
+        Index(
+            "ix_incident_monitor_id_status_started_at",
+            "monitor_id",
+            "status",
+            "started_at",
+        ),
+        Index("ix_incident_monitor_id_started_at", "monitor_id", "started_at"),
+        Index("ix_incident_status_started_at", "status", "started_at"),
+        Index("ix_incident_started_at", "started_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    monitor_id: int = Field(foreign_key="monitor.id", index=True)
-    status: str = Field(default="open", index=True)  # open, resolved
+    monitor_id: int = Field(foreign_key="monitor.id")
+    status: str = Field(default="open")  # open, resolved
     error_type: str  # timeout, 500, latency
     started_at: datetime = Field(
-        default_factory=datetime.utcnow, sa_column=Column(DateTime)
+        default_factory=utcnow, sa_column=Column(DateTime)
     )
     resolved_at: Optional[datetime] = Field(
         default=None, sa_column=Column(DateTime)
     )
+    # Repeated failures coalesced into this incident when deduplication is on
+    occurrences: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+    last_seen_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime)
+    )
+    last_alerted_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime)
+    )
@@ -0,0 +1,42 @@
+"""Incident rollup database model."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlmodel import Column, DateTime, Field, Index, SQLModel
+
+
+class IncidentRollup(SQLModel, table=True):
+    """Hourly incident counters per monitor and error type.
+
+    Incidents are bucketed by ``started_at``; resolutions are credited to
+    the bucket the incident started in, so ``opened - resolved`` is the
+    number of incidents from that hour still open.
+    """
+
+    __tablename__ = "incident_rollup"
+    # Bucket listings are ordered by time; only inserting a new bucket
+    # touches these, the per-incident upserts update counters in place.
+    __table_args__ = (
+        Index(
+            "ix_incident_rollup_bucket_start_monitor_id_error_type",
+            "bucket_start",
+            "monitor_id",
+            "error_type",
+        ),
+        Index(
+            "ix_incident_rollup_monitor_id_bucket_start_error_type",
+            "monitor_id",
+            "bucket_start",
+            "error_type",
+        ),
+    )
+
+    monitor_id: int = Field(foreign_key="monitor.id", primary_key=True)
+    error_type: str = Field(primary_key=True)
+    bucket_start: datetime = Field(
+        sa_column=Column(DateTime, primary_key=True)
+    )
+    opened: int = Field(default=0)
+    resolved: int = Field(default=0)
+    resolution_seconds: float = Field(default=0.0)
@@ -6,6 +6,8 @@ from typing import Optional
 
 from sqlmodel import Column, DateTime, Field, SQLModel
 
+from app.core.clock import utcnow
+
 
 class Monitor(SQLModel, table=True):
     """Monitor model for tracking API endpoints."""
@@ -17,5 +19,5 @@ class Monitor(SQLModel, table=True):
     check_interval: int = Field(default=60)  # seconds
     is_active: bool = Field(default=True)
     created_at: datetime = Field(
-        default_factory=datetime.utcnow, sa_column=Column(DateTime)
+        default_factory=utcnow, sa_column=Column(DateTime)
     )
@@ -0,0 +1,18 @@
+"""Table change-version database model."""
+from __future__ import annotations
+
+from sqlmodel import Field, SQLModel
+
+
+class TableVersion(SQLModel, table=True):
+    """Change counter of one table.
+
+    Every write to a versioned table increments its row in the same
+    transaction, so the counter is shared by all processes using the
+    database and changes exactly when committed data does.
+    """
+
+    __tablename__ = "table_version"
+
+    name: str = Field(primary_key=True)
+    version: int = Field(default=0)
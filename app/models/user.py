@@ -6,6 +6,8 @@ from typing import Optional
 
 from sqlmodel import Column, DateTime, Field, SQLModel
 
+from app.core.clock import utcnow
+
 
 class User(SQLModel, table=True):
     """User model for authentication."""
@@ -14,5 +16,5 @@ class User(SQLModel, table=True):
     email: str = Field(unique=True, index=True)
     hashed_password: str
     created_at: datetime = Field(
-        default_factory=datetime.utcnow, sa_column=Column(DateTime)
+        default_factory=utcnow, sa_column=Column(DateTime)
     )
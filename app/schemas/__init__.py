@@ -5,7 +5,9 @@ from app.schemas.monitor import (
     MonitorCreate,
     MonitorResponse,
     MonitorUpdate,
+    MonitorUptimeResponse,
 )
+from app.schemas.stats import IncidentBucketResponse, IncidentSummaryResponse
 from app.schemas.user import TokenResponse, UserCreate, UserLogin, UserResponse
 
 __all__ = [
@@ -16,10 +18,13 @@ __all__ = [
     "MonitorCreate",
     "MonitorResponse",
     "MonitorUpdate",
+    "MonitorUptimeResponse",
     "IncidentCreate",
     "IncidentResponse",
     "IncidentResolve",
     "AlertCreate",
     "AlertResponse",
     "TestAlertResponse",
+    "IncidentBucketResponse",
+    "IncidentSummaryResponse",
 ]
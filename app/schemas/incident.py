@@ -33,6 +33,8 @@ class IncidentResponse(IncidentBase):
     monitor_id: int
     started_at: datetime
     resolved_at: Optional[datetime] = None
+    occurrences: int = 1
+    last_seen_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
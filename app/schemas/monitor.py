@@ -39,3 +39,22 @@ class MonitorResponse(MonitorBase):
 
     class Config:
         from_attributes = True
+
+
+class MonitorUptimeResponse(BaseModel):
+    """Schema for a monitor's availability over a time window."""
+
+    monitor_id: int
+    window_start: datetime
+    window_end: datetime
+    uptime_percent: float
+    downtime_seconds: float
+    incident_count: int
+    slo_target_percent: float
+    error_budget_seconds: float
+    error_budget_remaining_seconds: float
+    error_budget_burn: float
+    mttr_seconds: Optional[float] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,74 @@
+"""Failure scenario schemas for API."""
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class ScenarioPhase(BaseModel):
+    """
+    One failure pattern within a scenario.
+
+    - ``outage``: the selected monitors fail together and recover together
+    - ``degradation``: latency ramps from baseline to peak; each monitor
+      fails once its latency crosses the threshold
+    - ``cascade``: failures start on a few monitors and spread in waves,
+      each ``spread_factor`` times larger, every ``hop_seconds``
+    """
+
+    kind: Literal["outage", "degradation", "cascade"]
+    # Defaults to timeout (outage), latency (degradation) or 500 (cascade)
+    failure_type: Optional[str] = None
+    start_seconds: float = Field(default=0.0, ge=0)
+    duration_seconds: float = Field(gt=0)
+    # Share of the targeted monitors the phase hits
+    fraction: float = Field(default=1.0, gt=0, le=1)
+    # Targeted monitors (default: all)
+    monitor_ids: Optional[list[int]] = None
+    # Each monitor's start and recovery are delayed by up to this much
+    jitter_seconds: float = Field(default=0.0, ge=0)
+
+    # degradation
+    baseline_latency_ms: int = Field(default=200, ge=0)
+    peak_latency_ms: int = Field(default=5000, gt=0)
+    threshold_latency_ms: int = Field(default=2000, gt=0)
+
+    # cascade
+    initial_fraction: float = Field(default=0.01, gt=0, le=1)
+    spread_factor: float = Field(default=2.0, ge=1)
+    hop_seconds: float = Field(default=60.0, gt=0)
+
+    @model_validator(mode="after")
+    def _default_failure_type(self) -> "ScenarioPhase":
+        if self.failure_type is None:
+            self.failure_type = {
+                "outage": "timeout", "degradation": "latency", "cascade": "500"
+            }[self.kind]
+        return self
+
+
+class ScenarioDefinition(BaseModel):
+    """A named, seeded set of failure phases."""
+
+    name: str
+    seed: int = 0
+    # Scenario start; by default it is placed so the last phase ends now
+    start: Optional[datetime] = None
+    phases: list[ScenarioPhase] = Field(min_length=1)
+
+
+class ScenarioResult(BaseModel):
+    """What applying a scenario wrote."""
+
+    name: str
+    start: datetime
+    end: datetime
+    monitors: int
+    incidents: int
+    alerts: int
+    open_incidents: int
+    # Failures added to an open incident instead of opening their own
+    coalesced: int = 0
+    # Failures applied per phase, in definition order; without dedup, each
+    # is an incident of its own
+    phase_incidents: list[int]
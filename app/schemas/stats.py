@@ -0,0 +1,30 @@
+"""Statistics schemas for API."""
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class IncidentBucketResponse(BaseModel):
+    """Schema for one hourly incident bucket."""
+
+    monitor_id: int
+    error_type: str
+    bucket_start: datetime
+    opened: int
+    resolved: int
+    resolution_seconds: float
+
+    class Config:
+        from_attributes = True
+
+
+class IncidentSummaryResponse(BaseModel):
+    """Schema for incident totals per monitor and error type."""
+
+    monitor_id: int
+    error_type: str
+    opened: int
+    resolved: int
+    open: int
+    mean_time_to_resolve_seconds: Optional[float] = None
@@ -1,8 +1,10 @@
 """Services module initialization."""
 from app.services.alert_service import (
     create_alert,
+    create_test_alert,
     get_alert,
     list_alerts,
+    stream_alert_rows,
 )
 from app.services.auth_service import (
     authenticate_user,
@@ -23,7 +25,13 @@ from app.services.monitor_service import (
     list_monitors,
     update_monitor,
 )
-from app.services.simulation_service import simulate_failure
+from app.services.simulation_service import simulate_failure, simulate_failures_bulk
+from app.services.stats_service import (
+    list_incident_buckets,
+    rebuild_incident_rollups,
+    summarize_incidents,
+)
+from app.services.uptime_service import get_uptime_report, get_uptime_reports
 
 __all__ = [
     "create_user",
@@ -40,7 +48,15 @@ __all__ = [
     "list_incidents",
     "resolve_incident",
     "create_alert",
+    "create_test_alert",
     "get_alert",
     "list_alerts",
+    "stream_alert_rows",
     "simulate_failure",
+    "simulate_failures_bulk",
+    "list_incident_buckets",
+    "summarize_incidents",
+    "rebuild_incident_rollups",
+    "get_uptime_report",
+    "get_uptime_reports",
 ]
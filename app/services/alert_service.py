@@ -1,24 +1,107 @@
 """Alert service."""
-from typing import List, Optional
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple
 
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core.clock import utcnow
+from app.core.database import run_write
+from app.core.metrics import ALERTS_CREATED, INCIDENTS_CREATED
+from app.core.versions import bump_version
 from app.models.alert import Alert
+from app.models.incident import Incident
+from app.models.monitor import Monitor
 from app.schemas.alert import AlertCreate
+from app.services.dispatch_service import enqueue_alerts, notify_alert_dispatcher
+from app.services.feed_service import publish_alert_created, publish_incident_created
+from app.services.incident_index import remember_open_incident
+from app.services.monitor_registry import get_monitor_registry, sync_monitor_registry
+from app.services.stats_service import record_incidents_opened
+from app.services.uptime_service import invalidate_uptime
 
 
 async def create_alert(
     session: AsyncSession, alert_create: AlertCreate
 ) -> Alert:
     """Create a new alert."""
-    alert = Alert(**alert_create.model_dump())
-    session.add(alert)
-    await session.commit()
-    await session.refresh(alert)
+    async def add(write_session: AsyncSession) -> Alert:
+        alert = Alert(**alert_create.model_dump())
+        write_session.add(alert)
+        await write_session.flush()
+        await enqueue_alerts(write_session, [alert.id])
+        await bump_version(write_session, "alert")
+        return alert
+    
+    alert = await run_write(session, add)
+    notify_alert_dispatcher()
+    ALERTS_CREATED.inc()
+    publish_alert_created(alert.id, alert.incident_id, alert.created_at, alert.payload)
     return alert
 
 
+async def create_test_alert(
+    session: AsyncSession,
+) -> Optional[Tuple[Alert, dict[str, Any]]]:
+    """
+    Create a test incident and alert against the first monitor.
+    
+    Returns None when there are no monitors to attach the test alert to.
+    """
+    registry = get_monitor_registry()
+    if registry is not None:
+        await sync_monitor_registry(session, registry)
+        monitor = registry.first()
+    else:
+        statement = select(Monitor).order_by(Monitor.id).limit(1)
+        result = await session.execute(statement)
+        monitor = result.scalars().first()
+    if not monitor:
+        return None
+    
+    test_payload: dict[str, Any] = {
+        "type": "test",
+        "message": "This is a test alert",
+        "monitor_id": monitor.id,
+        "monitor_name": monitor.name,
+    }
+    
+    async def add(write_session: AsyncSession) -> Alert:
+        now = utcnow()
+        incident = Incident(
+            monitor_id=monitor.id,
+            error_type="test",
+            status="open",
+            started_at=now,
+            last_seen_at=now,
+            last_alerted_at=now,
+        )
+        write_session.add(incident)
+        await write_session.flush()
+        await record_incidents_opened(
+            write_session, [(monitor.id, "test", incident.started_at)]
+        )
+        
+        alert = Alert(incident_id=incident.id, payload=test_payload, created_at=now)
+        write_session.add(alert)
+        await write_session.flush()
+        await enqueue_alerts(write_session, [alert.id])
+        await bump_version(write_session, "incident", "alert", "incident_rollup")
+        remember_open_incident(write_session, monitor.id, "test", incident.id, now)
+        return alert
+    
+    alert = await run_write(session, add)
+    invalidate_uptime(monitor.id)
+    notify_alert_dispatcher()
+    INCIDENTS_CREATED.inc()
+    ALERTS_CREATED.inc()
+    publish_incident_created(
+        alert.incident_id, monitor.id, "test", "open", alert.created_at
+    )
+    publish_alert_created(alert.id, alert.incident_id, alert.created_at, test_payload)
+    return alert, test_payload
+
+
 async def get_alert(session: AsyncSession, alert_id: int) -> Optional[Alert]:
     """Get alert by ID."""
     return await session.get(Alert, alert_id)
@@ -29,3 +112,34 @@ async def list_alerts(session: AsyncSession) -> List[Alert]:
     statement = select(Alert)
     result = await session.execute(statement)
     return result.scalars().all()
+
+
+async def list_alert_rows(session: AsyncSession, fields: Sequence[str]) -> List[Row]:
+    """
+    List alerts as plain row tuples of just the ``fields`` columns.
+
+    Leaving out ``payload`` means SQLite never reads or decodes the JSON
+    blobs, and no ORM entities are built.
+    """
+    statement = select(*(getattr(Alert, name) for name in fields))
+    result = await session.execute(statement)
+    return result.all()
+
+
+async def stream_alert_rows(
+    session: AsyncSession, chunk_size: int = 1000
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Stream alerts as plain row tuples in chunks of ``chunk_size``.
+
+    Rows are read through a server-side cursor and never hydrated into ORM
+    entities, so memory stays bounded by one chunk regardless of table size.
+    """
+    statement = (
+        select(Alert.id, Alert.incident_id, Alert.created_at, Alert.payload)
+        .order_by(Alert.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    result = await session.stream(statement)
+    async for partition in result.partitions():
+        yield partition
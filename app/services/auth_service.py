@@ -5,9 +5,13 @@ from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.versions import bump_version
 from app.models.user import User
 from app.schemas.user import UserCreate
+from app.services.hashing_service import get_password_hasher
 
 
 async def get_user_by_email(
@@ -19,15 +23,43 @@ async def get_user_by_email(
     return result.scalars().first()
 
 
+# Short-lived user lookups for the authenticated-request path
+user_cache: TTLCache[str, User] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+async def get_user_by_email_cached(
+    session: AsyncSession, email: str
+) -> Optional[User]:
+    """Get user by email, served from a short-TTL cache when possible."""
+    user = user_cache.get(email)
+    if user is not None:
+        return user
+    
+    user = await get_user_by_email(session, email)
+    if user is not None:
+        user_cache.set(email, user)
+    return user
+
+
+def invalidate_user(email: str) -> None:
+    """Drop a user from the cache after it changes."""
+    user_cache.invalidate(email)
+
+
 async def create_user(
     session: AsyncSession, user_create: UserCreate
 ) -> User:
     """Create a new user."""
-    hashed_password = hash_password(user_create.password)
+    hashed_password = await get_password_hasher().hash(user_create.password)
     user = User(email=user_create.email, hashed_password=hashed_password)
     session.add(user)
+    await bump_version(session, "user")
     await session.commit()
     await session.refresh(user)
+    invalidate_user(user.email)
     return user
 
 
@@ -35,11 +67,23 @@ async def authenticate_user(
     session: AsyncSession, email: str, password: str
 ) -> Optional[User]:
     """Authenticate user by email and password."""
+    hasher = get_password_hasher()
     user = await get_user_by_email(session, email)
     if not user:
+        # Same cost as a real check so response time does not reveal accounts
+        await hasher.dummy_verify(password)
         return None
-    if not verify_password(password, user.hashed_password):
+    
+    valid, new_hash = await hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        # Stored hash used an outdated cost factor
+        user.hashed_password = new_hash
+        session.add(user)
+        await bump_version(session, "user")
+        await session.commit()
+        invalidate_user(user.email)
     return user
 
 
@@ -0,0 +1,387 @@
+"""Alert dispatch service.
+
+Alerts reach their channels through a transactional outbox. Every write
+path that creates an alert also inserts one ``AlertOutbox`` row per
+configured channel in the same transaction, then wakes the dispatcher;
+requests never wait on delivery.
+
+The dispatcher claims due rows of each channel in batches by leasing them
+(``next_attempt_at`` is pushed past the delivery timeout in one
+``UPDATE ... RETURNING``) and delivers each batch as one webhook request on
+a bounded pool of tasks. A delivered batch is marked as such; a failed one
+is retried with exponential backoff and jitter until it runs out of
+attempts and is marked failed. Every step is committed, so a restart
+resumes where the previous process stopped: delivery is at-least-once.
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Iterable, Mapping, Optional, Sequence
+
+import httpx
+import orjson
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.alert import Alert
+from app.models.alert_outbox import AlertOutbox
+
+# Delivers one batch of alerts: (channel, url, alerts); raises on failure
+Sender = Callable[[str, str, list[dict[str, Any]]], Awaitable[None]]
+
+
+async def enqueue_alerts(
+    session: AsyncSession,
+    alert_ids: Sequence[int],
+    channels: Optional[Iterable[str]] = None,
+) -> None:
+    """
+    Queue ``alert_ids`` for delivery on every channel (the configured
+    ``ALERT_CHANNELS`` by default). Runs inside the caller's transaction.
+    """
+    channels = list(settings.ALERT_CHANNELS if channels is None else channels)
+    if not channels or not alert_ids:
+        return
+    now = utcnow()
+    await session.execute(
+        insert(AlertOutbox.__table__),
+        [
+            {
+                "alert_id": alert_id,
+                "channel": channel,
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+            }
+            for alert_id in alert_ids
+            for channel in channels
+        ],
+    )
+
+
+async def summarize_outbox(session: AsyncSession) -> list[dict]:
+    """Row counts per channel and delivery status."""
+    statement = (
+        select(AlertOutbox.channel, AlertOutbox.status, func.count().label("count"))
+        .group_by(AlertOutbox.channel, AlertOutbox.status)
+        .order_by(AlertOutbox.channel, AlertOutbox.status)
+    )
+    result = await session.execute(statement)
+    return [
+        {"channel": row.channel, "status": row.status, "count": row.count}
+        for row in result
+    ]
+
+
+class WebhookSender:
+    """Posts alert batches as JSON over pooled keep-alive connections."""
+
+    def __init__(self, timeout: float = 10.0) -> None:
+        self._client = httpx.AsyncClient(timeout=httpx.Timeout(timeout))
+
+    async def __call__(
+        self, channel: str, url: str, alerts: list[dict[str, Any]]
+    ) -> None:
+        response = await self._client.post(
+            url,
+            content=orjson.dumps({"channel": channel, "alerts": alerts}),
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self._client.aclose()
+
+
+class AlertDispatcher:
+    """Background worker pool draining the alert outbox."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        channels: Mapping[str, str],
+        send: Sender,
+        *,
+        batch_size: int = 100,
+        max_in_flight: int = 8,
+        max_attempts: int = 8,
+        backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        timeout: float = 10.0,
+        poll_interval: float = 1.0,
+        clock: Callable[[], datetime] = utcnow,
+    ) -> None:
+        self._session_factory = session_factory
+        self._channels = dict(channels)
+        self._send = send
+        self._batch_size = batch_size
+        self._max_attempts = max_attempts
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._timeout = timeout
+        # A lease outlives the delivery attempt it covers
+        self._lease = timedelta(seconds=timeout * 2)
+        self._poll_interval = poll_interval
+        self._clock = clock
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._in_flight: set[asyncio.Task] = set()
+        self.batches = 0
+        self.delivered = 0
+        self.retried = 0
+        self.failed = 0
+
+    def notify(self) -> None:
+        """Wake the dispatcher after new alerts were committed."""
+        self._wakeup.set()
+
+    def start(self) -> None:
+        """Start the dispatch loop."""
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop claiming batches and wait for in-flight deliveries."""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def stats(self) -> dict[str, int]:
+        """Return delivery counters and the number of batches in flight."""
+        return {
+            "batches": self.batches,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "failed": self.failed,
+            "in_flight": len(self._in_flight),
+        }
+
+    def retry_delay(self, attempts: int) -> float:
+        """Seconds before retry number ``attempts``: doubling, capped, jittered."""
+        delay = min(self._max_backoff, self._backoff * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _run(self) -> None:
+        """Claim a batch per channel in turn while slots are free."""
+        while True:
+            self._wakeup.clear()
+            claimed = False
+            for channel in self._channels:
+                await self._slots.acquire()
+                try:
+                    batch = await self._claim(channel)
+                except Exception:
+                    logger.exception(f"Claiming alerts for channel {channel} failed")
+                    batch = []
+                if not batch:
+                    self._slots.release()
+                    continue
+                claimed = True
+                task = asyncio.create_task(self._deliver(channel, batch))
+                self._in_flight.add(task)
+                task.add_done_callback(self._on_delivery_done)
+
+            if not claimed:
+                # Nothing due: sleep until new alerts arrive or retries fall due
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _claim(self, channel: str) -> list[tuple[int, int, dict[str, Any]]]:
+        """
+        Lease up to ``batch_size`` due rows of ``channel``. Returns
+        ``(outbox_id, attempts, alert)`` tuples, oldest first.
+        """
+        now = self._clock()
+        table = AlertOutbox.__table__
+        due = (
+            select(table.c.id)
+            .where(
+                table.c.channel == channel,
+                table.c.status == "pending",
+                table.c.next_attempt_at <= now,
+            )
+            .order_by(table.c.next_attempt_at, table.c.id)
+            .limit(self._batch_size)
+        )
+        statement = (
+            update(table)
+            .where(table.c.id.in_(due.scalar_subquery()))
+            .values(next_attempt_at=now + self._lease)
+            .returning(table.c.id, table.c.alert_id, table.c.attempts)
+        )
+        async with self._session_factory() as session:
+            leased = sorted((await session.execute(statement)).all())
+            alerts = {}
+            if leased:
+                result = await session.execute(
+                    select(
+                        Alert.id, Alert.incident_id, Alert.created_at, Alert.payload
+                    ).where(Alert.id.in_({row.alert_id for row in leased}))
+                )
+                alerts = {row.id: row._asdict() for row in result}
+            # SQLite does not enforce the foreign key, so an alert can be
+            # gone; its rows could never be delivered and would block the
+            # channel, so they fail for good
+            orphaned = [row.id for row in leased if row.alert_id not in alerts]
+            if orphaned:
+                await session.execute(
+                    update(table)
+                    .where(table.c.id.in_(orphaned))
+                    .values(status="failed", last_error="alert not found")
+                )
+                self.failed += len(orphaned)
+            await session.commit()
+        return [
+            (row.id, row.attempts, alerts[row.alert_id])
+            for row in leased
+            if row.alert_id in alerts
+        ]
+
+    async def _deliver(
+        self, channel: str, batch: list[tuple[int, int, dict[str, Any]]]
+    ) -> None:
+        """Send one batch and record the outcome."""
+        try:
+            await asyncio.wait_for(
+                self._send(channel, self._channels[channel], [a for _, _, a in batch]),
+                timeout=self._timeout,
+            )
+        except Exception as exc:
+            error = "timeout" if isinstance(exc, asyncio.TimeoutError) else (
+                f"{type(exc).__name__}: {exc}"
+            )
+            logger.warning(
+                f"Delivery of {len(batch)} alerts to {channel} failed: {error}"
+            )
+            await self._record(self._failure_updates(batch, error))
+        else:
+            await self._record(self._success_updates(batch))
+        self.batches += 1
+
+    def _success_updates(self, batch) -> list[dict[str, Any]]:
+        now = self._clock()
+        self.delivered += len(batch)
+        return [
+            {
+                "row_id": outbox_id,
+                "new_status": "delivered",
+                "new_attempts": attempts + 1,
+                "new_next_attempt_at": now,
+                "new_last_error": None,
+                "new_delivered_at": now,
+            }
+            for outbox_id, attempts, _ in batch
+        ]
+
+    def _failure_updates(self, batch, error: str) -> list[dict[str, Any]]:
+        now = self._clock()
+        updates = []
+        for outbox_id, attempts, _ in batch:
+            attempts += 1
+            exhausted = attempts >= self._max_attempts
+            if exhausted:
+                self.failed += 1
+            else:
+                self.retried += 1
+            updates.append({
+                "row_id": outbox_id,
+                "new_status": "failed" if exhausted else "pending",
+                "new_attempts": attempts,
+                "new_next_attempt_at": (
+                    now if exhausted
+                    else now + timedelta(seconds=self.retry_delay(attempts))
+                ),
+                "new_last_error": error,
+                "new_delivered_at": None,
+            })
+        return updates
+
+    async def _record(self, updates: list[dict[str, Any]]) -> None:
+        """
+        Persist delivery outcomes. If this fails the rows stay leased and
+        are delivered again once the lease expires.
+        """
+        table = AlertOutbox.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values(
+                status=bindparam("new_status"),
+                attempts=bindparam("new_attempts"),
+                next_attempt_at=bindparam("new_next_attempt_at"),
+                last_error=bindparam("new_last_error"),
+                delivered_at=bindparam("new_delivered_at"),
+            )
+        )
+        try:
+            async with self._session_factory() as session:
+                await session.execute(statement, updates)
+                await session.commit()
+        except Exception:
+            logger.exception(f"Recording {len(updates)} delivery outcomes failed")
+
+    def _on_delivery_done(self, task: asyncio.Task) -> None:
+        self._in_flight.discard(task)
+        self._slots.release()
+
+
+# Dispatcher started by the application lifespan when channels are configured
+_dispatcher: Optional[AlertDispatcher] = None
+_sender: Optional[WebhookSender] = None
+
+
+def get_alert_dispatcher() -> Optional[AlertDispatcher]:
+    """Return the running dispatcher, if any."""
+    return _dispatcher
+
+
+def notify_alert_dispatcher() -> None:
+    """Wake the running dispatcher, if any, after alerts were committed."""
+    if _dispatcher is not None:
+        _dispatcher.notify()
+
+
+def start_alert_dispatcher(
+    session_factory: Callable[[], AsyncSession], channels: Mapping[str, str]
+) -> AlertDispatcher:
+    """Create and start the application dispatcher with a webhook sender."""
+    global _dispatcher, _sender
+    _sender = WebhookSender(timeout=settings.ALERT_DISPATCH_TIMEOUT_SECONDS)
+    _dispatcher = AlertDispatcher(
+        session_factory,
+        channels,
+        _sender,
+        batch_size=settings.ALERT_DISPATCH_BATCH_SIZE,
+        max_in_flight=settings.ALERT_DISPATCH_MAX_IN_FLIGHT,
+        max_attempts=settings.ALERT_DISPATCH_MAX_ATTEMPTS,
+        backoff=settings.ALERT_DISPATCH_BACKOFF_SECONDS,
+        max_backoff=settings.ALERT_DISPATCH_MAX_BACKOFF_SECONDS,
+        timeout=settings.ALERT_DISPATCH_TIMEOUT_SECONDS,
+        poll_interval=settings.ALERT_DISPATCH_POLL_SECONDS,
+    )
+    _dispatcher.start()
+    return _dispatcher
+
+
+async def stop_alert_dispatcher() -> None:
+    """Stop the application dispatcher and close its connections."""
+    global _dispatcher, _sender
+    if _dispatcher is not None:
+        await _dispatcher.stop()
+        _dispatcher = None
+    if _sender is not None:
+        await _sender.aclose()
+        _sender = None
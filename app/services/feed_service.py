@@ -0,0 +1,266 @@
+"""Live incident feed.
+
+An in-process publish/subscribe broadcaster. Services publish incident and
+alert events after their writes commit; every event is serialized once and
+fanned out to subscriber queues in memory, so subscribers add no database
+load however many there are.
+
+Each subscriber has a bounded queue. When a slow consumer's queue is full
+the oldest event is dropped and the subscriber is told with a ``reset``
+event, after which it should refetch ``GET /incidents``. Recent events are
+kept in a ring buffer so a reconnecting client can resume after the last
+event id it saw; ids carry a per-process epoch, so an id from before a
+restart (or from another worker) also yields a ``reset``.
+"""
+import asyncio
+import secrets
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
+
+import orjson
+
+from app.core.config import settings
+
+_epoch = secrets.token_hex(4)
+
+
+@dataclass(frozen=True, slots=True)
+class FeedEvent:
+    """One published event, already encoded for the wire."""
+
+    sequence: int
+    type: str
+    data: bytes  # JSON
+
+    @property
+    def id(self) -> str:
+        """Event id; resuming after it replays the events that follow."""
+        return f"{_epoch}-{self.sequence}"
+
+    def sse(self) -> bytes:
+        """The event as a Server-Sent Events frame."""
+        return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+            self.id.encode(), self.type.encode(), self.data
+        )
+
+    def json(self) -> bytes:
+        """The event as one JSON message."""
+        return b'{"id":"%s","event":"%s","data":%s}' % (
+            self.id.encode(), self.type.encode(), self.data
+        )
+
+
+def _reset_event(sequence: int, reason: str) -> FeedEvent:
+    """
+    Tell a subscriber it missed events. Its id is the point after which
+    the events still to be delivered follow, so resuming from it is safe
+    once the client has refetched.
+    """
+    return FeedEvent(sequence, "reset", orjson.dumps({"reason": reason}))
+
+
+class Subscription:
+    """A subscriber's bounded queue of pending events."""
+
+    def __init__(self, broadcaster: "Broadcaster", maxsize: int) -> None:
+        self._broadcaster = broadcaster
+        self._queue: deque[FeedEvent] = deque(maxlen=maxsize)
+        self._ready = asyncio.Event()
+        self._reset: Optional[str] = None
+        self.closed = False
+        self.dropped = 0
+
+    def _push(self, event: FeedEvent) -> None:
+        if len(self._queue) == self._queue.maxlen:
+            # The deque drops the oldest event on append
+            self.dropped += 1
+            self._broadcaster.dropped += 1
+            self._reset = "dropped"
+        self._queue.append(event)
+        self._ready.set()
+
+    async def get(self) -> Optional[FeedEvent]:
+        """Wait for the next event; None once the subscription is closed."""
+        while not self._queue and self._reset is None and not self.closed:
+            self._ready.clear()
+            await self._ready.wait()
+        if self._reset is not None:
+            reason, self._reset = self._reset, None
+            if self._queue:
+                sequence = self._queue[0].sequence - 1
+            else:
+                sequence = self._broadcaster.sequence
+            return _reset_event(sequence, reason)
+        if not self._queue:
+            return None
+        return self._queue.popleft()
+
+    async def __aiter__(self) -> AsyncIterator[FeedEvent]:
+        while (event := await self.get()) is not None:
+            yield event
+
+    def close(self) -> None:
+        """Unsubscribe and wake any waiting reader."""
+        if not self.closed:
+            self.closed = True
+            self._broadcaster._subscribers.discard(self)
+            self._ready.set()
+
+
+class Broadcaster:
+    """Fans published events out to every subscription."""
+
+    def __init__(self, history_size: int = 1000, queue_size: int = 256) -> None:
+        self._history: deque[FeedEvent] = deque(maxlen=history_size)
+        self._queue_size = queue_size
+        self._subscribers: set[Subscription] = set()
+        self._sequence = 0
+        self.published = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the latest event."""
+        return self._sequence
+
+    def publish(self, type: str, data: dict[str, Any]) -> FeedEvent:
+        """Encode an event once and queue it for every subscriber."""
+        self._sequence += 1
+        event = FeedEvent(self._sequence, type, orjson.dumps(data))
+        self._history.append(event)
+        self.published += 1
+        for subscription in self._subscribers:
+            subscription._push(event)
+        return event
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Start a subscription. With ``last_event_id``, events published
+        after it are replayed first, or a ``reset`` is queued if they are
+        no longer in the history.
+        """
+        subscription = Subscription(self, self._queue_size)
+        if last_event_id:
+            missed = self._since(last_event_id)
+            if missed is None:
+                subscription._reset = "expired"
+                subscription._ready.set()
+            else:
+                for event in missed:
+                    subscription._push(event)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def _since(self, last_event_id: str) -> Optional[list[FeedEvent]]:
+        """Events after ``last_event_id``, or None if they cannot be replayed."""
+        epoch, _, sequence = last_event_id.partition("-")
+        if epoch != _epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence > self._sequence:
+            return None
+        oldest = self._sequence - len(self._history) + 1
+        # Everything after ``sequence`` must still be in the history
+        if sequence + 1 < oldest:
+            return None
+        return list(self._history)[sequence + 1 - oldest:]
+
+    def close(self) -> None:
+        """End every subscription, e.g. at shutdown."""
+        for subscription in list(self._subscribers):
+            subscription.close()
+
+    def stats(self) -> dict[str, int]:
+        """Subscriber count and event counters."""
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "history": len(self._history),
+            "dropped": self.dropped,
+        }
+
+
+_broadcaster = Broadcaster(settings.FEED_HISTORY_SIZE, settings.FEED_QUEUE_SIZE)
+
+
+def get_broadcaster() -> Broadcaster:
+    """Return the application broadcaster."""
+    return _broadcaster
+
+
+def publish_incident_created(
+    incident_id: int,
+    monitor_id: int,
+    error_type: str,
+    status: str,
+    started_at: datetime,
+    occurrences: int = 1,
+) -> None:
+    """Announce a new incident."""
+    _broadcaster.publish("incident.created", {
+        "id": incident_id,
+        "monitor_id": monitor_id,
+        "error_type": error_type,
+        "status": status,
+        "started_at": started_at,
+        "occurrences": occurrences,
+    })
+
+
+def publish_incident_updated(
+    incident_id: int,
+    monitor_id: int,
+    error_type: str,
+    occurrences: int,
+    last_seen_at: datetime,
+) -> None:
+    """Announce repeated failures coalesced into an open incident."""
+    _broadcaster.publish("incident.updated", {
+        "id": incident_id,
+        "monitor_id": monitor_id,
+        "error_type": error_type,
+        "occurrences": occurrences,
+        "last_seen_at": last_seen_at,
+    })
+
+
+def publish_incident_resolved(
+    incident_id: int, monitor_id: int, error_type: str, resolved_at: datetime
+) -> None:
+    """Announce a resolved incident."""
+    _broadcaster.publish("incident.resolved", {
+        "id": incident_id,
+        "monitor_id": monitor_id,
+        "error_type": error_type,
+        "status": "resolved",
+        "resolved_at": resolved_at,
+    })
+
+
+def publish_scenario_applied(name: str, incidents: int, open_incidents: int) -> None:
+    """
+    Announce a failure scenario written in bulk. Its incidents and alerts
+    are not announced one by one; subscribers should refetch.
+    """
+    _broadcaster.publish("scenario.applied", {
+        "name": name,
+        "incidents": incidents,
+        "open_incidents": open_incidents,
+    })
+
+
+def publish_alert_created(
+    alert_id: int, incident_id: int, created_at: datetime, payload: dict[str, Any]
+) -> None:
+    """Announce a new alert."""
+    _broadcaster.publish("alert.created", {
+        "id": alert_id,
+        "incident_id": incident_id,
+        "created_at": created_at,
+        "payload": payload,
+    })
@@ -0,0 +1,123 @@
+"""Password hashing service.
+
+bcrypt costs 100-250 ms of CPU per call, so hashing and verification run
+on a bounded thread pool (bcrypt releases the GIL) instead of the event
+loop. A semaphore caps concurrent hashes; callers beyond the cap wait in
+a queue whose depth is tracked for metrics.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.security import pwd_context
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Runs password hashing and verification off the event loop."""
+
+    def __init__(
+        self,
+        context: CryptContext = pwd_context,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self._context = context
+        self._max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix="password-hash"
+        )
+        self._semaphore = asyncio.Semaphore(self._max_workers)
+        # Hash of a random secret, verified against for unknown users so a
+        # failed login costs the same whether or not the account exists
+        self._dummy_hash: Optional[str] = None
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rehashed = 0
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        """Run ``fn`` on the pool once a concurrency slot is free."""
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the current cost factor."""
+        return await self._run(self._context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash."""
+        return await self._run(self._context.verify, password, hashed_password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and return a replacement hash if the stored one
+        uses an outdated scheme or cost factor.
+        """
+        valid, new_hash = await self._run(
+            self._context.verify_and_update, password, hashed_password
+        )
+        if new_hash is not None:
+            self.rehashed += 1
+        return valid, new_hash
+
+    async def dummy_verify(self, password: str) -> None:
+        """Spend the cost of a real verification without an account."""
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash(os.urandom(16).hex())
+        await self._run(self._context.verify, password, self._dummy_hash)
+
+    def stats(self) -> dict[str, int]:
+        """Return pool size, queue depth and throughput counters."""
+        return {
+            "workers": self._max_workers,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rehashed": self.rehashed,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Created on first use so importing the module does not start threads
+_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the application password hasher."""
+    global _hasher
+    if _hasher is None:
+        _hasher = PasswordHasher(max_workers=settings.PASSWORD_HASH_WORKERS)
+    return _hasher
+
+
+def shutdown_password_hasher() -> None:
+    """Stop the application password hasher."""
+    global _hasher
+    if _hasher is not None:
+        _hasher.shutdown()
+        _hasher = None
@@ -0,0 +1,161 @@
+"""In-process index of open incidents.
+
+Maps ``(monitor_id, error_type)`` to the open incident that repeated
+failures of that kind are coalesced into, so the failure path can find it
+without querying SQLite. The index is loaded at startup and updated by the
+incident, alert and simulation services as incidents open and resolve.
+
+Changes are staged on the writing session and applied to the index only
+when its transaction commits, so a rolled-back write (including a failed
+group-commit batch that is retried) never leaves the index ahead of the
+database. Writes batched into one transaction see each other's staged
+changes through ``staged_open_incident``.
+
+The index only knows the incidents this process opened: callers treat a
+miss as "unknown" and check SQLite, and confirm a hit with a guarded
+``UPDATE``, dropping the entry if another process resolved the incident.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlmodel import select
+
+from app.models.incident import Incident
+
+
+@dataclass(slots=True)
+class OpenIncident:
+    """The open incident for one monitor and error type."""
+
+    incident_id: int
+    last_alerted_at: Optional[datetime] = None
+
+
+class OpenIncidentIndex:
+    """Open incidents by monitor id, then error type."""
+
+    def __init__(self) -> None:
+        self._monitors: dict[int, dict[str, OpenIncident]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(by_type) for by_type in self._monitors.values())
+
+    def get(self, monitor_id: int, error_type: str) -> Optional[OpenIncident]:
+        """Return the open incident for a monitor and error type."""
+        by_type = self._monitors.get(monitor_id)
+        return by_type.get(error_type) if by_type else None
+
+    def put(self, monitor_id: int, error_type: str, entry: OpenIncident) -> None:
+        """Record the open incident for a monitor and error type."""
+        self._monitors.setdefault(monitor_id, {})[error_type] = entry
+
+    def discard(
+        self, monitor_id: int, error_type: str, incident_id: Optional[int] = None
+    ) -> None:
+        """Drop an entry; with ``incident_id``, only if it names that incident."""
+        by_type = self._monitors.get(monitor_id)
+        if not by_type:
+            return
+        entry = by_type.get(error_type)
+        if entry is not None and incident_id in (None, entry.incident_id):
+            del by_type[error_type]
+            if not by_type:
+                del self._monitors[monitor_id]
+
+    def discard_monitor(self, monitor_id: int) -> None:
+        """Drop every entry for a monitor."""
+        self._monitors.pop(monitor_id, None)
+
+
+# Index loaded by the application lifespan; services fall back to SQLite
+# when it is not loaded (scripts, tests)
+_index: Optional[OpenIncidentIndex] = None
+
+
+def get_open_incident_index() -> Optional[OpenIncidentIndex]:
+    """Return the loaded index, if any."""
+    return _index
+
+
+# session.info key of the index changes staged by the open transaction
+_STAGED = "open_incident_changes"
+
+
+def remember_open_incident(
+    session: AsyncSession,
+    monitor_id: int,
+    error_type: str,
+    incident_id: int,
+    last_alerted_at: Optional[datetime] = None,
+) -> OpenIncident:
+    """
+    Record the open incident for a monitor and error type.
+
+    Staged on ``session``; the loaded index, if any, takes it when the
+    session's transaction commits.
+    """
+    entry = OpenIncident(incident_id, last_alerted_at)
+    session.info.setdefault(_STAGED, {})[(monitor_id, error_type)] = entry
+    return entry
+
+
+def staged_open_incident(
+    session: AsyncSession, monitor_id: int, error_type: str
+) -> Optional[OpenIncident]:
+    """The entry staged for a monitor and error type by ``session``'s transaction."""
+    staged = session.info.get(_STAGED)
+    return staged.get((monitor_id, error_type)) if staged else None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_staged(session: Session) -> None:
+    staged = session.info.pop(_STAGED, None)
+    if staged and _index is not None:
+        for (monitor_id, error_type), entry in staged.items():
+            _index.put(monitor_id, error_type, entry)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_staged(session: Session, transaction) -> None:
+    # Runs after after_commit; anything left was rolled back
+    if transaction.parent is None:
+        session.info.pop(_STAGED, None)
+
+
+def forget_open_incident(
+    monitor_id: int, error_type: str, incident_id: Optional[int] = None
+) -> None:
+    """Drop an incident from the loaded index, if any."""
+    if _index is not None:
+        _index.discard(monitor_id, error_type, incident_id)
+
+
+async def load_open_incident_index(session: AsyncSession) -> OpenIncidentIndex:
+    """Load every open incident into a new application index."""
+    global _index
+    statement = (
+        select(
+            Incident.id, Incident.monitor_id, Incident.error_type, Incident.last_alerted_at
+        )
+        .where(Incident.status == "open")
+        .order_by(Incident.started_at, Incident.id)
+    )
+    result = await session.execute(statement)
+    index = OpenIncidentIndex()
+    # Oldest first, so the newest of several open incidents of a kind wins
+    for row in result:
+        index.put(
+            row.monitor_id, row.error_type, OpenIncident(row.id, row.last_alerted_at)
+        )
+    _index = index
+    return index
+
+
+def unload_open_incident_index() -> None:
+    """Drop the application index."""
+    global _index
+    _index = None
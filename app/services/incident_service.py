@@ -1,21 +1,54 @@
 """Incident service."""
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
 
+from sqlalchemy import and_, or_, update
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import select
 
+from app.core.clock import utcnow
+from app.core.database import run_write
+from app.core.metrics import INCIDENTS_CREATED, INCIDENTS_RESOLVED
+from app.core.versions import bump_version
 from app.models.incident import Incident
 from app.schemas.incident import IncidentCreate
+from app.services.feed_service import publish_incident_created, publish_incident_resolved
+from app.services.incident_index import forget_open_incident, remember_open_incident
+from app.services.stats_service import record_incident_resolved, record_incidents_opened
+from app.services.uptime_service import invalidate_uptime
 
 
 async def create_incident(
     session: AsyncSession, incident_create: IncidentCreate
 ) -> Incident:
     """Create a new incident."""
-    incident = Incident(**incident_create.model_dump())
-    session.add(incident)
-    await session.commit()
-    await session.refresh(incident)
+    async def add(write_session: AsyncSession) -> Incident:
+        incident = Incident(**incident_create.model_dump())
+        write_session.add(incident)
+        await record_incidents_opened(
+            write_session,
+            [(incident.monitor_id, incident.error_type, incident.started_at)],
+        )
+        await bump_version(write_session, "incident", "incident_rollup")
+        if incident.status == "open":
+            await write_session.flush()
+            remember_open_incident(
+                write_session, incident.monitor_id, incident.error_type, incident.id
+            )
+        return incident
+    
+    incident = await run_write(session, add)
+    invalidate_uptime(incident.monitor_id)
+    INCIDENTS_CREATED.inc()
+    publish_incident_created(
+        incident.id,
+        incident.monitor_id,
+        incident.error_type,
+        incident.status,
+        incident.started_at,
+    )
     return incident
 
 
@@ -24,27 +57,138 @@ async def get_incident(session: AsyncSession, incident_id: int) -> Optional[Inci
     return await session.get(Incident, incident_id)
 
 
-async def list_incidents(session: AsyncSession) -> List[Incident]:
-    """List all incidents."""
-    statement = select(Incident)
+def _page(
+    statement,
+    monitor_id: Optional[int],
+    status: Optional[str],
+    error_type: Optional[str],
+    started_after: Optional[datetime],
+    started_before: Optional[datetime],
+    after: Optional[Tuple[datetime, int]],
+    limit: Optional[int],
+):
+    if monitor_id is not None:
+        statement = statement.where(Incident.monitor_id == monitor_id)
+    if status is not None:
+        statement = statement.where(Incident.status == status)
+    if error_type is not None:
+        statement = statement.where(Incident.error_type == error_type)
+    if started_after is not None:
+        statement = statement.where(Incident.started_at >= started_after)
+    if started_before is not None:
+        statement = statement.where(Incident.started_at < started_before)
+    if after is not None:
+        after_started_at, after_id = after
+        statement = statement.where(
+            or_(
+                Incident.started_at < after_started_at,
+                and_(
+                    Incident.started_at == after_started_at,
+                    Incident.id < after_id,
+                ),
+            )
+        )
+    statement = statement.order_by(Incident.started_at.desc(), Incident.id.desc())
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+async def list_incidents(
+    session: AsyncSession,
+    *,
+    monitor_id: Optional[int] = None,
+    status: Optional[str] = None,
+    error_type: Optional[str] = None,
+    started_after: Optional[datetime] = None,
+    started_before: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: Optional[int] = None,
+) -> List[Incident]:
+    """
+    List incidents, newest first.
+
+    Filters are pushed into SQL. ``after`` is a keyset position
+    ``(started_at, id)``; only rows strictly older than it are returned,
+    so each page costs O(limit) regardless of table size.
+    """
+    statement = _page(
+        select(Incident),
+        monitor_id, status, error_type, started_after, started_before, after, limit,
+    )
     result = await session.execute(statement)
     return result.scalars().all()
 
 
+async def list_incident_rows(
+    session: AsyncSession,
+    fields: Sequence[str],
+    *,
+    monitor_id: Optional[int] = None,
+    status: Optional[str] = None,
+    error_type: Optional[str] = None,
+    started_after: Optional[datetime] = None,
+    started_before: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: Optional[int] = None,
+) -> List[Row]:
+    """
+    Like ``list_incidents``, but select only the ``fields`` columns and
+    return plain row tuples without building ORM entities.
+
+    ``started_at`` and ``id`` are appended when not requested, so callers
+    can always build a keyset cursor from the last row.
+    """
+    columns = list(dict.fromkeys([*fields, "started_at", "id"]))
+    statement = _page(
+        select(*(getattr(Incident, name) for name in columns)),
+        monitor_id, status, error_type, started_after, started_before, after, limit,
+    )
+    result = await session.execute(statement)
+    return result.all()
+
+
 async def resolve_incident(
     session: AsyncSession, incident_id: int
 ) -> Optional[Incident]:
-    """Resolve an incident."""
-    from datetime import datetime
+    """
+    Resolve an incident.
     
+    Resolving an incident that is already resolved leaves it unchanged.
+    """
     incident = await get_incident(session, incident_id)
     if not incident:
         return None
+    if incident.status == "resolved":
+        return incident
+    
+    resolved_at = utcnow()
+    
+    async def resolve(write_session: AsyncSession) -> bool:
+        # Only the request that actually closes the incident updates rollups
+        statement = (
+            update(Incident)
+            .where(Incident.id == incident_id, Incident.status == "open")
+            .values(status="resolved", resolved_at=resolved_at)
+        )
+        result = await write_session.execute(statement)
+        if result.rowcount != 1:
+            return False
+        await record_incident_resolved(write_session, incident, resolved_at)
+        await bump_version(write_session, "incident", "incident_rollup")
+        return True
     
-    incident.status = "resolved"
-    incident.resolved_at = datetime.utcnow()
+    if not await run_write(session, resolve):
+        await session.refresh(incident)
+        return incident
+    invalidate_uptime(incident.monitor_id)
+    INCIDENTS_RESOLVED.inc()
+    forget_open_incident(incident.monitor_id, incident.error_type, incident.id)
+    publish_incident_resolved(
+        incident.id, incident.monitor_id, incident.error_type, resolved_at
+    )
     
-    session.add(incident)
-    await session.commit()
-    await session.refresh(incident)
+    # Reflect the committed values without marking the instance dirty
+    set_committed_value(incident, "status", "resolved")
+    set_committed_value(incident, "resolved_at", resolved_at)
     return incident
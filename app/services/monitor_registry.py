@@ -0,0 +1,214 @@
+"""In-process monitor registry.
+
+Holds every monitor in memory so reads and the simulation hot path do not
+query SQLite. The registry is loaded once at startup and kept current
+write-through by the monitor service after each commit.
+
+Other processes (more workers, the command-line tools) write the same
+table, so the registry is a cache rather than the source of truth: a
+lookup that misses falls back to the database, and listings compare the
+registry's ``synced_version`` with the monitor table's change version and
+reload when another writer has moved it.
+
+Readers take an immutable, versioned snapshot; writers build a new snapshot
+and swap it in with a single assignment, so a reader never observes a
+half-applied update. Monitors change rarely, so copying the mapping on
+write is cheaper overall than locking every read.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.versions import table_versions
+from app.models.monitor import Monitor
+
+
+@dataclass(frozen=True, slots=True)
+class MonitorRecord:
+    """Compact, immutable copy of a monitor row."""
+
+    id: int
+    name: str
+    url: str
+    expected_status_code: int
+    check_interval: int
+    is_active: bool
+    created_at: datetime
+
+    @classmethod
+    def from_monitor(cls, monitor: Monitor) -> "MonitorRecord":
+        """Copy the columns of a monitor row."""
+        return cls(
+            id=monitor.id,
+            name=monitor.name,
+            url=monitor.url,
+            expected_status_code=monitor.expected_status_code,
+            check_interval=monitor.check_interval,
+            is_active=monitor.is_active,
+            created_at=monitor.created_at,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RegistrySnapshot:
+    """A consistent view of all monitors at one registry version."""
+
+    version: int
+    monitors: Mapping[int, MonitorRecord]
+
+
+class MonitorRegistry:
+    """Copy-on-write map of monitor id to ``MonitorRecord``."""
+
+    def __init__(
+        self, records: Iterable[MonitorRecord] = (), synced_version: int = 0
+    ) -> None:
+        self._snapshot = RegistrySnapshot(0, MappingProxyType(self._by_id(records)))
+        self._synced_version = synced_version
+
+    @staticmethod
+    def _by_id(records: Iterable[MonitorRecord]) -> dict[int, MonitorRecord]:
+        # Ids are assigned in increasing order, so insertion order is id order
+        return {record.id: record for record in sorted(records, key=lambda r: r.id)}
+
+    def __len__(self) -> int:
+        return len(self._snapshot.monitors)
+
+    def __contains__(self, monitor_id: int) -> bool:
+        return monitor_id in self._snapshot.monitors
+
+    @property
+    def snapshot(self) -> RegistrySnapshot:
+        """The current snapshot; it never changes once taken."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Incremented on every write."""
+        return self._snapshot.version
+
+    @property
+    def synced_version(self) -> int:
+        """Change version of the monitor table the registry is known to match."""
+        return self._synced_version
+
+    def get(self, monitor_id: int) -> Optional[MonitorRecord]:
+        """Return a monitor by id."""
+        return self._snapshot.monitors.get(monitor_id)
+
+    def values(self) -> list[MonitorRecord]:
+        """Return all monitors in id order."""
+        return list(self._snapshot.monitors.values())
+
+    def first(self) -> Optional[MonitorRecord]:
+        """Return the monitor with the lowest id."""
+        return next(iter(self._snapshot.monitors.values()), None)
+
+    def put(
+        self, record: MonitorRecord, table_version: Optional[int] = None
+    ) -> None:
+        """
+        Insert or replace a monitor.
+
+        ``table_version`` is the monitor table version the write that
+        produced ``record`` committed, when known.
+        """
+        self.put_many([record], table_version)
+
+    def put_many(
+        self, records: Iterable[MonitorRecord], table_version: Optional[int] = None
+    ) -> None:
+        """
+        Insert or replace several monitors with one copy of the snapshot;
+        ``table_version`` as for ``put``.
+        """
+        monitors = dict(self._snapshot.monitors)
+        last_id = next(reversed(monitors), 0)
+        out_of_order = False
+        for record in records:
+            if record.id < last_id and record.id not in monitors:
+                # A monitor found late, e.g. created by another process
+                out_of_order = True
+            monitors[record.id] = record
+        if out_of_order:
+            monitors = self._by_id(monitors.values())
+        self._swap(monitors, table_version)
+
+    def remove(self, monitor_id: int, table_version: Optional[int] = None) -> None:
+        """Remove a monitor if present; ``table_version`` as for ``put``."""
+        monitors = dict(self._snapshot.monitors)
+        monitors.pop(monitor_id, None)
+        self._swap(monitors, table_version)
+
+    def replace(self, records: Iterable[MonitorRecord], synced_version: int) -> None:
+        """Swap in a fresh copy of the table, read at ``synced_version``."""
+        self._snapshot = RegistrySnapshot(
+            self._snapshot.version + 1, MappingProxyType(self._by_id(records))
+        )
+        self._synced_version = synced_version
+
+    def _swap(
+        self, monitors: dict[int, MonitorRecord], table_version: Optional[int]
+    ) -> None:
+        self._snapshot = RegistrySnapshot(
+            self._snapshot.version + 1, MappingProxyType(monitors)
+        )
+        # Still in sync only if this write was the table's only change since
+        if table_version == self._synced_version + 1:
+            self._synced_version = table_version
+
+
+# Registry loaded by the application lifespan; services fall back to
+# SQLite when it is not loaded (scripts, tests)
+_registry: Optional[MonitorRegistry] = None
+
+
+def get_monitor_registry() -> Optional[MonitorRegistry]:
+    """Return the loaded registry, if any."""
+    return _registry
+
+
+async def _monitor_table_version(session: AsyncSession) -> int:
+    return (await table_versions(session, ["monitor"]))["monitor"]
+
+
+async def _select_records(session: AsyncSession) -> list[MonitorRecord]:
+    statement = select(
+        Monitor.id,
+        Monitor.name,
+        Monitor.url,
+        Monitor.expected_status_code,
+        Monitor.check_interval,
+        Monitor.is_active,
+        Monitor.created_at,
+    ).order_by(Monitor.id)
+    result = await session.execute(statement)
+    return [MonitorRecord(*row) for row in result]
+
+
+async def load_monitor_registry(session: AsyncSession) -> MonitorRegistry:
+    """Load every monitor into a new application registry."""
+    global _registry
+    # Version first: a write landing in between only causes an extra reload
+    version = await _monitor_table_version(session)
+    _registry = MonitorRegistry(await _select_records(session), version)
+    return _registry
+
+
+async def sync_monitor_registry(
+    session: AsyncSession, registry: MonitorRegistry
+) -> None:
+    """Reload ``registry`` if another writer changed the monitor table."""
+    version = await _monitor_table_version(session)
+    if version != registry.synced_version:
+        registry.replace(await _select_records(session), version)
+
+
+def unload_monitor_registry() -> None:
+    """Drop the application registry."""
+    global _registry
+    _registry = None
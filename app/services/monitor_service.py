@@ -1,12 +1,26 @@
-"""Monitor service."""
-from typing import List, Optional
+"""Monitor service.
+
+Reads are served from the in-process monitor registry when it is loaded,
+falling back to SQLite for monitors it does not hold yet; writes go to
+SQLite and then update the registry.
+"""
+from typing import List, Optional, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import delete
 from sqlmodel import select
 
+from app.core.versions import bump_version
 from app.models.monitor import Monitor
 from app.schemas.monitor import MonitorCreate, MonitorUpdate
+from app.services.incident_index import get_open_incident_index
+from app.services.monitor_registry import (
+    MonitorRecord,
+    get_monitor_registry,
+    sync_monitor_registry,
+)
+from app.services.scheduler_service import get_scheduler
+from app.services.uptime_service import invalidate_uptime
 
 
 async def create_monitor(
@@ -15,28 +29,95 @@ async def create_monitor(
     """Create a new monitor."""
     monitor = Monitor(**monitor_create.model_dump())
     session.add(monitor)
+    versions = await bump_version(session, "monitor")
     await session.commit()
     await session.refresh(monitor)
+    _monitor_changed(monitor, versions["monitor"])
     return monitor
 
 
-async def get_monitor(session: AsyncSession, monitor_id: int) -> Optional[Monitor]:
+def _monitor_changed(monitor: Monitor, table_version: int) -> None:
+    """Propagate a committed monitor write to the registry and scheduler."""
+    registry = get_monitor_registry()
+    if registry is not None:
+        registry.put(MonitorRecord.from_monitor(monitor), table_version)
+    
+    scheduler = get_scheduler()
+    if scheduler is not None:
+        scheduler.sync(monitor)
+
+
+async def get_monitor(
+    session: AsyncSession, monitor_id: int
+) -> Optional[MonitorRecord]:
     """Get monitor by ID."""
-    return await session.get(Monitor, monitor_id)
+    registry = get_monitor_registry()
+    if registry is not None:
+        record = registry.get(monitor_id)
+        if record is not None:
+            return record
+    
+    # Registry not loaded, or the monitor was created by another process
+    monitor = await session.get(Monitor, monitor_id)
+    if monitor is None:
+        return None
+    record = MonitorRecord.from_monitor(monitor)
+    if registry is not None:
+        registry.put(record)
+    return record
+
 
+async def get_monitors(
+    session: AsyncSession, monitor_ids: Sequence[int]
+) -> dict[int, MonitorRecord]:
+    """Get several monitors by ID; unknown IDs are left out."""
+    registry = get_monitor_registry()
+    found: dict[int, MonitorRecord] = {}
+    missing = set(monitor_ids)
+    if registry is not None:
+        for monitor_id in monitor_ids:
+            record = registry.get(monitor_id)
+            if record is not None:
+                found[monitor_id] = record
+        missing.difference_update(found)
+        if not missing:
+            return found
+    
+    statement = select(Monitor).where(Monitor.id.in_(missing))
+    result = await session.execute(statement)
+    records = [MonitorRecord.from_monitor(monitor) for monitor in result.scalars()]
+    found.update((record.id, record) for record in records)
+    if registry is not None and records:
+        registry.put_many(records)
+    return found
 
-async def list_monitors(session: AsyncSession) -> List[Monitor]:
+
+async def list_monitors(session: AsyncSession) -> List[MonitorRecord]:
     """List all monitors."""
-    statement = select(Monitor)
+    registry = get_monitor_registry()
+    if registry is not None:
+        await sync_monitor_registry(session, registry)
+        return registry.values()
+    
+    # Plain columns: building ORM instances dominates for large tables
+    statement = select(
+        Monitor.id,
+        Monitor.name,
+        Monitor.url,
+        Monitor.expected_status_code,
+        Monitor.check_interval,
+        Monitor.is_active,
+        Monitor.created_at,
+    ).order_by(Monitor.id)
     result = await session.execute(statement)
-    return result.scalars().all()
+    return [MonitorRecord(*row) for row in result]
 
 
 async def update_monitor(
     session: AsyncSession, monitor_id: int, monitor_update: MonitorUpdate
 ) -> Optional[Monitor]:
     """Update a monitor."""
-    monitor = await get_monitor(session, monitor_id)
+    monitor = await session.get(Monitor, monitor_id)
     if not monitor:
         return None
     
@@ -45,8 +126,10 @@ async def update_monitor(
         setattr(monitor, field, value)
     
     session.add(monitor)
+    versions = await bump_version(session, "monitor")
     await session.commit()
     await session.refresh(monitor)
+    _monitor_changed(monitor, versions["monitor"])
     return monitor
 
 
@@ -58,5 +141,18 @@ async def delete_monitor(session: AsyncSession, monitor_id: int) -> bool:
     
     statement = delete(Monitor).where(Monitor.id == monitor_id)
     await session.execute(statement)
+    versions = await bump_version(session, "monitor")
     await session.commit()
+    invalidate_uptime(monitor_id)
+    
+    registry = get_monitor_registry()
+    if registry is not None:
+        registry.remove(monitor_id, versions["monitor"])
+    index = get_open_incident_index()
+    if index is not None:
+        index.discard_monitor(monitor_id)
+    
+    scheduler = get_scheduler()
+    if scheduler is not None:
+        scheduler.unschedule(monitor_id)
     return True
@@ -0,0 +1,236 @@
+"""Probe executor service.
+
+Performs the HTTP checks for monitors over pooled keep-alive connections.
+DNS answers are cached, concurrency is capped per host and every check has
+a hard deadline.
+
+Pools are sharded per host: httpcore scans every pooled connection when it
+assigns a request, so one global pool gets slower as hosts are added, while
+per-host pools keep that scan bounded by the per-host limit.
+"""
+import asyncio
+import ipaddress
+import socket
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional
+
+import httpx
+
+from app.core.clock import utcnow
+from app.core.logging import logger
+from app.services.scheduler_service import ProbeTarget
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """Outcome of a single monitor check, with a timing breakdown."""
+
+    monitor_id: int
+    url: str
+    healthy: bool
+    status_code: Optional[int]
+    error: Optional[str]
+    connect_ms: Optional[float]
+    ttfb_ms: Optional[float]
+    total_ms: float
+    reused_connection: bool
+    checked_at: datetime = field(default_factory=utcnow)
+
+
+class DNSCache:
+    """Caches resolved addresses per (host, port) for ``ttl`` seconds."""
+
+    def __init__(self, ttl: float = 300.0) -> None:
+        self._ttl = ttl
+        self._entries: dict[tuple[str, int], tuple[float, str]] = {}
+        self._pending: dict[tuple[str, int], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve(self, host: str, port: int) -> str:
+        """Return an address for ``host``, resolving at most once per TTL."""
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+
+        key = (host, port)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        # Concurrent checks against the same host share one lookup
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Only the task that owned the lookup was cancelled; this
+                # caller still wants an address, so it looks it up itself
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            return await self.resolve(host, port)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM
+            )
+            address = infos[0][4][0]
+            self._entries[key] = (time.monotonic() + self._ttl, address)
+            future.set_result(address)
+            return address
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark retrieved so a lookup nobody else awaited does not warn
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+            # The lookup was cancelled; waiters see the cancelled future and
+            # retry on their own
+            if not future.done():
+                future.cancel()
+
+
+class ProbeExecutor:
+    """Runs monitor checks over per-host keep-alive connection pools."""
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_connections_per_host: int = 6,
+        dns_ttl: float = 300.0,
+        on_result: Optional[Callable[[CheckResult], None]] = None,
+    ) -> None:
+        self._timeout = timeout
+        self._per_host_limit = max_connections_per_host
+        self._pools: dict[str, tuple[httpx.AsyncClient, asyncio.Semaphore]] = {}
+        # Building an SSL context is expensive; every pool shares this one
+        self._ssl_context = httpx.create_ssl_context()
+        self._on_result = on_result
+        self.dns = DNSCache(dns_ttl)
+        self.checks = 0
+        self.failures = 0
+        self.reused_connections = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        """Fraction of checks served over an already-open connection."""
+        return self.reused_connections / self.checks if self.checks else 0.0
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        for client, _ in self._pools.values():
+            await client.aclose()
+        self._pools.clear()
+
+    def _pool_for(self, netloc: str) -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        """Return the client and concurrency limit for a ``host:port``."""
+        pool = self._pools.get(netloc)
+        if pool is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self._timeout),
+                limits=httpx.Limits(
+                    max_connections=self._per_host_limit,
+                    max_keepalive_connections=self._per_host_limit,
+                ),
+                verify=self._ssl_context,
+                follow_redirects=False,
+            )
+            pool = self._pools[netloc] = (
+                client,
+                asyncio.Semaphore(self._per_host_limit),
+            )
+        return pool
+
+    async def check(self, target: ProbeTarget) -> CheckResult:
+        """Check a monitor once and return a structured result."""
+        url = httpx.URL(target.url)
+        client, limit = self._pool_for(url.netloc.decode())
+
+        async with limit:
+            result = await self._timed_request(client, target, url)
+
+        self.checks += 1
+        if result.reused_connection:
+            self.reused_connections += 1
+        if not result.healthy:
+            self.failures += 1
+            logger.warning(
+                f"Check failed for monitor {result.monitor_id}: "
+                f"status={result.status_code} error={result.error} "
+                f"total_ms={result.total_ms:.1f}"
+            )
+        if self._on_result is not None:
+            self._on_result(result)
+        return result
+
+    async def _timed_request(
+        self, client: httpx.AsyncClient, target: ProbeTarget, url: httpx.URL
+    ) -> CheckResult:
+        """Issue the request and collect timings from transport trace events."""
+        marks: dict[str, float] = {}
+
+        async def trace(event: str, info: dict) -> None:
+            marks[event] = time.perf_counter()
+
+        async def send() -> httpx.Response:
+            port = url.port or (443 if url.scheme == "https" else 80)
+            address = await self.dns.resolve(url.host, port)
+            extensions = {"trace": trace}
+            if url.scheme == "https":
+                # Connect to the cached address but keep TLS bound to the name
+                extensions["sni_hostname"] = url.host
+            return await client.get(
+                url.copy_with(host=address),
+                headers={"Host": url.netloc.decode()},
+                extensions=extensions,
+            )
+
+        started = time.perf_counter()
+        status_code = None
+        error = None
+        try:
+            # Hard deadline covering DNS, connect, TLS and the response
+            response = await asyncio.wait_for(send(), timeout=self._timeout)
+            status_code = response.status_code
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            error = "timeout"
+        except (httpx.HTTPError, OSError) as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        total_ms = (time.perf_counter() - started) * 1000
+
+        connect_started = marks.get("connection.connect_tcp.started")
+        connect_done = marks.get(
+            "connection.start_tls.complete",
+            marks.get("connection.connect_tcp.complete"),
+        )
+        connect_ms = None
+        if connect_started is not None and connect_done is not None:
+            connect_ms = (connect_done - connect_started) * 1000
+
+        headers_done = marks.get(
+            "http11.receive_response_headers.complete",
+            marks.get("http2.receive_response_headers.complete"),
+        )
+        ttfb_ms = (headers_done - started) * 1000 if headers_done else None
+
+        return CheckResult(
+            monitor_id=target.id,
+            url=target.url,
+            healthy=error is None and status_code == target.expected_status_code,
+            status_code=status_code,
+            error=error,
+            connect_ms=connect_ms,
+            ttfb_ms=ttfb_ms,
+            total_ms=total_ms,
+            reused_connection=error is None and connect_started is None,
+        )
@@ -0,0 +1,486 @@
+"""Failure scenario engine.
+
+Rehearses whole failure scenarios (region outages, latency degradation,
+cascading errors) instead of one hand-picked failure at a time. A
+``ScenarioDefinition`` is turned into a per-monitor timeline, phase by
+phase: the parent picks the affected monitors, then each fixed-size
+partition of them gets its start and recovery times computed as NumPy
+columns from its own seeded generator. Partition boundaries and seeds do
+not depend on the number of workers, so a seed always yields the same
+timeline. Large phases are spread over a process pool.
+
+Only the part of the timeline up to now is applied: failures that would
+start later are left out, and ones still running stay open. Each failure
+gets an incident and an alert, written through ``run_write`` in
+transactions of at most ``WRITE_CHUNK_SIZE`` incidents, so other writers
+never wait long for the database; the rollups, outbox and open incident
+index are updated as the other write paths do. With
+``INCIDENT_DEDUP_ENABLED``, failures still running are grouped by monitor
+and type like ``simulate_failures_bulk`` groups them: each group is added
+to the open incident of its kind, or opens a single incident.
+"""
+import asyncio
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from typing import Any, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.database import run_write
+from app.core.metrics import (
+    ALERTS_CREATED,
+    INCIDENTS_COALESCED,
+    INCIDENTS_CREATED,
+    INCIDENTS_RESOLVED,
+)
+from app.core.versions import bump_version
+from app.models.alert import Alert
+from app.models.incident import Incident
+from app.schemas.scenario import ScenarioDefinition, ScenarioPhase, ScenarioResult
+from app.services.dispatch_service import enqueue_alerts, notify_alert_dispatcher
+from app.services.feed_service import publish_scenario_applied
+from app.services.incident_index import remember_open_incident
+from app.services.monitor_registry import MonitorRecord
+from app.services.monitor_service import list_monitors
+from app.services.simulation_service import (
+    build_alert_payload,
+    coalesce_into_open_incidents,
+)
+from app.services.stats_service import record_incident_history
+from app.services.uptime_service import invalidate_uptime
+
+# Monitors per partition; fixed so timelines do not depend on worker count
+PARTITION_SIZE = 10_000
+# Spread of per-monitor peak latency around the phase's peak (log-normal sigma)
+PEAK_LATENCY_SIGMA = 0.25
+# Incidents per write transaction; about a third of a second of SQLite time
+WRITE_CHUNK_SIZE = 2_000
+
+
+@dataclass(slots=True, eq=False)
+class PhaseTimeline:
+    """
+    Failures of one phase as parallel columns. Times are seconds from the
+    scenario start; ``latencies`` is None for phases without a latency.
+    """
+
+    monitor_ids: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+    latencies: Optional[np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.monitor_ids)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PhaseTimeline):
+            return NotImplemented
+        if (self.latencies is None) != (other.latencies is None):
+            return False
+        return all(
+            np.array_equal(mine, theirs)
+            for mine, theirs in (
+                (self.monitor_ids, other.monitor_ids),
+                (self.starts, other.starts),
+                (self.ends, other.ends),
+                (self.latencies, other.latencies),
+            )
+            if mine is not None
+        )
+
+
+def compute_partition(
+    phase: dict[str, Any],
+    seed: str,
+    monitor_ids: list[int],
+    waves: Optional[list[int]] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Failure columns ``(monitor_ids, starts, ends, latencies)`` for one
+    partition of a phase's affected monitors. ``waves`` gives each
+    monitor's cascade wave. Runs in pool workers, so it takes plain data
+    and returns arrays.
+    """
+    rng = np.random.default_rng(list(seed.encode()))
+    ids = np.asarray(monitor_ids, dtype=np.int64)
+    n = len(ids)
+    offset = phase["start_seconds"]
+    duration = phase["duration_seconds"]
+    phase_end = offset + duration
+    jitter = phase["jitter_seconds"]
+    if jitter:
+        start_jitter = rng.random(n) * jitter
+        end_jitter = rng.random(n) * jitter
+    else:
+        start_jitter = end_jitter = np.zeros(n)
+    latencies: Optional[np.ndarray] = None
+
+    if phase["kind"] == "outage":
+        starts = offset + start_jitter
+    elif phase["kind"] == "degradation":
+        baseline = phase["baseline_latency_ms"]
+        threshold = phase["threshold_latency_ms"]
+        peaks = phase["peak_latency_ms"] * rng.lognormal(0.0, PEAK_LATENCY_SIGMA, n)
+        # Latency ramps linearly; a monitor fails when it crosses the
+        # threshold, and never if its peak stays below it
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = np.maximum(0.0, (threshold - baseline) / (peaks - baseline))
+        starts = np.where(
+            peaks > threshold, offset + crossing * duration + start_jitter, phase_end
+        )
+        latencies = np.rint(peaks).astype(np.int64)
+    else:
+        hop = phase["hop_seconds"]
+        starts = offset + np.asarray(waves, dtype=np.float64) * hop + start_jitter
+
+    ends = phase_end + end_jitter
+    keep = starts < phase_end
+    return (
+        ids[keep],
+        starts[keep],
+        ends[keep],
+        latencies[keep] if latencies is not None else None,
+    )
+
+
+def _cascade_waves(count: int, phase: ScenarioPhase) -> list[int]:
+    """Wave number of each of ``count`` monitors, in infection order."""
+    waves: list[int] = []
+    size = max(1.0, count * phase.initial_fraction)
+    wave = 0
+    while len(waves) < count:
+        waves.extend([wave] * min(count - len(waves), round(size)))
+        size *= phase.spread_factor
+        wave += 1
+    return waves
+
+
+async def compute_timeline(
+    definition: ScenarioDefinition,
+    monitor_ids: Sequence[int],
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> list[PhaseTimeline]:
+    """
+    Per-phase failure timelines over ``monitor_ids``. Phases with at least
+    ``SCENARIO_PARALLEL_MIN_MONITORS`` affected monitors are computed on
+    ``pool`` (the application pool by default).
+    """
+    known = sorted(set(monitor_ids))
+    loop = asyncio.get_running_loop()
+    timelines = []
+    for index, phase in enumerate(definition.phases):
+        rng = random.Random(f"{definition.seed}:{index}")
+        if phase.monitor_ids is None:
+            targets = known
+        else:
+            targets = sorted(set(phase.monitor_ids).intersection(known))
+        count = round(len(targets) * phase.fraction)
+        if targets:
+            count = max(1, count)
+        if phase.kind == "cascade":
+            # Sample order is infection order
+            chosen = rng.sample(targets, count)
+            waves = _cascade_waves(count, phase)
+        else:
+            chosen = sorted(rng.sample(targets, count))
+            waves = None
+
+        data = phase.model_dump()
+        partitions = [
+            (
+                data,
+                f"{definition.seed}:{index}:{offset}",
+                chosen[offset:offset + PARTITION_SIZE],
+                waves[offset:offset + PARTITION_SIZE] if waves else None,
+            )
+            for offset in range(0, count, PARTITION_SIZE)
+        ]
+        if count >= settings.SCENARIO_PARALLEL_MIN_MONITORS and len(partitions) > 1:
+            executor = pool or get_scenario_pool()
+            columns = await asyncio.gather(*(
+                loop.run_in_executor(executor, compute_partition, *args)
+                for args in partitions
+            ))
+        elif partitions:
+            columns = [compute_partition(*args) for args in partitions]
+        else:
+            columns = [compute_partition(data, "", [], [])]
+
+        ids, starts, ends, latencies = zip(*columns)
+        timelines.append(PhaseTimeline(
+            np.concatenate(ids),
+            np.concatenate(starts),
+            np.concatenate(ends),
+            np.concatenate(latencies) if latencies[0] is not None else None,
+        ))
+    return timelines
+
+
+def scenario_length(definition: ScenarioDefinition) -> float:
+    """Seconds from the scenario start until its last recovery at the latest."""
+    return max(
+        phase.start_seconds + phase.duration_seconds + phase.jitter_seconds
+        for phase in definition.phases
+    )
+
+
+@dataclass(slots=True)
+class _ScenarioIncident:
+    """An incident to write: one failure, or a group of running ones."""
+
+    monitor_id: int
+    failure_type: str
+    started_at: datetime
+    resolved_at: Optional[datetime]
+    latency_ms: Optional[int]
+    occurrences: int = 1
+    last_seen_at: Optional[datetime] = None
+
+
+@dataclass(slots=True)
+class _ChunkWritten:
+    """What one write transaction of a scenario did."""
+
+    incidents: int
+    open_incidents: int
+    alerts: int
+    # Monitors that got a new incident
+    monitor_ids: set[int]
+
+
+async def _write_chunk(
+    session: AsyncSession,
+    chunk: Sequence[_ScenarioIncident],
+    monitors: dict[int, MonitorRecord],
+    now: datetime,
+    dedup: bool,
+) -> _ChunkWritten:
+    """
+    Write one chunk of a scenario's incidents and their alerts.
+
+    RETURNING row order is unspecified, but inside one write transaction
+    SQLite hands out rowids in insertion order, so the sorted ids line up
+    with the chunk.
+    """
+    # Running groups with an open incident of their kind only bump it
+    coalesced: dict[int, tuple[int, int, bool]] = {}
+    if dedup:
+        running = [p for p, item in enumerate(chunk) if item.resolved_at is None]
+        found = await coalesce_into_open_incidents(
+            session,
+            [
+                ((chunk[p].monitor_id, chunk[p].failure_type), chunk[p].occurrences)
+                for p in running
+            ],
+            now,
+        )
+        coalesced = {running[i]: outcome for i, outcome in found.items()}
+
+    opening = [p for p in range(len(chunk)) if p not in coalesced]
+    incident_ids = {p: incident_id for p, (incident_id, _, _) in coalesced.items()}
+    occurrences = {p: total for p, (_, total, _) in coalesced.items()}
+    if opening:
+        incident_table = Incident.__table__
+        result = await session.execute(
+            insert(incident_table).returning(incident_table.c.id),
+            [
+                {
+                    "monitor_id": chunk[p].monitor_id,
+                    "error_type": chunk[p].failure_type,
+                    "status": "open" if chunk[p].resolved_at is None else "resolved",
+                    "started_at": chunk[p].started_at,
+                    "resolved_at": chunk[p].resolved_at,
+                    "occurrences": chunk[p].occurrences,
+                    "last_seen_at": chunk[p].last_seen_at or chunk[p].started_at,
+                    "last_alerted_at": chunk[p].started_at,
+                }
+                for p in opening
+            ],
+        )
+        for p, incident_id in zip(opening, sorted(result.scalars())):
+            item = chunk[p]
+            incident_ids[p] = incident_id
+            occurrences[p] = item.occurrences
+            if item.resolved_at is None:
+                remember_open_incident(
+                    session, item.monitor_id, item.failure_type, incident_id,
+                    item.started_at,
+                )
+        await record_incident_history(
+            session,
+            (
+                (
+                    chunk[p].monitor_id, chunk[p].failure_type,
+                    chunk[p].started_at, chunk[p].resolved_at,
+                )
+                for p in opening
+            ),
+        )
+
+    # New incidents alert when they start, coalesced ones only when due
+    alerting = sorted(
+        opening + [p for p, (_, _, alert_due) in coalesced.items() if alert_due]
+    )
+    if alerting:
+        alert_table = Alert.__table__
+        result = await session.execute(
+            insert(alert_table).returning(alert_table.c.id),
+            [
+                {
+                    "incident_id": incident_ids[p],
+                    "payload": build_alert_payload(
+                        monitors[chunk[p].monitor_id],
+                        incident_ids[p],
+                        chunk[p].failure_type,
+                        chunk[p].latency_ms,
+                        occurrences[p],
+                    ),
+                    "created_at": now if p in coalesced else chunk[p].started_at,
+                }
+                for p in alerting
+            ],
+        )
+        await enqueue_alerts(session, sorted(result.scalars()))
+
+    tables = ["incident"]
+    if alerting:
+        tables.append("alert")
+    if opening:
+        tables.append("incident_rollup")
+    await bump_version(session, *tables)
+    return _ChunkWritten(
+        incidents=len(opening),
+        open_incidents=sum(chunk[p].resolved_at is None for p in opening),
+        alerts=len(alerting),
+        monitor_ids={chunk[p].monitor_id for p in opening},
+    )
+
+
+async def apply_scenario(
+    session: AsyncSession, definition: ScenarioDefinition
+) -> ScenarioResult:
+    """
+    Compute a scenario's timeline and write it in short transactions.
+
+    If a transaction fails, the chunks before it stay written and the
+    error is raised.
+    """
+    monitors = {record.id: record for record in await list_monitors(session)}
+    now = utcnow()
+    start = definition.start or now - timedelta(seconds=scenario_length(definition))
+    timelines = await compute_timeline(definition, list(monitors))
+    dedup = settings.INCIDENT_DEDUP_ENABLED
+
+    items: list[_ScenarioIncident] = []
+    # Position in ``items`` of each running group, when deduplicating
+    running: dict[tuple[int, str], int] = {}
+    failures = 0
+    affected: set[int] = set()
+    phase_incidents = []
+    for phase, timeline in zip(definition.phases, timelines):
+        before = failures
+        latencies = (
+            timeline.latencies.tolist() if timeline.latencies is not None
+            else [None] * len(timeline)
+        )
+        for monitor_id, offset, end, latency_ms in zip(
+            timeline.monitor_ids.tolist(),
+            timeline.starts.tolist(),
+            timeline.ends.tolist(),
+            latencies,
+        ):
+            started_at = start + timedelta(seconds=offset)
+            if started_at > now:
+                continue
+            resolved_at = start + timedelta(seconds=end)
+            if resolved_at > now:
+                resolved_at = None
+            failures += 1
+            affected.add(monitor_id)
+            key = (monitor_id, phase.failure_type)
+            if dedup and resolved_at is None and key in running:
+                group = items[running[key]]
+                group.occurrences += 1
+                group.last_seen_at = max(group.last_seen_at, started_at)
+                continue
+            if dedup and resolved_at is None:
+                running[key] = len(items)
+            items.append(_ScenarioIncident(
+                monitor_id, phase.failure_type, started_at, resolved_at,
+                latency_ms, last_seen_at=started_at,
+            ))
+        phase_incidents.append(failures - before)
+
+    incidents = open_incidents = alerts = 0
+    try:
+        for offset in range(0, len(items), WRITE_CHUNK_SIZE):
+            chunk = items[offset:offset + WRITE_CHUNK_SIZE]
+            written = await run_write(
+                session,
+                lambda write_session: _write_chunk(
+                    write_session, chunk, monitors, now, dedup
+                ),
+            )
+            for monitor_id in written.monitor_ids:
+                invalidate_uptime(monitor_id)
+            if written.alerts:
+                notify_alert_dispatcher()
+            INCIDENTS_CREATED.inc(written.incidents)
+            INCIDENTS_RESOLVED.inc(written.incidents - written.open_incidents)
+            INCIDENTS_COALESCED.inc(
+                sum(item.occurrences for item in chunk) - written.incidents
+            )
+            ALERTS_CREATED.inc(written.alerts)
+            incidents += written.incidents
+            open_incidents += written.open_incidents
+            alerts += written.alerts
+    except Exception:
+        await session.rollback()
+        raise
+
+    if items:
+        publish_scenario_applied(definition.name, incidents, open_incidents)
+
+    return ScenarioResult(
+        name=definition.name,
+        start=start,
+        end=start + timedelta(seconds=scenario_length(definition)),
+        monitors=len(affected),
+        incidents=incidents,
+        alerts=alerts,
+        open_incidents=open_incidents,
+        coalesced=failures - incidents,
+        phase_incidents=phase_incidents,
+    )
+
+
+# Created on first use so importing the module does not start processes
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_scenario_pool() -> ProcessPoolExecutor:
+    """Return the process pool for timeline partitions."""
+    global _pool
+    if _pool is None:
+        # Spawned, not forked: the parent runs an event loop and threads
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.SCENARIO_WORKERS or os.cpu_count() or 1,
+            mp_context=get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_scenario_pool() -> None:
+    """Stop the pool's worker processes."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,199 @@
+"""Probe scheduler service.
+
+Runs a check for every active monitor once per ``check_interval``.
+Due times live in a min-heap; entries are invalidated lazily through a
+per-monitor generation counter so rescheduling never has to search the heap.
+"""
+import asyncio
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.logging import logger
+from app.models.monitor import Monitor
+
+
+@dataclass(frozen=True)
+class ProbeTarget:
+    """Immutable snapshot of the monitor fields a probe needs."""
+
+    id: int
+    url: str
+    expected_status_code: int
+    check_interval: int
+
+    @classmethod
+    def from_monitor(cls, monitor: Monitor) -> "ProbeTarget":
+        """Build a target from a monitor row."""
+        return cls(
+            id=monitor.id,
+            url=monitor.url,
+            expected_status_code=monitor.expected_status_code,
+            check_interval=max(1, monitor.check_interval),
+        )
+
+
+Probe = Callable[[ProbeTarget], Awaitable[object]]
+
+
+def first_run_offset(monitor_id: int, interval: float) -> float:
+    """
+    Deterministic jitter for a monitor's first run, in ``[0, interval)``.
+
+    Uses Knuth's multiplicative hash so consecutive ids are spread evenly
+    across the interval instead of all firing at startup.
+    """
+    return ((monitor_id * 2654435761) % 2**32) / 2**32 * interval
+
+
+class ProbeScheduler:
+    """In-process scheduler that honours ``Monitor.check_interval``."""
+
+    def __init__(
+        self,
+        probe: Probe,
+        max_concurrency: int = 500,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._probe = probe
+        self._clock = clock
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._heap: list[tuple[float, int, int]] = []
+        self._targets: dict[int, ProbeTarget] = {}
+        self._generations: dict[int, int] = {}
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._in_flight: set[asyncio.Task] = set()
+        self.checks_started = 0
+        self.checks_failed = 0
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def schedule(self, target: ProbeTarget) -> None:
+        """Add or replace a monitor; its first run is jittered."""
+        generation = self._generations.get(target.id, 0) + 1
+        self._generations[target.id] = generation
+        self._targets[target.id] = target
+        due = self._clock() + first_run_offset(target.id, target.check_interval)
+        heapq.heappush(self._heap, (due, generation, target.id))
+        self._wakeup.set()
+
+    def unschedule(self, monitor_id: int) -> None:
+        """Stop checking a monitor. Its heap entry is dropped when popped."""
+        self._targets.pop(monitor_id, None)
+        self._generations[monitor_id] = self._generations.get(monitor_id, 0) + 1
+
+    def sync(self, monitor: Monitor) -> None:
+        """Reconcile a monitor after it was created or updated."""
+        if monitor.is_active:
+            target = ProbeTarget.from_monitor(monitor)
+            if self._targets.get(monitor.id) != target:
+                self.schedule(target)
+        else:
+            self.unschedule(monitor.id)
+
+    async def load(self, session: AsyncSession) -> None:
+        """Schedule every active monitor."""
+        statement = select(Monitor).where(Monitor.is_active)
+        result = await session.execute(statement)
+        for monitor in result.scalars():
+            self.schedule(ProbeTarget.from_monitor(monitor))
+
+    def start(self) -> None:
+        """Start the dispatch loop."""
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop dispatching and wait for in-flight probes to finish."""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _run(self) -> None:
+        """Pop due monitors and launch their probes under the semaphore."""
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            due, generation, monitor_id = self._heap[0]
+            delay = due - self._clock()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            if self._generations.get(monitor_id) != generation:
+                continue  # stale entry from an update or removal
+            target = self._targets[monitor_id]
+
+            # Fixed-rate schedule; intervals missed under overload are skipped
+            # rather than replayed as a burst.
+            now = self._clock()
+            next_due = due + target.check_interval
+            if next_due <= now:
+                next_due = now + target.check_interval
+            heapq.heappush(self._heap, (next_due, generation, monitor_id))
+
+            await self._semaphore.acquire()
+            task = asyncio.create_task(self._check(target))
+            self._in_flight.add(task)
+            task.add_done_callback(self._on_check_done)
+
+    async def _check(self, target: ProbeTarget) -> None:
+        """Run one probe, isolating its failures from the loop."""
+        self.checks_started += 1
+        try:
+            await self._probe(target)
+        except Exception:
+            self.checks_failed += 1
+            logger.exception(f"Probe for monitor {target.id} raised")
+
+    def _on_check_done(self, task: asyncio.Task) -> None:
+        self._in_flight.discard(task)
+        self._semaphore.release()
+
+
+# Scheduler started by the application lifespan, if enabled
+_scheduler: Optional[ProbeScheduler] = None
+
+
+def get_scheduler() -> Optional[ProbeScheduler]:
+    """Return the running scheduler, if any."""
+    return _scheduler
+
+
+async def start_scheduler(
+    session: AsyncSession, probe: Probe, max_concurrency: int
+) -> ProbeScheduler:
+    """Create, load and start the application scheduler."""
+    global _scheduler
+    scheduler = ProbeScheduler(probe, max_concurrency=max_concurrency)
+    await scheduler.load(session)
+    scheduler.start()
+    _scheduler = scheduler
+    return scheduler
+
+
+async def stop_scheduler() -> None:
+    """Stop the application scheduler."""
+    global _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop()
+        _scheduler = None
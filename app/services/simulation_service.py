@@ -1,15 +1,173 @@
 """Simulation service for deterministic failure testing."""
-from typing import Optional
+from datetime import datetime
+from typing import Any, Iterable, Optional, Sequence, Tuple
 
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.database import run_write
+from app.core.metrics import ALERTS_CREATED, INCIDENTS_COALESCED, INCIDENTS_CREATED
+from app.core.versions import bump_version
+from app.models.alert import Alert
 from app.models.incident import Incident
-from app.models.monitor import Monitor
-from app.schemas.alert import AlertCreate
-from app.schemas.incident import IncidentCreate
-from app.services.alert_service import create_alert
-from app.services.incident_service import create_incident
-from app.services.monitor_service import get_monitor
+from app.services.dispatch_service import enqueue_alerts, notify_alert_dispatcher
+from app.services.feed_service import (
+    publish_alert_created,
+    publish_incident_created,
+    publish_incident_updated,
+)
+from app.services.incident_index import (
+    OpenIncident,
+    forget_open_incident,
+    get_open_incident_index,
+    remember_open_incident,
+    staged_open_incident,
+)
+from app.services.monitor_registry import MonitorRecord
+from app.services.monitor_service import get_monitor, get_monitors
+from app.services.stats_service import record_incidents_opened
+from app.services.uptime_service import invalidate_uptime
+
+
+def build_alert_payload(
+    monitor: MonitorRecord,
+    incident_id: int,
+    failure_type: str,
+    latency_ms: Optional[int] = None,
+    occurrences: int = 1,
+) -> dict[str, Any]:
+    """Build the alert payload for a simulated failure."""
+    return {
+        "incident_id": incident_id,
+        "monitor_id": monitor.id,
+        "monitor_name": monitor.name,
+        "monitor_url": monitor.url,
+        "failure_type": failure_type,
+        "latency_ms": latency_ms,
+        "occurrences": occurrences,
+        "message": f"Monitor '{monitor.name}' encountered a {failure_type} failure",
+    }
+
+
+async def _find_open_incidents(
+    session: AsyncSession, keys: Iterable[Tuple[int, str]]
+) -> dict[Tuple[int, str], OpenIncident]:
+    """
+    Open incidents for ``(monitor_id, error_type)`` keys.
+
+    Looked up in this transaction's staged index changes, then in the open
+    incident index when it is loaded; keys found in neither are queried from
+    SQLite, since another process may have opened their incident. If a key
+    has several open incidents, the newest wins.
+    """
+    index = get_open_incident_index()
+    found: dict[Tuple[int, str], OpenIncident] = {}
+    missing = set()
+    for key in set(keys):
+        entry = staged_open_incident(session, *key)
+        if entry is None and index is not None:
+            entry = index.get(*key)
+        if entry is not None:
+            found[key] = entry
+        else:
+            missing.add(key)
+    if not missing:
+        return found
+
+    statement = select(
+        Incident.id, Incident.monitor_id, Incident.error_type, Incident.last_alerted_at
+    ).where(
+        Incident.monitor_id.in_({monitor_id for monitor_id, _ in missing}),
+        Incident.status == "open",
+    )
+    result = await session.execute(statement)
+    queried: dict[Tuple[int, str], OpenIncident] = {}
+    for row in result:
+        key = (row.monitor_id, row.error_type)
+        if key in missing and (key not in queried or row.id > queried[key].incident_id):
+            queried[key] = OpenIncident(row.id, row.last_alerted_at)
+    if index is not None:
+        # Index incidents opened elsewhere once this transaction commits
+        for key, entry in queried.items():
+            queried[key] = remember_open_incident(
+                session, *key, entry.incident_id, entry.last_alerted_at
+            )
+    found.update(queried)
+    return found
+
+
+def _alert_due(entry: OpenIncident, now: datetime) -> bool:
+    """Whether an open incident may alert again under the rate limit."""
+    return entry.last_alerted_at is None or (
+        (now - entry.last_alerted_at).total_seconds()
+        >= settings.ALERT_RATE_LIMIT_SECONDS
+    )
+
+
+async def _coalesce(
+    session: AsyncSession,
+    key: Tuple[int, str],
+    entry: OpenIncident,
+    count: int,
+    now: datetime,
+    alerted: bool,
+) -> Optional[int]:
+    """
+    Add ``count`` occurrences to an open incident and return its new total.
+
+    Returns None, and drops the entry from the index, when the incident is
+    no longer open (or was never committed), so the caller opens a new one.
+    """
+    monitor_id, error_type = key
+    values = {"occurrences": Incident.occurrences + count, "last_seen_at": now}
+    if alerted:
+        values["last_alerted_at"] = now
+    statement = (
+        update(Incident)
+        .where(
+            Incident.id == entry.incident_id,
+            Incident.monitor_id == monitor_id,
+            Incident.error_type == error_type,
+            Incident.status == "open",
+        )
+        .values(**values)
+        .returning(Incident.occurrences)
+    )
+    occurrences = (await session.execute(statement)).scalar_one_or_none()
+    if occurrences is None:
+        forget_open_incident(monitor_id, error_type, entry.incident_id)
+    elif alerted:
+        remember_open_incident(session, monitor_id, error_type, entry.incident_id, now)
+    return occurrences
+
+
+async def coalesce_into_open_incidents(
+    session: AsyncSession,
+    groups: Sequence[Tuple[Tuple[int, str], int]],
+    now: datetime,
+) -> dict[int, tuple[int, int, bool]]:
+    """
+    Add failures to the open incidents of their monitor and type.
+    
+    ``groups`` holds ``((monitor_id, error_type), count)`` pairs. For each
+    group that has an open incident, returns by position
+    ``(incident_id, occurrences, alert_due)``; the caller opens incidents
+    for the rest, and writes an alert where one is due. Runs inside the
+    caller's transaction.
+    """
+    open_incidents = await _find_open_incidents(session, [key for key, _ in groups])
+    found: dict[int, tuple[int, int, bool]] = {}
+    for position, (key, count) in enumerate(groups):
+        entry = open_incidents.get(key)
+        if entry is None:
+            continue
+        alert_due = _alert_due(entry, now)
+        total = await _coalesce(session, key, entry, count, now, alert_due)
+        if total is not None:
+            found[position] = (entry.incident_id, total, alert_due)
+    return found
 
 
 async def simulate_failure(
@@ -22,6 +180,16 @@ async def simulate_failure(
     Simulate a failure for a monitor.
     
     This is deterministic and repeatable for demo purposes.
+    
+    The incident and its alert are written in a single transaction: the
+    incident is flushed to obtain its primary key, the alert is inserted,
+    and one commit makes both durable. If anything fails, neither row is
+    kept.
+    
+    With ``INCIDENT_DEDUP_ENABLED``, a failure on a monitor that already has
+    an open incident of the same type only bumps that incident's occurrence
+    count and last-seen time, and alerts again only once
+    ``ALERT_RATE_LIMIT_SECONDS`` have passed since its last alert.
     """
     # Validate monitor exists
     monitor = await get_monitor(session, monitor_id)
@@ -32,37 +200,294 @@ async def simulate_failure(
             "monitor_id": monitor_id,
         }
     
-    # Create incident
-    incident_create = IncidentCreate(
-        monitor_id=monitor_id,
-        error_type=failure_type,
-        status="open",
-    )
-    incident = await create_incident(session, incident_create)
+    key = (monitor_id, failure_type)
     
-    # Create alert with payload
-    alert_payload = {
-        "incident_id": incident.id,
-        "monitor_id": monitor_id,
-        "monitor_name": monitor.name,
-        "monitor_url": monitor.url,
-        "failure_type": failure_type,
-        "latency_ms": latency_ms,
-        "message": f"Monitor '{monitor.name}' encountered a {failure_type} failure",
-    }
+    async def write(
+        write_session: AsyncSession,
+    ) -> tuple[int, int, bool, Optional[Alert], datetime]:
+        now = utcnow()
+        if settings.INCIDENT_DEDUP_ENABLED:
+            entry = (await _find_open_incidents(write_session, [key])).get(key)
+            if entry is not None:
+                alert_due = _alert_due(entry, now)
+                occurrences = await _coalesce(
+                    write_session, key, entry, 1, now, alert_due
+                )
+                if occurrences is not None:
+                    alert = None
+                    if alert_due:
+                        alert = Alert(
+                            incident_id=entry.incident_id,
+                            payload=build_alert_payload(
+                                monitor, entry.incident_id, failure_type,
+                                latency_ms, occurrences,
+                            ),
+                            created_at=now,
+                        )
+                        write_session.add(alert)
+                        await write_session.flush()
+                        await enqueue_alerts(write_session, [alert.id])
+                    await bump_version(
+                        write_session,
+                        "incident",
+                        *(("alert",) if alert is not None else ()),
+                    )
+                    return entry.incident_id, occurrences, True, alert, now
+        
+        # Create incident; flushing assigns its id without a re-SELECT
+        incident = Incident(
+            monitor_id=monitor_id,
+            error_type=failure_type,
+            status="open",
+            started_at=now,
+            last_seen_at=now,
+            last_alerted_at=now,
+        )
+        write_session.add(incident)
+        await write_session.flush()
+        await record_incidents_opened(write_session, [(monitor_id, failure_type, now)])
+        
+        # Create alert with payload
+        alert = Alert(
+            incident_id=incident.id,
+            payload=build_alert_payload(monitor, incident.id, failure_type, latency_ms),
+            created_at=now,
+        )
+        write_session.add(alert)
+        await write_session.flush()
+        await enqueue_alerts(write_session, [alert.id])
+        await bump_version(write_session, "incident", "alert", "incident_rollup")
+        remember_open_incident(write_session, monitor_id, failure_type, incident.id, now)
+        return incident.id, 1, False, alert, now
     
-    alert_create = AlertCreate(
-        incident_id=incident.id,
-        payload=alert_payload,
-    )
-    alert = await create_alert(session, alert_create)
+    try:
+        incident_id, occurrences, coalesced, alert, now = await run_write(
+            session, write
+        )
+    except Exception:
+        await session.rollback()
+        raise
+    if coalesced:
+        INCIDENTS_COALESCED.inc()
+    else:
+        invalidate_uptime(monitor_id)
+        INCIDENTS_CREATED.inc()
+    if alert is not None:
+        notify_alert_dispatcher()
+        ALERTS_CREATED.inc()
+    
+    if coalesced:
+        publish_incident_updated(
+            incident_id, monitor_id, failure_type, occurrences, now
+        )
+    else:
+        publish_incident_created(incident_id, monitor_id, failure_type, "open", now)
+    if alert is not None:
+        publish_alert_created(alert.id, incident_id, now, alert.payload)
     
     return {
         "success": True,
         "monitor_id": monitor_id,
         "monitor_name": monitor.name,
-        "incident_id": incident.id,
-        "incident_status": incident.status,
-        "alert_id": alert.id,
-        "payload": alert_payload,
+        "incident_id": incident_id,
+        "incident_status": "open",
+        "coalesced": coalesced,
+        "occurrences": occurrences,
+        "alert_id": alert.id if alert is not None else None,
+        "payload": alert.payload if alert is not None else None,
     }
+
+
+async def simulate_failures_bulk(
+    session: AsyncSession,
+    failures: Sequence[Tuple[int, str, Optional[int]]],
+) -> list[dict]:
+    """
+    Simulate many failures in one transaction.
+    
+    ``failures`` is a sequence of ``(monitor_id, failure_type, latency_ms)``.
+    All monitor ids are validated in one lookup, then incidents
+    and alerts are bulk-inserted with executemany-style Core inserts and
+    committed once. Results are returned in input order; unknown monitors
+    yield a per-item error instead of failing the batch.
+    
+    With ``INCIDENT_DEDUP_ENABLED``, failures are grouped by monitor and
+    type: each group is added to the open incident of its kind with one
+    ``UPDATE``, or opens a single incident carrying the whole group's
+    occurrence count. A group produces at most one alert, subject to the
+    same rate limit as ``simulate_failure``.
+    
+    RETURNING row order is unspecified, but inside one write transaction
+    SQLite hands out rowids in insertion order, so sorting the returned ids
+    lines them up with the input without row-at-a-time inserts.
+    """
+    monitors = await get_monitors(
+        session, {monitor_id for monitor_id, _, _ in failures}
+    )
+    
+    # Input positions of accepted failures, grouped by the incident they go to
+    groups: list[tuple[Tuple[int, str], list[int]]] = []
+    if settings.INCIDENT_DEDUP_ENABLED:
+        grouped: dict[Tuple[int, str], list[int]] = {}
+        for i, (monitor_id, failure_type, _) in enumerate(failures):
+            if monitor_id in monitors:
+                grouped.setdefault((monitor_id, failure_type), []).append(i)
+        groups = list(grouped.items())
+    else:
+        groups = [
+            ((monitor_id, failure_type), [i])
+            for i, (monitor_id, failure_type, _) in enumerate(failures)
+            if monitor_id in monitors
+        ]
+    # (incident_id, occurrences, alert_id, payload) per group, in group order
+    outcomes: list[tuple[int, int, Optional[int], Optional[dict[str, Any]]]] = []
+    coalesced: set[int] = set()
+    
+    if groups:
+        now = utcnow()
+        
+        incident_table = Incident.__table__
+        alert_table = Alert.__table__
+        try:
+            # Groups with an open incident only bump its counters
+            incident_ids: dict[int, int] = {}
+            occurrences: dict[int, int] = {}
+            alerting: list[int] = []
+            if settings.INCIDENT_DEDUP_ENABLED:
+                found = await coalesce_into_open_incidents(
+                    session, [(key, len(items)) for key, items in groups], now
+                )
+                for position, (incident_id, total, alert_due) in found.items():
+                    coalesced.add(position)
+                    incident_ids[position] = incident_id
+                    occurrences[position] = total
+                    if alert_due:
+                        alerting.append(position)
+            
+            # The rest open one incident per group, each with an alert
+            opening = [p for p in range(len(groups)) if p not in coalesced]
+            if opening:
+                result = await session.execute(
+                    insert(incident_table).returning(incident_table.c.id),
+                    [
+                        {
+                            "monitor_id": groups[p][0][0],
+                            "error_type": groups[p][0][1],
+                            "status": "open",
+                            "started_at": now,
+                            "occurrences": len(groups[p][1]),
+                            "last_seen_at": now,
+                            "last_alerted_at": now,
+                        }
+                        for p in opening
+                    ],
+                )
+                for p, incident_id in zip(opening, sorted(result.scalars())):
+                    incident_ids[p] = incident_id
+                    occurrences[p] = len(groups[p][1])
+                    remember_open_incident(session, *groups[p][0], incident_id, now)
+                await record_incidents_opened(
+                    session, [(*groups[p][0], now) for p in opening]
+                )
+                alerting.extend(opening)
+            
+            alerting.sort()
+            payloads = {
+                p: build_alert_payload(
+                    monitors[groups[p][0][0]],
+                    incident_ids[p],
+                    groups[p][0][1],
+                    failures[groups[p][1][0]][2],
+                    occurrences[p],
+                )
+                for p in alerting
+            }
+            alert_ids: dict[int, int] = {}
+            if alerting:
+                result = await session.execute(
+                    insert(alert_table).returning(alert_table.c.id),
+                    [
+                        {
+                            "incident_id": incident_ids[p],
+                            "payload": payloads[p],
+                            "created_at": now,
+                        }
+                        for p in alerting
+                    ],
+                )
+                alert_ids = dict(zip(alerting, sorted(result.scalars())))
+                await enqueue_alerts(session, list(alert_ids.values()))
+            
+            tables = ["incident"]
+            if alerting:
+                tables.append("alert")
+            if opening:
+                tables.append("incident_rollup")
+            await bump_version(session, *tables)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        
+        outcomes = [
+            (incident_ids[p], occurrences[p], alert_ids.get(p), payloads.get(p))
+            for p in range(len(groups))
+        ]
+        for p in opening:
+            invalidate_uptime(groups[p][0][0])
+        if alerting:
+            notify_alert_dispatcher()
+        INCIDENTS_CREATED.inc(len(opening))
+        INCIDENTS_COALESCED.inc(sum(len(items) for _, items in groups) - len(opening))
+        ALERTS_CREATED.inc(len(alert_ids))
+        
+        for position, ((monitor_id, failure_type), _) in enumerate(groups):
+            incident_id, total, alert_id, payload = outcomes[position]
+            if position in coalesced:
+                publish_incident_updated(
+                    incident_id, monitor_id, failure_type, total, now
+                )
+            else:
+                publish_incident_created(
+                    incident_id, monitor_id, failure_type, "open", now, total
+                )
+            if alert_id is not None:
+                publish_alert_created(alert_id, incident_id, now, payload)
+    
+    # Map each accepted failure back to its group's outcome; only the first
+    # failure of a group reports the alert
+    per_item: dict[int, tuple] = {}
+    for position, (_, items) in enumerate(groups):
+        incident_id, total, alert_id, payload = outcomes[position]
+        for n, i in enumerate(items):
+            per_item[i] = (
+                incident_id,
+                total,
+                position in coalesced or n > 0,
+                alert_id if n == 0 else None,
+                payload if n == 0 else None,
+            )
+    
+    results = []
+    for i, (monitor_id, _, _) in enumerate(failures):
+        monitor = monitors.get(monitor_id)
+        if monitor is None:
+            results.append({
+                "success": False,
+                "error": "Monitor not found",
+                "monitor_id": monitor_id,
+            })
+            continue
+        incident_id, total, was_coalesced, alert_id, payload = per_item[i]
+        results.append({
+            "success": True,
+            "monitor_id": monitor_id,
+            "monitor_name": monitor.name,
+            "incident_id": incident_id,
+            "incident_status": "open",
+            "coalesced": was_coalesced,
+            "occurrences": total,
+            "alert_id": alert_id,
+            "payload": payload,
+        })
+    return results
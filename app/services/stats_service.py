@@ -0,0 +1,246 @@
+"""Incident statistics service.
+
+Statistics are served from ``IncidentRollup`` buckets, which every write
+path that opens or resolves an incident updates in the same transaction.
+Aggregate queries therefore cost O(buckets) rather than O(incidents).
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.versions import bump_version
+from app.models.incident import Incident
+from app.models.incident_rollup import IncidentRollup
+
+
+def bucket_start(timestamp: datetime) -> datetime:
+    """Truncate a timestamp to the start of its hourly bucket."""
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+async def _increment(
+    session: AsyncSession,
+    opened: Counter,
+    resolved: Counter,
+    resolution_seconds: Counter,
+) -> None:
+    """Add the given deltas to their buckets, creating buckets as needed."""
+    keys = opened.keys() | resolved.keys()
+    if not keys:
+        return
+
+    dialect = session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    table = IncidentRollup.__table__
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.monitor_id, table.c.error_type, table.c.bucket_start],
+        set_={
+            "opened": table.c.opened + statement.excluded.opened,
+            "resolved": table.c.resolved + statement.excluded.resolved,
+            "resolution_seconds": (
+                table.c.resolution_seconds + statement.excluded.resolution_seconds
+            ),
+        },
+    )
+    await session.execute(
+        statement,
+        [
+            {
+                "monitor_id": key[0],
+                "error_type": key[1],
+                "bucket_start": key[2],
+                "opened": opened[key],
+                "resolved": resolved[key],
+                "resolution_seconds": resolution_seconds[key],
+            }
+            for key in keys
+        ],
+    )
+
+
+async def record_incidents_opened(
+    session: AsyncSession, incidents: Iterable[Tuple[int, str, datetime]]
+) -> None:
+    """
+    Count newly opened incidents, given as ``(monitor_id, error_type,
+    started_at)``. Runs inside the caller's transaction.
+    """
+    opened = Counter(
+        (monitor_id, error_type, bucket_start(started_at))
+        for monitor_id, error_type, started_at in incidents
+    )
+    await _increment(session, opened, Counter(), Counter())
+
+
+async def record_incident_history(
+    session: AsyncSession,
+    incidents: Iterable[Tuple[int, str, datetime, Optional[datetime]]],
+) -> None:
+    """
+    Count incidents imported outside the service layer, given as
+    ``(monitor_id, error_type, started_at, resolved_at)`` with
+    ``resolved_at`` None for open ones. Runs inside the caller's
+    transaction.
+    """
+    opened: Counter = Counter()
+    resolved: Counter = Counter()
+    resolution_seconds: Counter = Counter()
+    for monitor_id, error_type, started_at, resolved_at in incidents:
+        key = (monitor_id, error_type, bucket_start(started_at))
+        opened[key] += 1
+        if resolved_at is not None:
+            resolved[key] += 1
+            resolution_seconds[key] += (resolved_at - started_at).total_seconds()
+    await _increment(session, opened, resolved, resolution_seconds)
+
+
+async def record_incident_resolved(
+    session: AsyncSession, incident: Incident, resolved_at: datetime
+) -> None:
+    """Credit a resolution to the bucket the incident started in."""
+    key = (incident.monitor_id, incident.error_type, bucket_start(incident.started_at))
+    duration = (resolved_at - incident.started_at).total_seconds()
+    await _increment(
+        session, Counter(), Counter({key: 1}), Counter({key: duration})
+    )
+
+
+def _filtered(
+    statement,
+    monitor_id: Optional[int],
+    error_type: Optional[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+):
+    if monitor_id is not None:
+        statement = statement.where(IncidentRollup.monitor_id == monitor_id)
+    if error_type is not None:
+        statement = statement.where(IncidentRollup.error_type == error_type)
+    if start is not None:
+        statement = statement.where(IncidentRollup.bucket_start >= bucket_start(start))
+    if end is not None:
+        statement = statement.where(IncidentRollup.bucket_start < end)
+    return statement
+
+
+async def list_incident_buckets(
+    session: AsyncSession,
+    *,
+    monitor_id: Optional[int] = None,
+    error_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[IncidentRollup]:
+    """List hourly buckets, oldest first."""
+    statement = _filtered(
+        select(IncidentRollup), monitor_id, error_type, start, end
+    ).order_by(
+        IncidentRollup.bucket_start,
+        IncidentRollup.monitor_id,
+        IncidentRollup.error_type,
+    )
+    result = await session.execute(statement)
+    return result.scalars().all()
+
+
+async def summarize_incidents(
+    session: AsyncSession,
+    *,
+    monitor_id: Optional[int] = None,
+    error_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[dict]:
+    """
+    Totals per monitor and error type over the selected buckets, with
+    open count and mean time to resolve.
+    """
+    statement = _filtered(
+        select(
+            IncidentRollup.monitor_id,
+            IncidentRollup.error_type,
+            func.sum(IncidentRollup.opened).label("opened"),
+            func.sum(IncidentRollup.resolved).label("resolved"),
+            func.sum(IncidentRollup.resolution_seconds).label("resolution_seconds"),
+        ),
+        monitor_id,
+        error_type,
+        start,
+        end,
+    ).group_by(
+        IncidentRollup.monitor_id, IncidentRollup.error_type
+    ).order_by(
+        IncidentRollup.monitor_id, IncidentRollup.error_type
+    )
+    result = await session.execute(statement)
+    return [
+        {
+            "monitor_id": row.monitor_id,
+            "error_type": row.error_type,
+            "opened": row.opened,
+            "resolved": row.resolved,
+            "open": row.opened - row.resolved,
+            "mean_time_to_resolve_seconds": (
+                row.resolution_seconds / row.resolved if row.resolved else None
+            ),
+        }
+        for row in result
+    ]
+
+
+async def rebuild_incident_rollups(
+    session: AsyncSession, chunk_size: int = 10_000
+) -> int:
+    """
+    Recompute every rollup bucket from the incidents table.
+
+    Incidents are streamed in chunks of ``chunk_size`` and folded into
+    per-bucket counters, so memory is O(buckets). The old buckets are
+    deleted first in the same transaction, which also takes the write
+    lock so no incident write can slip in between. Returns the number of
+    incidents processed.
+    """
+    await session.execute(delete(IncidentRollup))
+
+    opened: Counter = Counter()
+    resolved: Counter = Counter()
+    resolution_seconds: Counter = Counter()
+    processed = 0
+
+    statement = select(
+        Incident.monitor_id,
+        Incident.error_type,
+        Incident.status,
+        Incident.started_at,
+        Incident.resolved_at,
+    ).execution_options(yield_per=chunk_size)
+    result = await session.stream(statement)
+    async for chunk in result.partitions():
+        for row in chunk:
+            key = (row.monitor_id, row.error_type, bucket_start(row.started_at))
+            opened[key] += 1
+            if row.status == "resolved" and row.resolved_at is not None:
+                resolved[key] += 1
+                resolution_seconds[key] += (
+                    row.resolved_at - row.started_at
+                ).total_seconds()
+        processed += len(chunk)
+
+    keys = list(opened)
+    for i in range(0, len(keys), chunk_size):
+        batch = keys[i:i + chunk_size]
+        await _increment(
+            session,
+            Counter({key: opened[key] for key in batch}),
+            Counter({key: resolved[key] for key in batch}),
+            Counter({key: resolution_seconds[key] for key in batch}),
+        )
+
+    await bump_version(session, "incident_rollup")
+    await session.commit()
+    return processed
@@ -0,0 +1,226 @@
+"""Uptime and SLO service.
+
+Availability is derived from incident intervals: a monitor is down while
+any of its incidents is open. Overlapping intervals are merged in one pass
+over incidents sorted by ``started_at``, so a report costs O(incidents in
+the window).
+
+Reports are cached per (monitor, window, SLO). Each monitor has a
+generation number that is part of the cache key; opening or resolving an
+incident bumps it, which invalidates that monitor's entries in O(1).
+"""
+import itertools
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.cache import TTLCache
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.models.incident import Incident
+from app.models.monitor import Monitor
+from app.services.monitor_registry import get_monitor_registry
+
+DEFAULT_WINDOW = timedelta(days=30)
+DEFAULT_SLO_TARGET = 99.9  # percent
+
+
+@dataclass(frozen=True)
+class UptimeReport:
+    """Availability of one monitor over a time window."""
+
+    monitor_id: int
+    window_start: datetime
+    window_end: datetime
+    uptime_percent: float
+    downtime_seconds: float
+    incident_count: int
+    slo_target_percent: float
+    error_budget_seconds: float
+    error_budget_remaining_seconds: float
+    error_budget_burn: float
+    mttr_seconds: Optional[float]
+
+
+uptime_cache: TTLCache[tuple, UptimeReport] = TTLCache(
+    maxsize=settings.UPTIME_CACHE_MAX_SIZE,
+    ttl=settings.UPTIME_CACHE_TTL_SECONDS,
+)
+_generations: dict[int, int] = {}
+
+
+def invalidate_uptime(monitor_id: int) -> None:
+    """Drop cached reports for a monitor after its incidents change."""
+    _generations[monitor_id] = _generations.get(monitor_id, 0) + 1
+
+
+def _naive_utc(timestamp: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC; normalise aware inputs to match."""
+    if timestamp is None or timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def merge_downtime(
+    intervals: Iterable[Tuple[datetime, Optional[datetime]]],
+    start: datetime,
+    end: datetime,
+) -> float:
+    """
+    Seconds within ``[start, end)`` covered by the union of ``intervals``.
+
+    ``intervals`` must be sorted by start time; an interval without an end
+    is still open and runs to ``end``.
+    """
+    total = 0.0
+    current_start: Optional[datetime] = None
+    current_end: Optional[datetime] = None
+    for interval_start, interval_end in intervals:
+        interval_start = max(interval_start, start)
+        interval_end = end if interval_end is None else min(interval_end, end)
+        if interval_end <= interval_start:
+            continue
+        if current_end is None or interval_start > current_end:
+            if current_end is not None:
+                total += (current_end - current_start).total_seconds()
+            current_start, current_end = interval_start, interval_end
+        elif interval_end > current_end:
+            current_end = interval_end
+    if current_end is not None:
+        total += (current_end - current_start).total_seconds()
+    return total
+
+
+def build_report(
+    monitor_id: int,
+    intervals: Sequence[Tuple[datetime, Optional[datetime]]],
+    start: datetime,
+    end: datetime,
+    slo_target: float,
+) -> UptimeReport:
+    """Compute a report from a monitor's sorted incident intervals."""
+    window_seconds = max((end - start).total_seconds(), 0.0)
+    downtime = merge_downtime(intervals, start, end)
+    uptime = 100.0 if window_seconds == 0 else 100.0 * (1 - downtime / window_seconds)
+
+    budget = window_seconds * (100 - slo_target) / 100
+    if budget > 0:
+        burn = downtime / budget
+    else:
+        burn = 0.0 if downtime == 0 else float("inf")
+
+    durations = [
+        (resolved_at - started_at).total_seconds()
+        for started_at, resolved_at in intervals
+        if resolved_at is not None
+    ]
+    return UptimeReport(
+        monitor_id=monitor_id,
+        window_start=start,
+        window_end=end,
+        uptime_percent=uptime,
+        downtime_seconds=downtime,
+        incident_count=len(intervals),
+        slo_target_percent=slo_target,
+        error_budget_seconds=budget,
+        error_budget_remaining_seconds=budget - downtime,
+        error_budget_burn=burn,
+        mttr_seconds=sum(durations) / len(durations) if durations else None,
+    )
+
+
+async def get_uptime_reports(
+    session: AsyncSession,
+    monitor_ids: Sequence[int],
+    *,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    slo_target: float = DEFAULT_SLO_TARGET,
+) -> dict[int, UptimeReport]:
+    """
+    Uptime reports for several monitors, keyed by monitor id.
+
+    ``end`` defaults to now and is capped at now; ``start`` defaults to
+    ``DEFAULT_WINDOW`` before ``end``. Unknown monitors are left out.
+    Cache misses are computed together from one query.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    now = utcnow()
+    window_end = min(end, now) if end is not None else now
+    window_start = start if start is not None else window_end - DEFAULT_WINDOW
+    window_start = min(window_start, window_end)
+    # Windows reaching the present change as time passes
+    ttl = (
+        settings.UPTIME_CACHE_LIVE_TTL_SECONDS
+        if end is None or end >= now
+        else None
+    )
+
+    reports: dict[int, UptimeReport] = {}
+    keys: dict[int, tuple] = {}
+    for monitor_id in dict.fromkeys(monitor_ids):
+        key = (monitor_id, _generations.get(monitor_id, 0), start, end, slo_target)
+        report = uptime_cache.get(key)
+        if report is not None:
+            reports[monitor_id] = report
+        else:
+            keys[monitor_id] = key
+    if not keys:
+        return reports
+
+    # Monitors the registry does not hold may have been created elsewhere
+    registry = get_monitor_registry()
+    known = {m for m in keys if m in registry} if registry is not None else set()
+    if len(known) < len(keys):
+        statement = select(Monitor.id).where(Monitor.id.in_(keys.keys() - known))
+        result = await session.execute(statement)
+        known.update(row.id for row in result)
+    missing = {m: key for m, key in keys.items() if m in known}
+    if not missing:
+        return reports
+
+    statement = (
+        select(Incident.monitor_id, Incident.started_at, Incident.resolved_at)
+        .where(
+            Incident.monitor_id.in_(missing),
+            Incident.started_at < window_end,
+            or_(Incident.resolved_at.is_(None), Incident.resolved_at > window_start),
+        )
+        .order_by(Incident.monitor_id, Incident.started_at)
+    )
+    result = await session.execute(statement)
+    intervals = {
+        monitor_id: [(row.started_at, row.resolved_at) for row in rows]
+        for monitor_id, rows in itertools.groupby(result, key=lambda row: row.monitor_id)
+    }
+
+    for monitor_id, key in missing.items():
+        report = build_report(
+            monitor_id,
+            intervals.get(monitor_id, []),
+            window_start,
+            window_end,
+            slo_target,
+        )
+        uptime_cache.set(key, report, ttl=ttl)
+        reports[monitor_id] = report
+    return reports
+
+
+async def get_uptime_report(
+    session: AsyncSession,
+    monitor_id: int,
+    *,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    slo_target: float = DEFAULT_SLO_TARGET,
+) -> Optional[UptimeReport]:
+    """Uptime report for one monitor, or None if it does not exist."""
+    reports = await get_uptime_reports(
+        session, [monitor_id], start=start, end=end, slo_target=slo_target
+    )
+    return reports.get(monitor_id)
@@ -0,0 +1,165 @@
+"""Shared test fixtures."""
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.core.database import get_read_session, get_session
+from app.main import app
+
+
+@pytest.fixture
+def database_url():
+    """
+    URL of the test database.
+    
+    In memory by default; modules whose code opens several sessions that
+    must see each other's commits override this with a file under tmp_path.
+    """
+    return "sqlite+aiosqlite:///:memory:"
+
+
+@pytest.fixture
+async def engine(database_url):
+    """Create a test database engine with every table created."""
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    """Create a session factory bound to the test database."""
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+async def db_session(session_factory):
+    """Create test database session."""
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+async def client(db_session):
+    """Create test client whose requests use the test database session."""
+    async def override_get_session():
+        yield db_session
+    
+    app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_session] = override_get_session
+    
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+    
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+async def stub_server():
+    """
+    Start local stand-in HTTP servers.
+    
+    Yields a factory ``start(status_code=200, delay=0.0)`` returning the base
+    URL and a stats dict counting accepted connections and served requests.
+    """
+    servers = []
+    handlers = set()
+    
+    async def start(status_code: int = 200, delay: float = 0.0):
+        stats = {"connections": 0, "requests": 0}
+        
+        async def handle(reader, writer):
+            stats["connections"] += 1
+            handlers.add(asyncio.current_task())
+            try:
+                while True:
+                    await reader.readuntil(b"\r\n\r\n")
+                    stats["requests"] += 1
+                    if delay:
+                        await asyncio.sleep(delay)
+                    writer.write(
+                        f"HTTP/1.1 {status_code} OK\r\n"
+                        "Content-Length: 2\r\n\r\nok".encode()
+                    )
+                    await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+                pass
+            finally:
+                handlers.discard(asyncio.current_task())
+                writer.close()
+        
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        servers.append(server)
+        port = server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/", stats
+    
+    yield start
+    
+    for server in servers:
+        server.close()
+    for handler in list(handlers):
+        handler.cancel()
+    await asyncio.gather(*handlers, return_exceptions=True)
+
+
+
+@pytest.fixture
+async def webhook_receiver():
+    """
+    Start a local stand-in webhook receiver.
+    
+    Yields a factory ``start(statuses=(), delay=0.0)`` returning the URL and
+    the list of JSON bodies received. Requests are answered with the given
+    status codes in order, then with 200.
+    """
+    servers = []
+    handlers = set()
+    
+    async def start(statuses=(), delay: float = 0.0):
+        received = []
+        pending = list(statuses)
+        
+        async def handle(reader, writer):
+            handlers.add(asyncio.current_task())
+            try:
+                while True:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                    length = 0
+                    for line in head.decode().split("\r\n"):
+                        name, _, value = line.partition(":")
+                        if name.lower() == "content-length":
+                            length = int(value)
+                    received.append(json.loads(await reader.readexactly(length)))
+                    if delay:
+                        await asyncio.sleep(delay)
+                    status_code = pending.pop(0) if pending else 200
+                    writer.write(
+                        f"HTTP/1.1 {status_code} OK\r\n"
+                        "Content-Length: 0\r\n\r\n".encode()
+                    )
+                    await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+                pass
+            finally:
+                handlers.discard(asyncio.current_task())
+                writer.close()
+        
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        servers.append(server)
+        port = server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/hook", received
+    
+    yield start
+    
+    for server in servers:
+        server.close()
+    for handler in list(handlers):
+        handler.cancel()
+    await asyncio.gather(*handlers, return_exceptions=True)
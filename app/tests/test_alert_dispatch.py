@@ -0,0 +1,277 @@
+"""Test suite for outbox-based alert dispatch."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.models.alert import Alert
+from app.models.alert_outbox import AlertOutbox
+from app.models.monitor import Monitor
+from app.services.dispatch_service import (
+    AlertDispatcher,
+    WebhookSender,
+    enqueue_alerts,
+    summarize_outbox,
+)
+from app.services.simulation_service import simulate_failure, simulate_failures_bulk
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """Use a file database, so the dispatcher's sessions see the same data."""
+    return f"sqlite+aiosqlite:///{tmp_path / 'outbox.db'}"
+
+
+@pytest.fixture(autouse=True)
+async def monitor(session_factory):
+    """Create the monitor the tests' failures are simulated on."""
+    async with session_factory() as session:
+        session.add(Monitor(name="api", url="https://example.com"))
+        await session.commit()
+
+
+@pytest.fixture
+def channels(monkeypatch):
+    """Configure a single alert channel."""
+    monkeypatch.setattr(settings, "ALERT_CHANNELS", {"ops": "http://unused"})
+
+
+async def outbox_rows(session_factory) -> list[AlertOutbox]:
+    """All outbox rows, oldest first."""
+    async with session_factory() as session:
+        result = await session.execute(select(AlertOutbox).order_by(AlertOutbox.id))
+        return result.scalars().all()
+
+
+async def wait_until(condition, timeout: float = 5.0) -> None:
+    """Poll ``condition`` until it holds, failing after ``timeout`` seconds."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def delivered(session_factory, count: int):
+    """Condition: ``count`` outbox rows have been delivered or given up."""
+    async def check() -> bool:
+        rows = await outbox_rows(session_factory)
+        return sum(row.status != "pending" for row in rows) == count
+    return check
+
+
+@pytest.mark.asyncio
+async def test_alerts_are_enqueued_with_their_transaction(session_factory, channels):
+    """Test that every alert gets an outbox row per channel in its own transaction."""
+    async with session_factory() as session:
+        result = await simulate_failure(session, 1, "timeout")
+        await simulate_failures_bulk(session, [(1, "500", None), (2, "500", None)])
+
+    rows = await outbox_rows(session_factory)
+    assert [(row.alert_id, row.channel, row.status) for row in rows] == [
+        (result["alert_id"], "ops", "pending"),
+        (result["alert_id"] + 1, "ops", "pending"),
+    ]
+
+    # Nothing is queued when no channel is configured
+    async with session_factory() as session:
+        await enqueue_alerts(session, [1], channels=[])
+        await session.commit()
+        assert await summarize_outbox(session) == [
+            {"channel": "ops", "status": "pending", "count": 2}
+        ]
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_delivers_in_batches(session_factory, channels, webhook_receiver):
+    """Test that pending alerts are delivered in batches of up to batch_size."""
+    url, received = await webhook_receiver()
+    async with session_factory() as session:
+        await simulate_failures_bulk(session, [(1, "timeout", None)] * 25)
+
+    sender = WebhookSender(timeout=5)
+    dispatcher = AlertDispatcher(
+        session_factory, {"ops": url}, sender, batch_size=10, poll_interval=0.05
+    )
+    dispatcher.start()
+    try:
+        await wait_until(delivered(session_factory, 25))
+    finally:
+        await dispatcher.stop()
+        await sender.aclose()
+
+    assert [len(body["alerts"]) for body in received] == [10, 10, 5]
+    assert all(body["channel"] == "ops" for body in received)
+    assert [a["id"] for body in received for a in body["alerts"]] == list(range(1, 26))
+    assert received[0]["alerts"][0]["payload"]["failure_type"] == "timeout"
+
+    rows = await outbox_rows(session_factory)
+    assert {(row.status, row.attempts) for row in rows} == {("delivered", 1)}
+    assert all(row.delivered_at is not None for row in rows)
+    assert dispatcher.stats()["delivered"] == 25
+
+
+@pytest.mark.asyncio
+async def test_failed_deliveries_are_retried_then_given_up(
+    session_factory, channels, webhook_receiver
+):
+    """Test that failed deliveries are retried with backoff, then given up."""
+    url, received = await webhook_receiver(statuses=[500, 503])
+    async with session_factory() as session:
+        await simulate_failure(session, 1, "timeout")
+
+    sender = WebhookSender(timeout=5)
+    dispatcher = AlertDispatcher(
+        session_factory, {"ops": url}, sender, backoff=0.01, poll_interval=0.01
+    )
+    dispatcher.start()
+    try:
+        await wait_until(delivered(session_factory, 1))
+    finally:
+        await dispatcher.stop()
+        await sender.aclose()
+
+    assert len(received) == 3
+    [row] = await outbox_rows(session_factory)
+    assert (row.status, row.attempts) == ("delivered", 3)
+    assert dispatcher.stats()["retried"] == 2
+
+    # An unreachable channel exhausts its attempts and is marked failed
+    async with session_factory() as session:
+        await simulate_failure(session, 1, "500")
+    sender = WebhookSender(timeout=5)
+    dispatcher = AlertDispatcher(
+        session_factory,
+        {"ops": "http://127.0.0.1:1/hook"},
+        sender,
+        max_attempts=3,
+        backoff=0.01,
+        poll_interval=0.01,
+    )
+    dispatcher.start()
+    try:
+        await wait_until(delivered(session_factory, 2))
+    finally:
+        await dispatcher.stop()
+        await sender.aclose()
+
+    row = (await outbox_rows(session_factory))[-1]
+    assert (row.status, row.attempts) == ("failed", 3)
+    assert row.last_error.startswith("ConnectError")
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_and_request_path(session_factory, channels):
+    """Test that in-flight deliveries are capped and never block new failures."""
+    release = asyncio.Event()
+    active = {"now": 0, "max": 0}
+
+    async def slow_send(channel, url, alerts):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await release.wait()
+        active["now"] -= 1
+
+    dispatcher = AlertDispatcher(
+        session_factory,
+        {"ops": "http://unused", "pager": "http://unused"},
+        slow_send,
+        batch_size=1,
+        max_in_flight=2,
+        poll_interval=0.01,
+    )
+    dispatcher.start()
+    try:
+        # Failures are recorded while every delivery is stuck
+        async with session_factory() as session:
+            for _ in range(4):
+                result = await asyncio.wait_for(
+                    simulate_failure(session, 1, "timeout"), timeout=1
+                )
+                assert result["success"]
+                await enqueue_alerts(session, [result["alert_id"]], ["pager"])
+                await session.commit()
+        await asyncio.sleep(0.1)
+        assert active["max"] == 2
+        assert dispatcher.stats()["in_flight"] == 2
+
+        release.set()
+        await wait_until(delivered(session_factory, 8))
+    finally:
+        await dispatcher.stop()
+    assert active["max"] == 2
+
+
+@pytest.mark.asyncio
+async def test_leased_rows_are_redelivered_after_a_restart(session_factory, channels):
+    """Test that rows leased by a dead dispatcher are redelivered after the lease."""
+    async with session_factory() as session:
+        await simulate_failures_bulk(session, [(1, "timeout", None)] * 3)
+
+    # A process that claimed the rows and died left them leased
+    crashed = AlertDispatcher(session_factory, {"ops": "http://unused"}, None)
+    assert len(await crashed._claim("ops")) == 3
+    assert await crashed._claim("ops") == []
+
+    sent = []
+
+    async def send(channel, url, alerts):
+        sent.extend(a["id"] for a in alerts)
+
+    def lease_expired() -> datetime:
+        return datetime.utcnow() + timedelta(seconds=21)
+
+    dispatcher = AlertDispatcher(
+        session_factory,
+        {"ops": "http://unused"},
+        send,
+        poll_interval=0.01,
+        clock=lease_expired,
+    )
+    dispatcher.start()
+    try:
+        await wait_until(delivered(session_factory, 3))
+    finally:
+        await dispatcher.stop()
+    assert sent == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_rows_of_deleted_alerts_fail_without_blocking(session_factory, channels):
+    """Test that outbox rows whose alert was deleted fail and the rest deliver."""
+    async with session_factory() as session:
+        await simulate_failures_bulk(session, [(1, "timeout", None)] * 3)
+        await session.execute(delete(Alert).where(Alert.id == 2))
+        await session.commit()
+
+    sent = []
+
+    async def send(channel, url, alerts):
+        sent.extend(a["id"] for a in alerts)
+
+    dispatcher = AlertDispatcher(
+        session_factory, {"ops": "http://unused"}, send, poll_interval=0.01
+    )
+    dispatcher.start()
+    try:
+        await wait_until(delivered(session_factory, 3))
+    finally:
+        await dispatcher.stop()
+
+    assert sent == [1, 3]
+    rows = await outbox_rows(session_factory)
+    assert [(row.alert_id, row.status, row.last_error) for row in rows] == [
+        (1, "delivered", None),
+        (2, "failed", "alert not found"),
+        (3, "delivered", None),
+    ]
+    assert dispatcher.stats()["failed"] == 1
+
+
+def test_retry_delay_doubles_and_is_capped():
+    """Test that the retry delay doubles per attempt up to max_backoff, with jitter."""
+    dispatcher = AlertDispatcher(None, {}, None, backoff=1.0, max_backoff=10.0)
+    for attempts, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (5, 10.0), (20, 10.0)]:
+        delay = dispatcher.retry_delay(attempts)
+        assert ceiling / 2 <= delay <= ceiling
@@ -0,0 +1,101 @@
+"""Test suite for the authenticated-request caches."""
+from datetime import timedelta
+
+import pytest
+
+from app.api import deps
+from app.core import security
+from app.core.cache import TTLCache
+from app.schemas.user import UserCreate
+from app.services import auth_service
+
+
+class FakeClock:
+    """Monotonic clock the test moves by hand."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start and end every test with empty caches."""
+    security.token_cache.clear()
+    auth_service.user_cache.clear()
+    yield
+    security.token_cache.clear()
+    auth_service.user_cache.clear()
+
+
+def test_ttl_cache_expiry_and_lru_bound():
+    """Test that entries expire after their TTL and the LRU entry is evicted."""
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=10, clock=clock)
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=1)
+    assert cache.get("a") == 1
+    clock.now = 2
+    assert cache.get("b") is None
+
+    cache.set("b", 2)
+    cache.set("c", 3)  # "a" is least recently used
+    assert cache.get("a") is None
+    assert cache.get("c") == 3
+    assert cache.stats() == {"hits": 2, "misses": 2, "evictions": 1, "size": 2}
+
+
+@pytest.mark.asyncio
+async def test_warm_request_skips_crypto_and_database(db_session, monkeypatch):
+    """Test that a repeated token skips JWT decoding and the user lookup."""
+    user = await auth_service.create_user(
+        db_session, UserCreate(email="cache@example.com", password="testpass123")
+    )
+    token = auth_service.create_access_token_for_user(user)
+    header = f"Bearer {token}"
+
+    first = await deps.get_current_user_with_header(header, db_session)
+    assert first.email == user.email
+
+    def fail(*args, **kwargs):
+        raise AssertionError("warm request should not reach this")
+
+    monkeypatch.setattr(security.jwt, "decode", fail)
+    monkeypatch.setattr(auth_service, "get_user_by_email", fail)
+
+    second = await deps.get_current_user_with_header(header, db_session)
+    assert second.id == user.id
+    assert security.token_cache.stats()["hits"] == 1
+    assert auth_service.user_cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_and_expired_tokens_are_not_cached():
+    """Test that invalid and expired tokens are rejected and not cached."""
+    assert security.decode_token_cached("not-a-token") is None
+
+    expired = security.create_access_token(
+        {"sub": "x@example.com"}, expires_delta=timedelta(seconds=-1)
+    )
+    assert security.decode_token_cached(expired) is None
+    assert len(security.token_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_user_cache_invalidated_on_change(db_session):
+    """Test that invalidating a user drops its cached lookup."""
+    assert await auth_service.get_user_by_email_cached(
+        db_session, "new@example.com"
+    ) is None
+
+    await auth_service.create_user(
+        db_session, UserCreate(email="new@example.com", password="testpass123")
+    )
+    await auth_service.get_user_by_email_cached(db_session, "new@example.com")
+    assert len(auth_service.user_cache) == 1
+
+    auth_service.invalidate_user("new@example.com")
+    assert len(auth_service.user_cache) == 0
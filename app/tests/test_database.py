@@ -0,0 +1,78 @@
+"""Test suite for database engine setup."""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import app.models  # noqa: F401  (registers every table)
+from app.core.database import create_engines, ensure_columns
+
+
+@pytest.mark.asyncio
+async def test_production_profile_applies_pragmas(tmp_path):
+    """Test that the production profile enables WAL and its pragmas."""
+    writer, reader = create_engines(
+        f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}", "production"
+    )
+    
+    async with writer.connect() as conn:
+        journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        synchronous = (await conn.execute(text("PRAGMA synchronous"))).scalar()
+        busy_timeout = (await conn.execute(text("PRAGMA busy_timeout"))).scalar()
+    
+    await writer.dispose()
+    await reader.dispose()
+    
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+    assert busy_timeout == 5000
+
+
+@pytest.mark.asyncio
+async def test_read_engine_is_query_only(tmp_path):
+    """Test that the read engine refuses writes."""
+    writer, reader = create_engines(
+        f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}", "production"
+    )
+    assert reader is not writer
+    
+    async with writer.begin() as conn:
+        await conn.execute(text("CREATE TABLE probe (value INTEGER)"))
+    
+    async with reader.connect() as conn:
+        with pytest.raises(OperationalError):
+            await conn.execute(text("INSERT INTO probe VALUES (1)"))
+    
+    await writer.dispose()
+    await reader.dispose()
+
+
+def test_in_memory_database_shares_one_engine():
+    """Test that in-memory databases do not get a separate reader."""
+    writer, reader = create_engines("sqlite+aiosqlite:///:memory:", "production")
+    assert reader is writer
+
+
+
+@pytest.mark.asyncio
+async def test_ensure_columns_adds_new_model_columns(tmp_path):
+    """Test that columns added to a model are added to an existing table."""
+    writer, reader = create_engines(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    async with writer.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE incident (id INTEGER PRIMARY KEY, monitor_id INTEGER, "
+            "status VARCHAR, error_type VARCHAR, started_at DATETIME, "
+            "resolved_at DATETIME)"
+        ))
+        await conn.execute(text(
+            "INSERT INTO incident (monitor_id, status, error_type) VALUES (1, 'open', '500')"
+        ))
+        await conn.run_sync(ensure_columns)
+        await conn.run_sync(ensure_columns)
+        row = (await conn.execute(text(
+            "SELECT occurrences, last_seen_at, last_alerted_at FROM incident"
+        ))).one()
+    
+    await writer.dispose()
+    await reader.dispose()
+    
+    assert tuple(row) == (1, None, None)
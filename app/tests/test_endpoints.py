@@ -1,47 +1,18 @@
 """Test suite for API Pulse endpoints."""
+import csv
+import io
+import json
+
 import pytest
-from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-from sqlmodel import SQLModel
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import select
 
-from app.core.database import get_session
-from app.main import app
+from app.commands.generate_data import GenerateOptions, generate_data
+from app.core.config import settings
+from app.models.alert import Alert
+from app.schemas.alert import AlertResponse
 from app.schemas.user import UserCreate
-
-
-# Test database URL
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
-
-
-@pytest.fixture
-async def db_session():
-    """Create test database session."""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False, future=True)
-    
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
-    
-    async_session_local = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
-    
-    async with async_session_local() as session:
-        yield session
-
-
-@pytest.fixture
-async def client(db_session):
-    """Create test client."""
-    async def override_get_session():
-        yield db_session
-    
-    app.dependency_overrides[get_session] = override_get_session
-    
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        yield client
-    
-    app.dependency_overrides.clear()
+from app.services.stats_service import rebuild_incident_rollups
 
 
 @pytest.mark.asyncio
@@ -355,3 +326,420 @@ async def test_list_alerts(client):
     assert response.status_code == 200
     data = response.json()
     assert len(data) > 0
+
+
+@pytest.mark.asyncio
+async def test_list_alerts_matches_response_model_output(client, db_session):
+    """Test that the orjson list encoding matches FastAPI's response_model output."""
+    create_response = await client.post(
+        "/monitors",
+        json={
+            "name": "Test Monitor",
+            "url": "https://example.com"
+        }
+    )
+    monitor_id = create_response.json()["id"]
+    for failure_type in ("timeout", "500"):
+        await client.post(
+            f"/monitors/{monitor_id}/simulate-failure",
+            json={"failure_type": failure_type}
+        )
+    
+    response = await client.get("/alerts")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "ETag" in response.headers
+    
+    # What response_model=list[AlertResponse] produced from the ORM rows
+    result = await db_session.execute(select(Alert).order_by(Alert.id))
+    expected = jsonable_encoder(
+        [AlertResponse.model_validate(alert) for alert in result.scalars()]
+    )
+    assert len(expected) == 2
+    assert response.json() == expected
+
+
+@pytest.mark.asyncio
+async def test_list_incidents_pagination_and_filters(client):
+    """Test keyset pagination and filtering of incidents."""
+    create_response = await client.post(
+        "/monitors",
+        json={
+            "name": "Test Monitor",
+            "url": "https://example.com"
+        }
+    )
+    monitor_id = create_response.json()["id"]
+    
+    for failure_type in ["timeout", "500", "timeout"]:
+        await client.post(
+            f"/monitors/{monitor_id}/simulate-failure",
+            json={"failure_type": failure_type}
+        )
+    
+    first_page = await client.get("/incidents", params={"limit": 2})
+    assert first_page.status_code == 200
+    assert len(first_page.json()) == 2
+    cursor = first_page.headers["X-Next-Cursor"]
+    
+    second_page = await client.get(
+        "/incidents", params={"limit": 2, "cursor": cursor}
+    )
+    assert second_page.status_code == 200
+    assert len(second_page.json()) == 1
+    assert "X-Next-Cursor" not in second_page.headers
+    
+    seen = [i["id"] for i in first_page.json() + second_page.json()]
+    assert len(set(seen)) == 3
+    
+    filtered = await client.get(
+        "/incidents", params={"monitor_id": monitor_id, "error_type": "timeout"}
+    )
+    assert len(filtered.json()) == 2
+    assert all(i["error_type"] == "timeout" for i in filtered.json())
+    
+    invalid = await client.get("/incidents", params={"cursor": "not-a-cursor"})
+    assert invalid.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_sparse_fieldsets(client):
+    """Test selecting a subset of fields on list endpoints."""
+    create_response = await client.post(
+        "/monitors",
+        json={
+            "name": "Test Monitor",
+            "url": "https://example.com"
+        }
+    )
+    monitor_id = create_response.json()["id"]
+    
+    for failure_type in ["timeout", "500", "latency"]:
+        await client.post(
+            f"/monitors/{monitor_id}/simulate-failure",
+            json={"failure_type": failure_type}
+        )
+    
+    full = await client.get("/incidents")
+    sparse = await client.get(
+        "/incidents", params={"fields": "id,status,monitor_id,id"}
+    )
+    assert sparse.status_code == 200
+    assert sparse.json() == [
+        {"id": i["id"], "status": i["status"], "monitor_id": i["monitor_id"]}
+        for i in full.json()
+    ]
+    assert sparse.headers["ETag"] == full.headers["ETag"]
+    
+    # Pagination works even when the cursor columns are not selected
+    first_page = await client.get(
+        "/incidents", params={"fields": "error_type", "limit": 2}
+    )
+    assert first_page.json() == [{"error_type": i["error_type"]} for i in full.json()[:2]]
+    second_page = await client.get(
+        "/incidents",
+        params={
+            "fields": "error_type",
+            "limit": 2,
+            "cursor": first_page.headers["X-Next-Cursor"],
+        },
+    )
+    assert second_page.json() == [{"error_type": full.json()[2]["error_type"]}]
+    
+    alerts = await client.get("/alerts")
+    sparse_alerts = await client.get(
+        "/alerts", params={"fields": "id,incident_id,created_at"}
+    )
+    assert sparse_alerts.status_code == 200
+    assert sparse_alerts.json() == [
+        {k: a[k] for k in ("id", "incident_id", "created_at")} for a in alerts.json()
+    ]
+    
+    unknown = await client.get("/alerts", params={"fields": "id,secret"})
+    assert unknown.status_code == 400
+    assert "secret" in unknown.json()["detail"]
+    empty = await client.get("/incidents", params={"fields": ","})
+    assert empty.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_alert_outbox(client, monkeypatch):
+    """Test that alerts are queued for delivery on configured channels."""
+    response = await client.get("/alerts/outbox")
+    assert response.json() == {"channels": [], "dispatcher": None}
+    
+    monkeypatch.setattr(settings, "ALERT_CHANNELS", {"ops": "http://localhost/hook"})
+    create_response = await client.post(
+        "/monitors",
+        json={
+            "name": "Test Monitor",
+            "url": "https://example.com"
+        }
+    )
+    await client.post(
+        f"/monitors/{create_response.json()['id']}/simulate-failure",
+        json={"failure_type": "timeout"}
+    )
+    await client.post("/alerts/test")
+    
+    response = await client.get("/alerts/outbox")
+    assert response.json()["channels"] == [
+        {"channel": "ops", "status": "pending", "count": 2}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_alerts(client):
+    """Test streaming alert export as NDJSON and CSV."""
+    create_response = await client.post(
+        "/monitors",
+        json={
+            "name": "Test Monitor",
+            "url": "https://example.com"
+        }
+    )
+    monitor_id = create_response.json()["id"]
+    
+    for failure_type in ["timeout", "500"]:
+        await client.post(
+            f"/monitors/{monitor_id}/simulate-failure",
+            json={"failure_type": failure_type}
+        )
+    
+    response = await client.get("/alerts/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 2
+    assert lines[0]["payload"]["failure_type"] == "timeout"
+    
+    response = await client.get("/alerts/export", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "incident_id", "created_at", "payload"]
+    assert len(rows) == 3
+
+
+@pytest.mark.asyncio
+async def test_simulate_failure_is_atomic(client, db_session, monkeypatch):
+    """Test that a failed alert insert leaves no orphan incident behind."""
+    from app.services import simulation_service
+
+    create_response = await client.post(
+        "/monitors",
+        json={
+            "name": "Test Monitor",
+            "url": "https://example.com"
+        }
+    )
+    monitor_id = create_response.json()["id"]
+    
+    def failing_payload(*args, **kwargs):
+        raise RuntimeError("alert insert failed")
+    
+    monkeypatch.setattr(simulation_service, "build_alert_payload", failing_payload)
+    with pytest.raises(RuntimeError):
+        await simulation_service.simulate_failure(db_session, monitor_id, "timeout")
+    
+    response = await client.get("/incidents")
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_simulate_failures_batch(client):
+    """Test simulating failures for many monitors in one request."""
+    monitor_ids = []
+    for name in ["First Monitor", "Second Monitor"]:
+        create_response = await client.post(
+            "/monitors",
+            json={
+                "name": name,
+                "url": "https://example.com"
+            }
+        )
+        monitor_ids.append(create_response.json()["id"])
+    
+    response = await client.post(
+        "/monitors/simulate-failures",
+        json={
+            "failures": [
+                {"monitor_id": monitor_ids[0], "failure_type": "timeout"},
+                {"monitor_id": 999, "failure_type": "500"},
+                {"monitor_id": monitor_ids[1], "failure_type": "latency", "latency_ms": 5000},
+            ]
+        }
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["succeeded"] == 2
+    assert data["failed"] == 1
+    results = data["results"]
+    assert results[0]["success"] is True
+    assert results[1]["success"] is False
+    assert results[2]["payload"]["latency_ms"] == 5000
+    
+    incident = await client.get(f"/incidents/{results[2]['incident_id']}")
+    assert incident.json()["monitor_id"] == monitor_ids[1]
+    
+    alerts = await client.get("/alerts")
+    assert {a["id"] for a in alerts.json()} == {results[0]["alert_id"], results[2]["alert_id"]}
+
+
+@pytest.mark.asyncio
+async def test_incident_stats(client, db_session):
+    """Test incident rollups are maintained on write and match a rebuild."""
+    create_response = await client.post(
+        "/monitors",
+        json={
+            "name": "Test Monitor",
+            "url": "https://example.com"
+        }
+    )
+    monitor_id = create_response.json()["id"]
+    
+    first = await client.post(
+        f"/monitors/{monitor_id}/simulate-failure",
+        json={"failure_type": "timeout"}
+    )
+    await client.post(
+        "/monitors/simulate-failures",
+        json={
+            "failures": [
+                {"monitor_id": monitor_id, "failure_type": "timeout"},
+                {"monitor_id": monitor_id, "failure_type": "500"},
+            ]
+        }
+    )
+    incident_id = first.json()["incident_id"]
+    await client.post(f"/incidents/{incident_id}/resolve", json={})
+    # Resolving twice must not count twice
+    await client.post(f"/incidents/{incident_id}/resolve", json={})
+    
+    response = await client.get("/stats/incidents/summary")
+    assert response.status_code == 200
+    summary = {row["error_type"]: row for row in response.json()}
+    assert summary["timeout"]["opened"] == 2
+    assert summary["timeout"]["resolved"] == 1
+    assert summary["timeout"]["open"] == 1
+    assert summary["timeout"]["mean_time_to_resolve_seconds"] >= 0
+    assert summary["500"]["open"] == 1
+    assert summary["500"]["mean_time_to_resolve_seconds"] is None
+    
+    buckets = (await client.get("/stats/incidents", params={"error_type": "timeout"})).json()
+    assert sum(b["opened"] for b in buckets) == 2
+    
+    processed = await rebuild_incident_rollups(db_session, chunk_size=1)
+    assert processed == 3
+    rebuilt = (await client.get("/stats/incidents")).json()
+    assert sum(b["opened"] for b in rebuilt) == 3
+    assert sum(b["resolved"] for b in rebuilt) == 1
+
+
+@pytest.mark.asyncio
+async def test_monitor_uptime(client):
+    """Test uptime reports and their invalidation on incident changes."""
+    monitor_ids = []
+    for name in ["First Monitor", "Second Monitor"]:
+        create_response = await client.post(
+            "/monitors",
+            json={
+                "name": name,
+                "url": "https://example.com"
+            }
+        )
+        monitor_ids.append(create_response.json()["id"])
+    
+    response = await client.get(f"/monitors/{monitor_ids[0]}/uptime")
+    assert response.status_code == 200
+    assert response.json()["uptime_percent"] == 100.0
+    assert response.json()["incident_count"] == 0
+    
+    # A new incident invalidates the cached report
+    failure = await client.post(
+        f"/monitors/{monitor_ids[0]}/simulate-failure",
+        json={"failure_type": "timeout"}
+    )
+    await client.post(f"/incidents/{failure.json()['incident_id']}/resolve", json={})
+    response = await client.get(f"/monitors/{monitor_ids[0]}/uptime")
+    data = response.json()
+    assert data["incident_count"] == 1
+    assert data["uptime_percent"] < 100.0
+    assert data["mttr_seconds"] is not None
+    
+    response = await client.get(
+        "/monitors/uptime",
+        params={"monitor_id": [monitor_ids[1], 999, monitor_ids[0]], "slo": 99},
+    )
+    assert response.status_code == 200
+    reports = response.json()
+    assert [r["monitor_id"] for r in reports] == [monitor_ids[1], monitor_ids[0]]
+    assert reports[0]["error_budget_burn"] == 0.0
+    assert reports[1]["slo_target_percent"] == 99
+    
+    missing = await client.get("/monitors/999/uptime")
+    assert missing.status_code == 404
+    bad_window = await client.get(
+        f"/monitors/{monitor_ids[0]}/uptime",
+        params={"start": "2024-02-01T00:00:00", "end": "2024-01-01T00:00:00"},
+    )
+    assert bad_window.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_conditional_get(client, monkeypatch):
+    """Test ETags and 304 responses driven by table versions."""
+    response = await client.get("/monitors")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    
+    # An unchanged table is answered without running the endpoint
+    async def fail(*args, **kwargs):
+        raise AssertionError("endpoint should not run")
+    
+    monkeypatch.setattr("app.api.monitors.list_monitors", fail)
+    response = await client.get("/monitors", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    monkeypatch.undo()
+    
+    await client.post(
+        "/monitors",
+        json={
+            "name": "Test Monitor",
+            "url": "https://example.com"
+        }
+    )
+    response = await client.get("/monitors", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 1
+    
+    # Writes to other tables leave the monitor ETag alone
+    monitor_etag = response.headers["ETag"]
+    incidents = await client.get("/incidents")
+    await client.post(
+        f"/monitors/{response.json()[0]['id']}/simulate-failure",
+        json={"failure_type": "timeout"}
+    )
+    response = await client.get("/monitors", headers={"If-None-Match": monitor_etag})
+    assert response.status_code == 304
+    response = await client.get(
+        "/incidents", headers={"If-None-Match": incidents.headers["ETag"]}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_sees_writes_outside_the_api(client, db_session):
+    """Test that writes made outside the API change the ETag too."""
+    response = await client.get("/monitors")
+    etag = response.headers["ETag"]
+    
+    # The generator writes rows with Core inserts, as another process would
+    await generate_data(db_session, GenerateOptions(monitors=3, incidents=0, alerts=0))
+    
+    response = await client.get("/monitors", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 3
@@ -0,0 +1,206 @@
+"""Test suite for the live incident feed."""
+import asyncio
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.models.monitor import Monitor
+from app.services import feed_service
+from app.services.feed_service import Broadcaster
+from app.services.incident_service import resolve_incident
+from app.services.simulation_service import simulate_failure, simulate_failures_bulk
+
+
+@pytest.fixture
+def broadcaster(monkeypatch):
+    """Install a small broadcaster in place of the application's."""
+    broadcaster = Broadcaster(history_size=10, queue_size=4)
+    monkeypatch.setattr(feed_service, "_broadcaster", broadcaster)
+    yield broadcaster
+    broadcaster.close()
+
+
+@pytest.fixture
+async def monitor(db_session):
+    """Create the monitor whose failures the feed reports."""
+    monitor = Monitor(name="api", url="https://api.example.com")
+    db_session.add(monitor)
+    await db_session.commit()
+    return monitor
+
+
+async def pending(subscription) -> list:
+    """Events a subscription can read without waiting."""
+    events = []
+    while subscription._queue or subscription._reset:
+        events.append(await subscription.get())
+    return events
+
+
+@pytest.mark.asyncio
+async def test_events_fan_out_to_every_subscriber(broadcaster):
+    """Test that a published event reaches every subscriber."""
+    first = broadcaster.subscribe()
+    second = broadcaster.subscribe()
+    event = broadcaster.publish("incident.created", {"id": 1})
+
+    assert [e.id for e in await pending(first)] == [event.id]
+    assert await pending(second) == [event]
+    assert json.loads(event.json()) == {
+        "id": event.id, "event": "incident.created", "data": {"id": 1}
+    }
+    assert event.sse() == (
+        f"id: {event.id}\nevent: incident.created\ndata: " + '{"id":1}\n\n'
+    ).encode()
+
+    first.close()
+    assert await first.get() is None
+    assert broadcaster.stats()["subscribers"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest_and_is_reset(broadcaster):
+    """Test that a full queue drops its oldest events and sends a reset."""
+    subscription = broadcaster.subscribe()
+    events = [broadcaster.publish("incident.created", {"id": i}) for i in range(6)]
+
+    received = await pending(subscription)
+    assert received[0].type == "reset"
+    assert json.loads(received[0].data) == {"reason": "dropped"}
+    # The reset's id resumes right before the oldest event still queued
+    assert received[0].id == events[1].id
+    assert received[1:] == events[2:]
+    assert broadcaster.stats()["dropped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_resume_after_last_event_id(broadcaster):
+    """Test that subscribers resume after a known event id and reset otherwise."""
+    events = [broadcaster.publish("incident.created", {"id": i}) for i in range(3)]
+
+    assert await pending(broadcaster.subscribe(events[0].id)) == events[1:]
+    assert await pending(broadcaster.subscribe(events[-1].id)) == []
+
+    # Ids no longer in the history, or from another process, are reset
+    for _ in range(10):
+        broadcaster.publish("incident.created", {})
+    for last_event_id in (events[0].id, "0000-1", "garbage"):
+        [reset] = await pending(broadcaster.subscribe(last_event_id))
+        assert reset.type == "reset"
+        assert json.loads(reset.data) == {"reason": "expired"}
+        assert reset.id.endswith(f"-{broadcaster.sequence}")
+
+
+@pytest.mark.asyncio
+async def test_waiting_reader_wakes_on_publish(broadcaster):
+    """Test that a waiting reader wakes on publish and on close."""
+    subscription = broadcaster.subscribe()
+    reader = asyncio.create_task(subscription.get())
+    await asyncio.sleep(0)
+    event = broadcaster.publish("alert.created", {"id": 7})
+    assert await asyncio.wait_for(reader, 1) == event
+
+    reader = asyncio.create_task(subscription.get())
+    await asyncio.sleep(0)
+    broadcaster.close()
+    assert await asyncio.wait_for(reader, 1) is None
+
+
+@pytest.mark.asyncio
+async def test_services_publish_after_commit(db_session, monitor, monkeypatch):
+    """Test that incident and alert writes publish their events after commit."""
+    broadcaster = Broadcaster()
+    monkeypatch.setattr(feed_service, "_broadcaster", broadcaster)
+    subscription = broadcaster.subscribe()
+    opened = await simulate_failure(db_session, monitor.id, "timeout")
+    await resolve_incident(db_session, opened["incident_id"])
+
+    monkeypatch.setattr(settings, "INCIDENT_DEDUP_ENABLED", True)
+    await simulate_failures_bulk(db_session, [(monitor.id, "500", None)] * 3)
+    await simulate_failure(db_session, monitor.id, "500")
+
+    events = [(e.type, json.loads(e.data)) for e in await pending(subscription)]
+    assert [type for type, _ in events] == [
+        "incident.created",
+        "alert.created",
+        "incident.resolved",
+        "incident.created",
+        "alert.created",
+        "incident.updated",
+    ]
+    assert events[0][1]["id"] == opened["incident_id"]
+    assert events[1][1]["payload"]["failure_type"] == "timeout"
+    assert events[3][1]["occurrences"] == 3
+    assert events[5][1]["occurrences"] == 4
+
+
+async def read_sse(path: str, headers: list, chunks: int) -> list[bytes]:
+    """Call the app for a streamed response and disconnect after ``chunks``."""
+    body: list[bytes] = []
+    enough = asyncio.Event()
+
+    async def receive():
+        await enough.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200
+            assert (b"content-type", b"text/event-stream; charset=utf-8") in (
+                message["headers"]
+            )
+        elif message.get("body"):
+            body.append(message["body"])
+            if len(body) >= chunks:
+                enough.set()
+
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": headers,
+        "client": ("127.0.0.1", 1),
+        "server": ("test", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), 5)
+    return body
+
+
+@pytest.mark.asyncio
+async def test_sse_endpoint_streams_and_resumes(broadcaster, monkeypatch):
+    """Test that the SSE endpoint streams events and resumes from Last-Event-ID."""
+    monkeypatch.setattr(settings, "FEED_KEEPALIVE_SECONDS", 0.01)
+    first = broadcaster.publish("incident.created", {"id": 1})
+    second = broadcaster.publish("incident.resolved", {"id": 1})
+
+    body = await read_sse(
+        "/incidents/stream", [(b"last-event-id", first.id.encode())], 3
+    )
+    assert body[:3] == [b": connected\n\n", second.sse(), b": keepalive\n\n"]
+
+    body = await read_sse(f"/incidents/stream?last_event_id={first.id}", [], 2)
+    assert body[1] == second.sse()
+    # Disconnected streams unsubscribe
+    assert len(broadcaster) == 0
+
+
+def test_websocket_endpoint_replays_events(broadcaster):
+    """Test that the WebSocket endpoint replays events after last_event_id."""
+    first = broadcaster.publish("incident.created", {"id": 1})
+    second = broadcaster.publish("alert.created", {"id": 2})
+
+    client = TestClient(app)
+    with client.websocket_connect(f"/incidents/ws?last_event_id={first.id}") as ws:
+        assert ws.receive_json() == {
+            "id": second.id, "event": "alert.created", "data": {"id": 2}
+        }
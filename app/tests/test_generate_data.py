@@ -0,0 +1,142 @@
+"""Test suite for the synthetic data generator."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+from app.commands.generate_data import GenerateOptions, generate_data
+from app.models.alert import Alert
+from app.models.incident import Incident
+from app.models.incident_rollup import IncidentRollup
+from app.models.monitor import Monitor
+from app.services.stats_service import rebuild_incident_rollups
+
+END = datetime(2024, 6, 1)
+
+
+async def snapshot(session: AsyncSession) -> tuple:
+    incidents = (await session.execute(
+        select(
+            Incident.id, Incident.monitor_id, Incident.error_type, Incident.status,
+            Incident.started_at, Incident.resolved_at, Incident.last_alerted_at,
+        ).order_by(Incident.id)
+    )).all()
+    alerts = (await session.execute(
+        select(Alert.incident_id, Alert.created_at, Alert.payload).order_by(Alert.id)
+    )).all()
+    return incidents, alerts
+
+
+async def rollups(session: AsyncSession) -> list:
+    result = await session.execute(
+        select(
+            IncidentRollup.monitor_id,
+            IncidentRollup.error_type,
+            IncidentRollup.bucket_start,
+            IncidentRollup.opened,
+            IncidentRollup.resolved,
+            IncidentRollup.resolution_seconds,
+        ).order_by(
+            IncidentRollup.monitor_id,
+            IncidentRollup.error_type,
+            IncidentRollup.bucket_start,
+        )
+    )
+    return [tuple(row) for row in result]
+
+
+async def recreate_tables(engine) -> None:
+    """Empty the test database, so generated ids start from 1 again."""
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+
+@pytest.mark.asyncio
+async def test_counts_and_distributions(db_session):
+    """Test that the requested counts are generated with realistic distributions."""
+    options = GenerateOptions(
+        monitors=30, incidents=3_000, alerts=7_500, days=7, seed=1,
+        chunk_size=500, end=END,
+    )
+    result = await generate_data(db_session, options)
+    incidents, alerts = await snapshot(db_session)
+    monitors = await db_session.scalar(select(func.count()).select_from(Monitor))
+
+    assert (result.monitors, result.incidents, result.alerts) == (30, 3_000, 7_500)
+    assert (monitors, len(incidents), len(alerts)) == (30, 3_000, 7_500)
+
+    # Ids follow time, inside the requested range
+    starts = [row.started_at for row in incidents]
+    assert starts == sorted(starts)
+    assert starts[0] >= datetime(2024, 5, 25) and starts[-1] <= END
+
+    # Every incident alerts; open ones are exactly those still running
+    assert {alert.incident_id for alert in alerts} == {row.id for row in incidents}
+    assert sum(row.status == "open" for row in incidents) == result.open_incidents
+    assert all(
+        (row.status == "open") == (row.resolved_at is None) for row in incidents
+    )
+    assert all(row.resolved_at > row.started_at for row in incidents if row.resolved_at)
+
+    types = {}
+    for row in incidents:
+        types[row.error_type] = types.get(row.error_type, 0) + 1
+    assert set(types) == {"timeout", "500", "502", "503", "latency", "dns"}
+    assert types["timeout"] > types["dns"]
+
+    # Payloads look like the ones simulated failures produce
+    payload = alerts[0].payload
+    assert payload["incident_id"] == alerts[0].incident_id
+    assert payload["message"].startswith(f"Monitor '{payload['monitor_name']}'")
+
+
+@pytest.mark.asyncio
+async def test_same_seed_same_data(engine, session_factory):
+    """Test that the same seed generates the same data and another seed does not."""
+    options = GenerateOptions(monitors=5, incidents=400, alerts=300, seed=7, end=END)
+    snapshots = []
+    for seed in (7, 7, 8):
+        await recreate_tables(engine)
+        async with session_factory() as session:
+            await generate_data(
+                session, GenerateOptions(**{**options.__dict__, "seed": seed})
+            )
+            snapshots.append(await snapshot(session))
+    assert snapshots[0] == snapshots[1]
+    assert snapshots[0] != snapshots[2]
+    # Fewer alerts than incidents: some incidents go without
+    assert len({alert.incident_id for alert in snapshots[0][1]}) == 300
+
+
+@pytest.mark.asyncio
+async def test_appends_and_keeps_rollups_consistent(db_session):
+    """Test that a second run appends and keeps the rollups consistent."""
+    first = await generate_data(
+        db_session, GenerateOptions(monitors=4, incidents=200, alerts=200, end=END)
+    )
+    second = await generate_data(
+        db_session,
+        GenerateOptions(monitors=3, incidents=100, alerts=150, seed=1, end=END),
+    )
+    assert (first.first_monitor_id, first.first_incident_id) == (1, 1)
+    assert (second.first_monitor_id, second.first_incident_id) == (5, 201)
+    incidents, _ = await snapshot(db_session)
+    assert {row.monitor_id for row in incidents[200:]} <= {5, 6, 7}
+
+    generated = await rollups(db_session)
+    await rebuild_incident_rollups(db_session)
+    assert generated == await rollups(db_session)
+
+
+@pytest.mark.asyncio
+async def test_rejects_impossible_options(db_session):
+    """Test that options without monitors or incidents are rejected."""
+    with pytest.raises(ValueError):
+        await generate_data(db_session, GenerateOptions(monitors=0, incidents=1))
+    with pytest.raises(ValueError):
+        await generate_data(
+            db_session, GenerateOptions(monitors=1, incidents=0, alerts=1)
+        )
@@ -0,0 +1,81 @@
+"""Test suite for the off-loop password hashing service."""
+import asyncio
+import time
+
+import pytest
+from passlib.context import CryptContext
+
+from app.models.user import User
+from app.services import auth_service, hashing_service
+from app.services.hashing_service import PasswordHasher
+
+
+@pytest.fixture
+def hasher(monkeypatch):
+    """Low-cost hasher installed as the application hasher."""
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5)
+    hasher = PasswordHasher(context, max_workers=2)
+    monkeypatch.setattr(hashing_service, "_hasher", hasher)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_while_hashing():
+    """Test that the event loop keeps running while bcrypt hashes off-loop."""
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=11)
+    hasher = PasswordHasher(context, max_workers=1)
+    gaps = []
+
+    async def ticker():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    try:
+        hashes = await asyncio.gather(*(hasher.hash(f"pw{i}") for i in range(4)))
+    finally:
+        task.cancel()
+        hasher.shutdown()
+
+    assert len(set(hashes)) == 4
+    # Each bcrypt call takes tens of ms; the loop kept ticking meanwhile
+    assert len(gaps) > 4
+    assert max(gaps) < 0.08
+    assert hasher.max_queue_depth == 3
+    assert hasher.stats()["completed"] == 4
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_outdated_hash(db_session, hasher):
+    """Test that logging in rehashes a password stored with outdated rounds."""
+    old_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    db_session.add(
+        User(email="old@example.com", hashed_password=old_context.hash("secret"))
+    )
+    await db_session.commit()
+
+    user = await auth_service.authenticate_user(db_session, "old@example.com", "secret")
+    assert user is not None
+    assert user.hashed_password.startswith("$2b$05$")
+    assert hasher.rehashed == 1
+
+    # Already current: verified without another upgrade
+    assert await auth_service.authenticate_user(db_session, "old@example.com", "secret")
+    assert hasher.rehashed == 1
+    assert await auth_service.authenticate_user(db_session, "old@example.com", "wrong") is None
+
+
+@pytest.mark.asyncio
+async def test_unknown_user_still_pays_for_a_verify(db_session, hasher):
+    """Test that an unknown email still costs one bcrypt verify."""
+    assert await auth_service.authenticate_user(db_session, "ghost@example.com", "pw") is None
+    # One hash for the lazily built dummy, one verify against it
+    assert hasher.completed == 2
+
+    assert await auth_service.authenticate_user(db_session, "ghost@example.com", "pw") is None
+    assert hasher.completed == 3
@@ -0,0 +1,247 @@
+"""Test suite for alert storm suppression."""
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database
+from app.core.clock import VirtualClock, use_clock
+from app.core.config import settings
+from app.core.database import WriteQueue
+from app.models.alert import Alert
+from app.models.incident import Incident
+from app.models.monitor import Monitor
+from app.services import incident_index
+from app.services.incident_index import OpenIncident, OpenIncidentIndex
+from app.services.incident_service import resolve_incident
+from app.services.simulation_service import simulate_failure, simulate_failures_bulk
+
+
+@pytest.fixture(autouse=True)
+async def monitors(session_factory):
+    """Create the two monitors failures are simulated on."""
+    async with session_factory() as session:
+        session.add_all([
+            Monitor(name="api", url="https://api.example.com"),
+            Monitor(name="web", url="https://web.example.com"),
+        ])
+        await session.commit()
+
+
+@pytest.fixture
+def dedup(monkeypatch):
+    """Enable coalescing with a five-minute alert rate limit."""
+    monkeypatch.setattr(settings, "INCIDENT_DEDUP_ENABLED", True)
+    monkeypatch.setattr(settings, "ALERT_RATE_LIMIT_SECONDS", 300.0)
+
+
+@pytest.fixture
+def statements(engine):
+    """Record the SQL statements sent to the database."""
+    sent: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement.lstrip())
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield sent
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def loaded_index():
+    """Load an empty open incident index for the test."""
+    index = incident_index.OpenIncidentIndex()
+    incident_index._index = index
+    yield index
+    incident_index.unload_open_incident_index()
+
+
+async def count(session: AsyncSession, model) -> int:
+    """Number of rows of ``model``."""
+    return (await session.execute(select(func.count()).select_from(model))).scalar()
+
+
+def test_index_put_get_discard():
+    """Test that index entries are stored per monitor and error type."""
+    index = OpenIncidentIndex()
+    index.put(1, "timeout", OpenIncident(10))
+    index.put(1, "500", OpenIncident(11))
+    index.put(2, "timeout", OpenIncident(12))
+    assert len(index) == 3
+    assert index.get(1, "timeout").incident_id == 10
+    assert index.get(3, "timeout") is None
+
+    # Discarding a different incident leaves a newer entry in place
+    index.discard(1, "timeout", incident_id=99)
+    assert index.get(1, "timeout").incident_id == 10
+    index.discard(1, "timeout", incident_id=10)
+    assert index.get(1, "timeout") is None
+
+    index.discard_monitor(1)
+    assert len(index) == 1
+
+
+@pytest.mark.asyncio
+async def test_repeated_failures_coalesce(db_session, dedup):
+    """Test that repeated failures of one kind bump a single open incident."""
+    first = await simulate_failure(db_session, 1, "timeout", 120)
+    second = await simulate_failure(db_session, 1, "timeout")
+    third = await simulate_failure(db_session, 1, "timeout")
+    other_type = await simulate_failure(db_session, 1, "500")
+    other_monitor = await simulate_failure(db_session, 2, "timeout")
+
+    assert (first["coalesced"], first["occurrences"]) == (False, 1)
+    assert first["alert_id"] is not None
+    assert (third["coalesced"], third["occurrences"]) == (True, 3)
+    assert third["incident_id"] == second["incident_id"] == first["incident_id"]
+    # Inside the rate-limit window, coalesced failures do not alert
+    assert second["alert_id"] is None and third["alert_id"] is None
+    incident_ids = {r["incident_id"] for r in (first, other_type, other_monitor)}
+    assert len(incident_ids) == 3
+
+    assert await count(db_session, Incident) == 3
+    assert await count(db_session, Alert) == 3
+    incident = await db_session.get(Incident, first["incident_id"])
+    await db_session.refresh(incident)
+    assert incident.occurrences == 3
+    assert incident.last_seen_at > incident.started_at
+
+    # Once resolved, the next failure opens a fresh incident
+    await resolve_incident(db_session, first["incident_id"])
+    reopened = await simulate_failure(db_session, 1, "timeout")
+    assert not reopened["coalesced"]
+    assert reopened["incident_id"] != first["incident_id"]
+
+
+@pytest.mark.asyncio
+async def test_alerts_are_rate_limited_per_incident(db_session, dedup, monkeypatch):
+    """Test that a coalesced incident alerts again only after the rate limit."""
+    monkeypatch.setattr(settings, "ALERT_RATE_LIMIT_SECONDS", 0.0)
+    results = [await simulate_failure(db_session, 1, "timeout") for _ in range(3)]
+
+    # With no window every occurrence alerts and reports the running count
+    assert [r["payload"]["occurrences"] for r in results] == [1, 2, 3]
+    assert await count(db_session, Alert) == 3
+
+    monkeypatch.setattr(settings, "ALERT_RATE_LIMIT_SECONDS", 300.0)
+    quiet = await simulate_failure(db_session, 1, "timeout")
+    assert quiet["alert_id"] is None
+    assert quiet["occurrences"] == 4
+
+
+@pytest.mark.asyncio
+async def test_bulk_storm_collapses_to_one_incident(db_session, dedup, statements):
+    """Test that a bulk failure storm opens one incident per monitor and type."""
+    storm = [(1, "timeout", None)] * 500 + [(1, "500", 80), (3, "timeout", None)]
+    results = await simulate_failures_bulk(db_session, storm)
+
+    assert await count(db_session, Incident) == 2
+    assert await count(db_session, Alert) == 2
+    assert [r["coalesced"] for r in results[:3]] == [False, True, True]
+    assert {r["incident_id"] for r in results[:500]} == {results[0]["incident_id"]}
+    assert results[0]["occurrences"] == 500
+    assert results[0]["alert_id"] is not None and results[1]["alert_id"] is None
+    assert results[500]["payload"]["latency_ms"] == 80
+    assert results[501]["success"] is False
+
+    # A second storm only updates the open incidents
+    statements.clear()
+    results = await simulate_failures_bulk(db_session, [(1, "timeout", None)] * 200)
+    inserts = ("INSERT INTO incident", "INSERT INTO alert")
+    assert not [s for s in statements if s.startswith(inserts)]
+    assert all(r["coalesced"] for r in results)
+    assert results[0]["occurrences"] == 700
+    assert await count(db_session, Incident) == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_without_dedup_opens_one_incident_per_failure(db_session):
+    """Test that without dedup every bulk failure opens its own incident."""
+    results = await simulate_failures_bulk(db_session, [(1, "timeout", None)] * 3)
+    assert len({r["incident_id"] for r in results}) == 3
+    assert len({r["alert_id"] for r in results}) == 3
+    assert not any(r["coalesced"] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_loaded_index_skips_the_lookup(db_session, dedup, statements):
+    """Test that an index hit skips the open incident query."""
+    first = await simulate_failure(db_session, 1, "timeout")
+    await incident_index.load_open_incident_index(db_session)
+    try:
+        statements.clear()
+        second = await simulate_failure(db_session, 1, "timeout")
+        assert second["incident_id"] == first["incident_id"]
+        assert not [
+            s for s in statements if s.startswith("SELECT") and "FROM incident" in s
+        ]
+
+        # An entry whose incident was closed behind the index's back is
+        # detected by the guarded UPDATE and replaced
+        await db_session.execute(
+            update(Incident)
+            .where(Incident.id == first["incident_id"])
+            .values(status="resolved")
+        )
+        await db_session.commit()
+        third = await simulate_failure(db_session, 1, "timeout")
+        assert not third["coalesced"]
+        index = incident_index.get_open_incident_index()
+        assert index.get(1, "timeout").incident_id == third["incident_id"]
+    finally:
+        incident_index.unload_open_incident_index()
+
+
+@pytest.mark.asyncio
+async def test_index_misses_fall_back_to_the_database(
+    db_session, session_factory, dedup, loaded_index
+):
+    """Test that open incidents missing from the index are found in SQLite."""
+    # Another process opened the incident
+    async with session_factory() as other:
+        other.add(Incident(monitor_id=1, error_type="timeout", status="open"))
+        await other.commit()
+
+    result = await simulate_failure(db_session, 1, "timeout")
+    assert result["coalesced"] is True
+    assert result["incident_id"] == 1
+    assert result["occurrences"] == 2
+    assert loaded_index.get(1, "timeout").incident_id == 1
+    assert await count(db_session, Incident) == 1
+
+
+@pytest.mark.asyncio
+async def test_index_changes_wait_for_the_commit(
+    db_session, session_factory, dedup, loaded_index, monkeypatch
+):
+    """Test that a rolled-back batch leaves the index alone, so its retry alerts."""
+    clock = VirtualClock(datetime(2024, 1, 1))
+    with use_clock(clock):
+        first = await simulate_failure(db_session, 1, "timeout")
+        clock.advance(600)
+
+        queue = WriteQueue(session_factory, max_batch=10, max_delay=0.05)
+        monkeypatch.setattr(database, "_write_queue", queue)
+        queue.start()
+
+        async def broken(session: AsyncSession) -> None:
+            raise ValueError("bad write")
+
+        # The failure's write stamps the incident as alerted, then the
+        # broken write after it fails the batch and both are retried
+        task = asyncio.create_task(simulate_failure(db_session, 1, "timeout"))
+        while not queue._pending:
+            await asyncio.sleep(0)
+        with pytest.raises(ValueError):
+            await queue.submit(broken)
+        second = await task
+        await queue.stop()
+
+    assert second["coalesced"] is True
+    assert second["incident_id"] == first["incident_id"]
+    assert second["alert_id"] is not None
+    assert await count(db_session, Alert) == 2
+    assert loaded_index.get(1, "timeout").last_alerted_at == clock.now()
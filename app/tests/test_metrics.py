@@ -0,0 +1,142 @@
+"""Test suite for the metrics registry and /metrics endpoint."""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app.core.database import _instrument
+from app.core.metrics import (
+    ALERTS_CREATED,
+    DB_CHECKOUT_SECONDS,
+    DB_STATEMENT_SECONDS,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    INCIDENTS_CREATED,
+    INCIDENTS_RESOLVED,
+    MetricsMiddleware,
+    MetricsRegistry,
+    statement_kind,
+)
+
+
+@pytest.fixture
+def instrumented(engine):
+    """Time the test engine's statements under the ``test`` engine label."""
+    _instrument(engine, "test")
+    return engine
+
+
+def test_text_exposition_format():
+    """Test that metrics render in the Prometheus text format."""
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("path",))
+    latency = registry.histogram(
+        "latency_seconds", "Latency.", buckets=(0.1, 1.0)
+    )
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{path="/a\\"b"} 3.0',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1.0"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 3.65",
+        "latency_seconds_count 4",
+    ]
+
+    with pytest.raises(ValueError):
+        requests.labels("/a", "extra")
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Again.")
+
+
+def test_statement_kind():
+    """Test that statements are labelled by their leading keyword."""
+    assert statement_kind("SELECT 1") == "SELECT"
+    assert statement_kind("\n  insert INTO alert VALUES (?)") == "INSERT"
+    assert statement_kind("VACUUM") == "other"
+    assert statement_kind("") == "other"
+
+
+@pytest.mark.asyncio
+async def test_requests_are_counted_per_route_template(client):
+    """Test that requests are counted per route template, not per path."""
+    await client.get("/monitors/12345")
+    await client.get("/monitors/67890")
+    await client.get("/no-such-page")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert HTTP_REQUESTS.labels("GET", "/monitors/{monitor_id}", "404").value >= 2
+    assert (
+        'apipulse_http_requests_total{method="GET",'
+        'route="/monitors/{monitor_id}",status="404"}'
+    ) in body
+    assert 'route="unmatched",status="404"' in body
+    assert "/monitors/12345" not in body
+    assert 'apipulse_http_request_duration_seconds_bucket{method="GET",' in body
+
+
+@pytest.mark.asyncio
+async def test_domain_counters_and_sql_timings(instrumented, client, db_session):
+    """Test that services count incidents and alerts and SQL is timed."""
+    created = INCIDENTS_CREATED.labels().value
+    resolved = INCIDENTS_RESOLVED.labels().value
+    alerts = ALERTS_CREATED.labels().value
+    selects = sum(DB_STATEMENT_SECONDS.labels("test", "SELECT").counts)
+    checkouts = sum(DB_CHECKOUT_SECONDS.labels().counts)
+
+    monitor = await client.post(
+        "/monitors", json={"name": "api", "url": "https://example.com"}
+    )
+    failure = await client.post(
+        f"/monitors/{monitor.json()['id']}/simulate-failure",
+        json={"failure_type": "timeout"},
+    )
+    await client.post(f"/incidents/{failure.json()['incident_id']}/resolve", json={})
+    await db_session.execute(text("SELECT 1"))
+    await db_session.commit()
+
+    assert INCIDENTS_CREATED.labels().value == created + 1
+    assert INCIDENTS_RESOLVED.labels().value == resolved + 1
+    assert ALERTS_CREATED.labels().value == alerts + 1
+    assert sum(DB_STATEMENT_SECONDS.labels("test", "SELECT").counts) > selects
+    assert sum(DB_CHECKOUT_SECONDS.labels().counts) > checkouts
+
+
+@pytest.mark.asyncio
+async def test_event_streams_are_counted_but_not_timed():
+    """Test that event stream responses are counted but kept out of latency."""
+    async def app(scope, receive, send):
+        scope["route"] = SimpleNamespace(path=scope["path"])
+        content_type = (
+            b"text/event-stream; charset=utf-8" if scope["path"] == "/stream"
+            else b"application/json"
+        )
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", content_type)],
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = MetricsMiddleware(app)
+    for path in ("/stream", "/plain"):
+        scope = {"type": "http", "method": "PATCH", "path": path}
+        await middleware(scope, None, send)
+
+    assert HTTP_REQUESTS.labels("PATCH", "/stream", "200").value == 1
+    assert sum(HTTP_REQUEST_SECONDS.labels("PATCH", "/stream").counts) == 0
+    assert sum(HTTP_REQUEST_SECONDS.labels("PATCH", "/plain").counts) == 1
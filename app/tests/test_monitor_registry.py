@@ -0,0 +1,173 @@
+"""Test suite for the in-process monitor registry."""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.core.versions import bump_version
+from app.models.monitor import Monitor
+from app.schemas.monitor import MonitorCreate, MonitorUpdate
+from app.services import monitor_registry
+from app.services.monitor_registry import MonitorRecord, MonitorRegistry
+from app.services.monitor_service import (
+    create_monitor,
+    delete_monitor,
+    get_monitor,
+    get_monitors,
+    list_monitors,
+    update_monitor,
+)
+from app.services.simulation_service import simulate_failure
+
+
+def record(monitor_id: int, name: str = "api") -> MonitorRecord:
+    """Build a monitor record."""
+    return MonitorRecord(
+        id=monitor_id,
+        name=name,
+        url="https://example.com",
+        expected_status_code=200,
+        check_interval=60,
+        is_active=True,
+        created_at=datetime(2024, 1, 1),
+    )
+
+
+@pytest.fixture
+def monitor_selects(engine):
+    """Count SELECTs against the monitor table."""
+    counter = {"count": 0}
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM monitor" in statement:
+            counter["count"] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    yield counter
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+
+@pytest.fixture(autouse=True)
+def unload_registry():
+    """Drop any registry a test loaded."""
+    yield
+    monitor_registry.unload_monitor_registry()
+
+
+def test_snapshots_are_versioned_and_immutable():
+    """Test that writes swap in new snapshots and leave old ones untouched."""
+    registry = MonitorRegistry([record(2), record(1)])
+    before = registry.snapshot
+    assert [m.id for m in registry.values()] == [1, 2]
+
+    registry.put(record(1, name="renamed"))
+    registry.put(record(3))
+    registry.remove(2)
+
+    assert before.version == 0
+    assert before.monitors[1].name == "api"
+    assert 3 not in before.monitors
+    assert registry.version == 3
+    assert [m.id for m in registry.values()] == [1, 3]
+    assert registry.get(1).name == "renamed"
+    with pytest.raises(TypeError):
+        registry.snapshot.monitors[4] = record(4)
+
+
+def test_put_many_swaps_one_snapshot():
+    """Test that put_many applies a batch, in any id order, as one write."""
+    registry = MonitorRegistry([record(2), record(5)])
+
+    registry.put_many([record(4), record(1), record(2, name="renamed"), record(7)])
+
+    assert registry.version == 1
+    assert [m.id for m in registry.values()] == [1, 2, 4, 5, 7]
+    assert registry.get(2).name == "renamed"
+
+
+def test_records_are_compact():
+    """Test that records use slots rather than a per-instance dict."""
+    assert not hasattr(record(1), "__dict__")
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_from_registry(db_session, monitor_selects):
+    """Test that reads of loaded monitors never query the monitor table."""
+    existing = await create_monitor(
+        db_session, MonitorCreate(name="existing", url="https://example.com")
+    )
+    registry = await monitor_registry.load_monitor_registry(db_session)
+    assert len(registry) == 1
+    monitor_selects["count"] = 0
+
+    # Write-through on create, update and delete
+    created = await create_monitor(
+        db_session, MonitorCreate(name="created", url="https://example.org")
+    )
+    await update_monitor(db_session, existing.id, MonitorUpdate(name="updated"))
+    assert (await get_monitor(db_session, existing.id)).name == "updated"
+    assert [m.name for m in await list_monitors(db_session)] == ["updated", "created"]
+
+    result = await simulate_failure(db_session, created.id, "timeout")
+    assert result["monitor_name"] == "created"
+
+    assert await delete_monitor(db_session, created.id)
+
+    # Only the refresh after each create/update read the monitor table
+    assert monitor_selects["count"] == 2
+
+    # Unknown ids are looked up in the database every time
+    assert await get_monitor(db_session, created.id) is None
+    assert not await delete_monitor(db_session, created.id)
+    assert (await simulate_failure(db_session, created.id, "timeout"))["success"] is False
+    assert monitor_selects["count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_monitors_written_elsewhere_are_found(
+    db_session, session_factory, monitor_selects
+):
+    """Test that monitors written by another process are read from the database."""
+    first = await create_monitor(
+        db_session, MonitorCreate(name="first", url="https://example.com")
+    )
+    registry = await monitor_registry.load_monitor_registry(db_session)
+
+    # Another worker or a command-line tool writes its own monitors
+    async with session_factory() as other:
+        other.add_all([
+            Monitor(name="other", url="https://example.org"),
+            Monitor(name="another", url="https://example.net"),
+        ])
+        await bump_version(other, "monitor")
+        await other.commit()
+
+    assert (await get_monitor(db_session, 3)).name == "another"
+    assert (await get_monitor(db_session, 2)).name == "other"
+    assert [m.id for m in registry.values()] == [1, 2, 3]
+    monitor_selects["count"] = 0
+    assert (await get_monitor(db_session, 2)).name == "other"
+    assert monitor_selects["count"] == 0
+
+    assert (await get_monitors(db_session, [first.id, 3, 99])).keys() == {first.id, 3}
+    assert monitor_selects["count"] == 1
+
+    # A bulk lookup adds what it finds in a single registry write
+    async with session_factory() as other:
+        other.add_all(
+            Monitor(name=f"bulk-{i}", url="https://example.com") for i in range(5)
+        )
+        await bump_version(other, "monitor")
+        await other.commit()
+    version = registry.version
+    assert len(await get_monitors(db_session, range(1, 9))) == 8
+    assert registry.version == version + 1
+    assert [m.id for m in registry.values()] == list(range(1, 9))
+
+    # The table version moved, so the next listing reloads once
+    assert [m.name for m in await list_monitors(db_session)] == [
+        "first", "other", "another", *(f"bulk-{i}" for i in range(5))
+    ]
+    selects = monitor_selects["count"]
+    await list_monitors(db_session)
+    assert monitor_selects["count"] == selects
@@ -0,0 +1,114 @@
+"""Test suite for the probe executor."""
+import asyncio
+
+import pytest
+
+from app.services.probe_service import DNSCache, ProbeExecutor
+from app.services.scheduler_service import ProbeTarget
+
+
+@pytest.mark.asyncio
+async def test_check_reuses_pooled_connections(stub_server):
+    """Test that sequential checks against one host share a connection."""
+    url, stats = await stub_server()
+    executor = ProbeExecutor()
+    
+    results = [
+        await executor.check(ProbeTarget(1, url, 200, 60)) for _ in range(20)
+    ]
+    await executor.aclose()
+    
+    assert all(r.healthy for r in results)
+    assert stats["connections"] == 1
+    assert results[0].reused_connection is False
+    assert results[0].connect_ms is not None
+    assert all(r.reused_connection for r in results[1:])
+    assert executor.reuse_rate == pytest.approx(19 / 20)
+    assert all(r.ttfb_ms is not None and r.ttfb_ms <= r.total_ms for r in results)
+
+
+@pytest.mark.asyncio
+async def test_check_reports_unexpected_status(stub_server):
+    """Test that a status mismatch yields an unhealthy result."""
+    url, _ = await stub_server(status_code=503)
+    executor = ProbeExecutor()
+    
+    result = await executor.check(ProbeTarget(1, url, 200, 60))
+    await executor.aclose()
+    
+    assert result.healthy is False
+    assert result.status_code == 503
+    assert executor.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_check_enforces_hard_timeout(stub_server):
+    """Test that a slow host is cut off at the timeout."""
+    url, _ = await stub_server(delay=1.0)
+    executor = ProbeExecutor(timeout=0.1)
+    
+    result = await executor.check(ProbeTarget(1, url, 200, 60))
+    await executor.aclose()
+    
+    assert result.healthy is False
+    assert result.error == "timeout"
+    assert result.total_ms < 500
+
+
+@pytest.mark.asyncio
+async def test_per_host_concurrency_limit(stub_server):
+    """Test that concurrent checks to one host never exceed the per-host cap."""
+    url, stats = await stub_server(delay=0.05)
+    executor = ProbeExecutor(max_connections_per_host=3)
+    
+    results = await asyncio.gather(
+        *(executor.check(ProbeTarget(i, url, 200, 60)) for i in range(12))
+    )
+    await executor.aclose()
+    
+    assert all(r.healthy for r in results)
+    assert stats["connections"] <= 3
+
+
+@pytest.mark.asyncio
+async def test_dns_cache_resolves_once():
+    """Test that repeated lookups are served from the cache."""
+    cache = DNSCache(ttl=60)
+    
+    addresses = await asyncio.gather(
+        *(cache.resolve("localhost", 80) for _ in range(10))
+    )
+    
+    assert len(set(addresses)) == 1
+    assert cache.misses == 1
+    assert cache.hits == 9
+
+
+@pytest.mark.asyncio
+async def test_dns_cache_cancelled_lookup_releases_waiters(monkeypatch):
+    """Test that waiters on a cancelled lookup retry it instead of failing."""
+    loop = asyncio.get_running_loop()
+    calls = []
+    
+    async def getaddrinfo(host, port, **kwargs):
+        calls.append(host)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+        return [(None, None, None, "", ("192.0.2.1", port))]
+    
+    monkeypatch.setattr(loop, "getaddrinfo", getaddrinfo)
+    cache = DNSCache(ttl=60)
+    owner = asyncio.create_task(cache.resolve("example.com", 80))
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(cache.resolve("example.com", 80)) for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    
+    owner.cancel()
+    addresses = await asyncio.wait_for(asyncio.gather(*waiters), timeout=1)
+    
+    assert owner.cancelled()
+    assert addresses == ["192.0.2.1"] * 3
+    # The first waiter to retry looks the host up again for the others
+    assert len(calls) == 2
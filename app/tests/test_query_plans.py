@@ -0,0 +1,203 @@
+"""Query plan regression suite.
+
+Runs each service-layer query against a seeded SQLite database, captures
+the SQL it actually sends and checks ``EXPLAIN QUERY PLAN`` for full table
+scans and temporary sorts.
+"""
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from app.core.database import ensure_indexes
+from app.models.monitor import Monitor
+from app.models.user import User
+from app.services import (
+    alert_service,
+    auth_service,
+    dispatch_service,
+    incident_service,
+    monitor_service,
+    simulation_service,
+    stats_service,
+    uptime_service,
+)
+from app.services.incident_index import OpenIncident
+from app.services.scheduler_service import ProbeScheduler
+
+FULL_SCAN = re.compile(r"^SCAN \w+$")
+TEMP_SORT = "USE TEMP B-TREE"
+PLANNED = re.compile(r"^\s*(SELECT|UPDATE|DELETE)\b", re.IGNORECASE)
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """Plan against a file database, as the application runs."""
+    return f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}"
+
+
+@pytest.fixture(autouse=True)
+async def seeded(engine, session_factory):
+    """Create the indexes and enough rows for the planner to use them."""
+    async with engine.begin() as conn:
+        await conn.run_sync(ensure_indexes)
+
+    async with session_factory() as session:
+        session.add(User(email="plans@example.com", hashed_password="x"))
+        session.add_all(
+            Monitor(name=f"monitor-{i}", url=f"https://{i}.example.com")
+            for i in range(20)
+        )
+        await session.commit()
+        failures = [
+            (1 + i % 20, ("timeout", "500", "latency")[i % 3], None)
+            for i in range(600)
+        ]
+        await simulation_service.simulate_failures_bulk(session, failures)
+        await dispatch_service.enqueue_alerts(session, range(1, 601), ["ops", "pager"])
+        await session.commit()
+        for incident_id in range(1, 200, 3):
+            await incident_service.resolve_incident(session, incident_id)
+
+
+async def capture(engine, session_factory, call) -> list[tuple[str, tuple]]:
+    """Run ``call(session)`` and return the SELECT/UPDATE/DELETE it executed."""
+    statements: list[tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if PLANNED.match(statement) and not executemany:
+            statements.append((statement, tuple(parameters or ())))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with session_factory() as session:
+            await call(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    return statements
+
+
+async def plan(engine, statement: str, parameters: tuple) -> list[str]:
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        )
+        return [row[3] for row in result]
+
+
+async def consume(stream) -> None:
+    async for _ in stream:
+        pass
+
+
+NOW = datetime.utcnow()
+
+INDEXED_QUERIES = {
+    "get_user_by_email": lambda s: auth_service.get_user_by_email(s, "plans@example.com"),
+    "get_monitor": lambda s: monitor_service.get_monitor(s, 3),
+    "delete_monitor": lambda s: monitor_service.delete_monitor(s, 20),
+    "get_incident": lambda s: incident_service.get_incident(s, 5),
+    "get_alert": lambda s: alert_service.get_alert(s, 5),
+    "resolve_incident": lambda s: incident_service.resolve_incident(s, 500),
+    "list_incidents": lambda s: incident_service.list_incidents(s, limit=101),
+    "list_incidents_by_monitor": lambda s: incident_service.list_incidents(
+        s, monitor_id=4, limit=101
+    ),
+    "list_incidents_by_status": lambda s: incident_service.list_incidents(
+        s, status="open", limit=101
+    ),
+    "list_incidents_by_monitor_and_status": lambda s: incident_service.list_incidents(
+        s, monitor_id=4, status="resolved", limit=101
+    ),
+    "list_incidents_by_time_range": lambda s: incident_service.list_incidents(
+        s, started_after=NOW - timedelta(days=1), started_before=NOW, limit=101
+    ),
+    "list_incidents_after_cursor": lambda s: incident_service.list_incidents(
+        s, monitor_id=4, after=(NOW, 1000), limit=101
+    ),
+    "list_incident_rows": lambda s: incident_service.list_incident_rows(
+        s, ["id", "status"], monitor_id=4, limit=101
+    ),
+    "simulate_failures_bulk": lambda s: simulation_service.simulate_failures_bulk(
+        s, [(1, "timeout", None), (2, "500", None)]
+    ),
+    "uptime_reports": lambda s: uptime_service.get_uptime_reports(
+        s, [1, 2, 3], start=NOW - timedelta(days=7), end=NOW - timedelta(seconds=1)
+    ),
+    "list_incident_buckets": lambda s: stats_service.list_incident_buckets(
+        s, start=NOW - timedelta(days=1)
+    ),
+    "list_incident_buckets_by_monitor": lambda s: stats_service.list_incident_buckets(
+        s, monitor_id=4
+    ),
+    "summarize_incidents": lambda s: stats_service.summarize_incidents(s),
+    "summarize_incidents_by_monitor": lambda s: stats_service.summarize_incidents(
+        s, monitor_id=4
+    ),
+    "find_open_incidents": lambda s: simulation_service._find_open_incidents(
+        s, [(4, "timeout"), (5, "500")]
+    ),
+    "coalesce_failure": lambda s: simulation_service._coalesce(
+        s, (4, "timeout"), OpenIncident(4), 1, NOW, True
+    ),
+    "claim_outbox_batch": lambda s: dispatch_service.AlertDispatcher(
+        lambda: s, {"ops": "http://unused"}, None
+    )._claim("ops"),
+}
+
+# Queries that intentionally read a whole (small or bounded) table
+FULL_READS = {
+    "list_monitors": lambda s: monitor_service.list_monitors(s),
+    "list_alerts": lambda s: alert_service.list_alerts(s),
+    "list_alert_rows": lambda s: alert_service.list_alert_rows(
+        s, ["id", "incident_id", "created_at"]
+    ),
+    "stream_alert_rows": lambda s: consume(alert_service.stream_alert_rows(s)),
+    "create_test_alert": lambda s: alert_service.create_test_alert(s),
+    "scheduler_load": lambda s: ProbeScheduler(lambda target: None).load(s),
+    "rebuild_incident_rollups": lambda s: stats_service.rebuild_incident_rollups(s),
+    "summarize_outbox": lambda s: dispatch_service.summarize_outbox(s),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", sorted(INDEXED_QUERIES))
+async def test_query_uses_indexes(engine, session_factory, name):
+    """Test that the query is served from an index rather than a full scan."""
+    statements = await capture(engine, session_factory, INDEXED_QUERIES[name])
+    assert statements, f"{name} issued no queries"
+
+    for statement, parameters in statements:
+        details = await plan(engine, statement, parameters)
+        scans = [d for d in details if FULL_SCAN.match(d) or TEMP_SORT in d]
+        assert not scans, f"{name}: {scans} in plan for\n{statement}"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", sorted(FULL_READS))
+async def test_full_reads_avoid_temp_sorts(engine, session_factory, name):
+    """Test that reads of whole tables never sort in a temporary B-tree."""
+    statements = await capture(engine, session_factory, FULL_READS[name])
+    assert statements, f"{name} issued no queries"
+
+    for statement, parameters in statements:
+        details = await plan(engine, statement, parameters)
+        sorts = [d for d in details if TEMP_SORT in d]
+        assert not sorts, f"{name}: {sorts} in plan for\n{statement}"
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_is_idempotent(engine):
+    """Test that ensure_indexes can rerun and recreates a dropped index."""
+    async with engine.begin() as conn:
+        await conn.run_sync(ensure_indexes)
+        await conn.execute(text("DROP INDEX ix_incident_monitor_id_started_at"))
+        await conn.run_sync(ensure_indexes)
+        result = await conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index'")
+        )
+        names = set(result.scalars())
+    assert "ix_incident_monitor_id_started_at" in names
+    assert "ix_incident_monitor_id_status_started_at" in names
+    assert "ix_alert_incident_id_created_at" in names
@@ -0,0 +1,295 @@
+"""Test suite for the failure scenario engine."""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import WriteQueue
+from app.models.alert import Alert
+from app.models.incident import Incident
+from app.models.incident_rollup import IncidentRollup
+from app.models.monitor import Monitor
+from app.schemas.scenario import ScenarioDefinition, ScenarioPhase
+from app.services import scenario_service
+from app.services.scenario_service import (
+    _cascade_waves,
+    apply_scenario,
+    compute_timeline,
+)
+from app.services.simulation_service import simulate_failure
+from app.services.stats_service import rebuild_incident_rollups
+
+START = datetime(2024, 6, 1)
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """Use a database file, so the write queue's sessions share the data."""
+    return f"sqlite+aiosqlite:///{tmp_path / 'scenarios.db'}"
+
+
+@pytest.fixture(autouse=True)
+async def monitors(session_factory):
+    """Create the 20 monitors scenarios pick from."""
+    async with session_factory() as session:
+        session.add_all(
+            Monitor(name=f"api-{i}", url=f"https://{i}.example.com")
+            for i in range(20)
+        )
+        await session.commit()
+
+
+async def incidents(session: AsyncSession) -> list:
+    result = await session.execute(
+        select(
+            Incident.id, Incident.monitor_id, Incident.error_type,
+            Incident.status, Incident.started_at, Incident.resolved_at,
+        ).order_by(Incident.id)
+    )
+    return result.all()
+
+
+async def rollups(session: AsyncSession) -> list:
+    result = await session.execute(
+        select(
+            IncidentRollup.monitor_id,
+            IncidentRollup.error_type,
+            IncidentRollup.bucket_start,
+            IncidentRollup.opened,
+            IncidentRollup.resolved,
+            IncidentRollup.resolution_seconds,
+        ).order_by(
+            IncidentRollup.monitor_id,
+            IncidentRollup.error_type,
+            IncidentRollup.bucket_start,
+        )
+    )
+    return [tuple(row) for row in result]
+
+
+@pytest.mark.asyncio
+async def test_outage_hits_fraction_of_monitors(db_session):
+    """Test that an outage hits its fraction of monitors with consistent rollups."""
+    definition = ScenarioDefinition(
+        name="region down",
+        seed=3,
+        start=START,
+        phases=[ScenarioPhase(kind="outage", fraction=0.3, duration_seconds=1800)],
+    )
+    result = await apply_scenario(db_session, definition)
+    rows = await incidents(db_session)
+
+    assert (result.monitors, result.incidents, result.alerts) == (6, 6, 6)
+    assert result.end == START + timedelta(seconds=1800)
+    assert len({row.monitor_id for row in rows}) == 6
+    # No jitter: everything fails and recovers together
+    assert {row.started_at for row in rows} == {START}
+    assert {row.resolved_at for row in rows} == {START + timedelta(seconds=1800)}
+    assert {(row.error_type, row.status) for row in rows} == {("timeout", "resolved")}
+
+    alerts = (
+        await db_session.execute(select(Alert).order_by(Alert.id))
+    ).scalars().all()
+    assert [alert.incident_id for alert in alerts] == [row.id for row in rows]
+    assert alerts[0].payload["failure_type"] == "timeout"
+
+    # Rollups match a rebuild from the incidents table
+    applied = await rollups(db_session)
+    await rebuild_incident_rollups(db_session)
+    assert applied == await rollups(db_session)
+
+
+@pytest.mark.asyncio
+async def test_degradation_fails_monitors_crossing_threshold(db_session):
+    """Test that degradation fails only monitors whose latency crosses the threshold."""
+    phase = dict(kind="degradation", duration_seconds=1000, baseline_latency_ms=0)
+    below = ScenarioDefinition(
+        name="slow", start=START,
+        phases=[ScenarioPhase(
+            **phase, peak_latency_ms=100, threshold_latency_ms=10_000
+        )],
+    )
+    assert (await apply_scenario(db_session, below)).incidents == 0
+
+    above = ScenarioDefinition(
+        name="slow", start=START,
+        phases=[ScenarioPhase(
+            **phase, peak_latency_ms=10_000, threshold_latency_ms=1_000
+        )],
+    )
+    result = await apply_scenario(db_session, above)
+    assert result.incidents == 20
+    rows = await incidents(db_session)
+    # Crossing 10% of a peak that ramps over 1000s takes roughly 100s
+    for row in rows:
+        offset = (row.started_at - START).total_seconds()
+        assert 40 < offset < 250
+        assert row.error_type == "latency"
+    alert = (await db_session.execute(select(Alert).limit(1))).scalar_one()
+    assert alert.payload["latency_ms"] > 1_000
+
+
+def test_cascade_waves_grow_by_spread_factor():
+    """Test that cascade waves grow by the spread factor."""
+    phase = ScenarioPhase(
+        kind="cascade", duration_seconds=600, initial_fraction=0.1, spread_factor=2
+    )
+    waves = _cascade_waves(10, phase)
+    assert waves == [0, 1, 1, 2, 2, 2, 2, 3, 3, 3]
+
+
+@pytest.mark.asyncio
+async def test_timeline_is_deterministic_across_partitions_and_pool(monkeypatch):
+    """Test that a seed yields the same timeline inline, reordered and pooled."""
+    monkeypatch.setattr(scenario_service, "PARTITION_SIZE", 7)
+    definition = ScenarioDefinition(
+        name="mixed",
+        seed=11,
+        phases=[
+            ScenarioPhase(kind="outage", fraction=0.5, duration_seconds=600,
+                          jitter_seconds=30),
+            ScenarioPhase(kind="degradation", duration_seconds=900,
+                          jitter_seconds=10),
+            ScenarioPhase(kind="cascade", start_seconds=300, duration_seconds=600,
+                          initial_fraction=0.05, hop_seconds=45),
+        ],
+    )
+    monitor_ids = list(range(1, 101))
+
+    monkeypatch.setattr(settings, "SCENARIO_PARALLEL_MIN_MONITORS", 10**9)
+    inline = await compute_timeline(definition, monitor_ids)
+    again = await compute_timeline(definition, list(reversed(monitor_ids)))
+    monkeypatch.setattr(settings, "SCENARIO_PARALLEL_MIN_MONITORS", 1)
+    with ProcessPoolExecutor(2, mp_context=get_context("spawn")) as pool:
+        pooled = await compute_timeline(definition, monitor_ids, pool=pool)
+    monkeypatch.setattr(settings, "SCENARIO_PARALLEL_MIN_MONITORS", 10**9)
+    other = await compute_timeline(
+        definition.model_copy(update={"seed": 12}), monitor_ids
+    )
+
+    assert inline == again == pooled
+    assert other != inline
+    assert len(inline[0]) == 50
+    # Cascade monitors fail in waves, one hop apart
+    starts = sorted(inline[2].starts)
+    assert starts[0] == 300 and starts[-1] > 300 + 45
+
+
+@pytest.mark.asyncio
+async def test_running_failures_stay_open_and_future_ones_are_skipped(db_session):
+    """Test that running failures stay open and future ones are not applied."""
+    now = datetime.utcnow()
+    definition = ScenarioDefinition(
+        name="ongoing",
+        start=now - timedelta(seconds=60),
+        phases=[
+            ScenarioPhase(kind="outage", fraction=0.5, duration_seconds=3600),
+            ScenarioPhase(kind="outage", start_seconds=600, duration_seconds=60,
+                          failure_type="503"),
+        ],
+    )
+    result = await apply_scenario(db_session, definition)
+    assert result.phase_incidents == [10, 0]
+    assert result.open_incidents == 10
+    rows = await incidents(db_session)
+    assert all(row.status == "open" and row.resolved_at is None for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_simulate_scenario_endpoint(client, db_session):
+    """Test that the endpoint applies a scenario and validates its definition."""
+    body = {
+        "name": "cascade",
+        "seed": 5,
+        "phases": [{"kind": "cascade", "duration_seconds": 600,
+                    "initial_fraction": 0.1, "hop_seconds": 60}],
+    }
+    first = await client.post("/monitors/simulate-scenario", json=body)
+    assert first.status_code == 201
+    data = first.json()
+    assert data["incidents"] == data["alerts"] == 20
+    assert data["open_incidents"] == 0
+
+    bad = await client.post(
+        "/monitors/simulate-scenario",
+        json={"name": "empty", "phases": []},
+    )
+    assert bad.status_code == 422
+
+    count = await db_session.scalar(select(func.count()).select_from(Incident))
+    assert count == 20
+
+
+@pytest.mark.asyncio
+async def test_writes_go_through_the_queue_in_chunks(
+    db_session, session_factory, monkeypatch
+):
+    """Test that scenario chunks go through the queue alongside other writes."""
+    monkeypatch.setattr(scenario_service, "WRITE_CHUNK_SIZE", 4)
+    queue = WriteQueue(session_factory, max_batch=2, max_delay=0)
+    queue.start()
+    monkeypatch.setattr(database, "_write_queue", queue)
+    definition = ScenarioDefinition(
+        name="region down",
+        start=START,
+        phases=[ScenarioPhase(kind="outage", duration_seconds=1800)],
+    )
+    try:
+        async with session_factory() as other:
+            result, failure = await asyncio.gather(
+                apply_scenario(db_session, definition),
+                simulate_failure(other, 1, "500"),
+            )
+    finally:
+        await queue.stop()
+
+    assert result.incidents == 20
+    assert queue.writes == 6
+    rows = await incidents(db_session)
+    assert len(rows) == 21
+    assert failure["incident_id"] in {row.id for row in rows}
+    # However the writes interleaved, every alert belongs to its own incident
+    monitor_of = {row.id: row.monitor_id for row in rows}
+    alerts = (await db_session.execute(select(Alert))).scalars().all()
+    assert sorted(alert.incident_id for alert in alerts) == sorted(monitor_of)
+    for alert in alerts:
+        assert alert.payload["incident_id"] == alert.incident_id
+        assert alert.payload["monitor_id"] == monitor_of[alert.incident_id]
+
+
+@pytest.mark.asyncio
+async def test_running_failures_coalesce_with_dedup(db_session, monkeypatch):
+    """Test that with dedup, running failures coalesce into open incidents."""
+    monkeypatch.setattr(settings, "INCIDENT_DEDUP_ENABLED", True)
+    opened = await simulate_failure(db_session, 1, "timeout")
+    now = datetime.utcnow()
+    definition = ScenarioDefinition(
+        name="flapping",
+        start=now - timedelta(seconds=60),
+        phases=[
+            ScenarioPhase(kind="outage", duration_seconds=3600),
+            ScenarioPhase(kind="outage", start_seconds=30, duration_seconds=3600),
+        ],
+    )
+    result = await apply_scenario(db_session, definition)
+
+    assert result.phase_incidents == [20, 20]
+    assert (result.incidents, result.open_incidents, result.coalesced) == (19, 19, 21)
+    # The open incident was within its alert rate limit
+    assert result.alerts == 19
+    rows = (await db_session.execute(
+        select(Incident.id, Incident.monitor_id, Incident.occurrences)
+        .where(Incident.status == "open")
+    )).all()
+    assert sorted(row.monitor_id for row in rows) == list(range(1, 21))
+    occurrences = {row.monitor_id: row.occurrences for row in rows}
+    assert occurrences.pop(1) == 3
+    assert set(occurrences.values()) == {2}
+    assert {row.id for row in rows if row.monitor_id == 1} == {opened["incident_id"]}
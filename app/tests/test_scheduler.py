@@ -0,0 +1,77 @@
+"""Test suite for the probe scheduler."""
+import asyncio
+
+import pytest
+
+from app.services.probe_service import ProbeExecutor
+from app.services.scheduler_service import (
+    ProbeScheduler,
+    ProbeTarget,
+    first_run_offset,
+)
+
+
+def test_first_run_offset_is_deterministic_and_spread():
+    """Test that first-run jitter is stable and covers the interval."""
+    offsets = [first_run_offset(monitor_id, 60) for monitor_id in range(1, 6001)]
+    assert offsets == [first_run_offset(monitor_id, 60) for monitor_id in range(1, 6001)]
+    assert all(0 <= offset < 60 for offset in offsets)
+    
+    # No one-second slot should hold much more than its fair share
+    buckets = [0] * 60
+    for offset in offsets:
+        buckets[int(offset)] += 1
+    assert max(buckets) < 2 * len(offsets) / 60
+
+
+@pytest.mark.asyncio
+async def test_scheduler_checks_every_monitor_within_interval(stub_server):
+    """Test that each monitor is probed once per interval under the concurrency cap."""
+    url, _ = await stub_server()
+    executor = ProbeExecutor()
+    probed: list[int] = []
+    in_flight = 0
+    peak = 0
+    
+    async def probe(target: ProbeTarget):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            return await executor.check(target)
+        finally:
+            in_flight -= 1
+            probed.append(target.id)
+    
+    scheduler = ProbeScheduler(probe, max_concurrency=5)
+    for monitor_id in range(1, 51):
+        scheduler.schedule(ProbeTarget(monitor_id, url, 200, 1))
+    scheduler.start()
+    await asyncio.sleep(1.2)
+    await scheduler.stop()
+    await executor.aclose()
+    
+    assert set(probed) == set(range(1, 51))
+    assert peak <= 5
+    assert executor.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_unschedule_drops_monitor():
+    """Test that removed monitors are no longer probed."""
+    probed: list[int] = []
+    
+    async def probe(target: ProbeTarget) -> None:
+        probed.append(target.id)
+    
+    scheduler = ProbeScheduler(probe)
+    scheduler.schedule(ProbeTarget(1, "http://unused", 200, 1))
+    scheduler.schedule(ProbeTarget(2, "http://unused", 200, 1))
+    scheduler.unschedule(2)
+    scheduler.start()
+    await asyncio.sleep(1.1)
+    await scheduler.stop()
+    
+    assert 1 in probed
+    assert 2 not in probed
+    assert len(scheduler) == 1
@@ -0,0 +1,132 @@
+"""Test suite for the virtual clock and the discrete-event simulation."""
+import hashlib
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.commands import run_simulation as run_simulation_module
+from app.commands.run_simulation import SimulationOptions, run_simulation
+from app.core.clock import SystemClock, VirtualClock, get_clock, use_clock, utcnow
+from app.core.config import settings
+from app.models.alert import Alert
+from app.models.incident import Incident
+from app.models.monitor import Monitor
+from app.services.incident_index import get_open_incident_index
+from app.services.incident_service import resolve_incident
+from app.services.monitor_registry import get_monitor_registry
+from app.services.simulation_service import simulate_failure
+
+START = datetime(2024, 3, 1)
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """Use a database file, so simulated runs can be compared byte for byte."""
+    return f"sqlite+aiosqlite:///{tmp_path / 'simulation.db'}"
+
+
+def test_virtual_clock_moves_only_forward():
+    """Test that the virtual clock only moves forward and feeds model defaults."""
+    clock = VirtualClock(START)
+    clock.advance(90)
+    assert clock.now() == START + timedelta(seconds=90)
+    clock.advance_to(START + timedelta(hours=1))
+    with pytest.raises(ValueError):
+        clock.advance_to(START)
+
+    with use_clock(clock):
+        assert utcnow() == START + timedelta(hours=1)
+        # Model defaults read the installed clock
+        assert Monitor(name="api", url="https://example.com").created_at == utcnow()
+    assert isinstance(get_clock(), SystemClock)
+
+
+@pytest.mark.asyncio
+async def test_services_stamp_virtual_time(db_session):
+    """Test that services stamp incidents and alerts with the virtual time."""
+    clock = VirtualClock(START)
+    with use_clock(clock):
+        db_session.add(Monitor(name="api", url="https://example.com"))
+        await db_session.commit()
+        result = await simulate_failure(db_session, 1, "timeout")
+        clock.advance(600)
+        incident = await resolve_incident(db_session, result["incident_id"])
+        alert = await db_session.get(Alert, result["alert_id"])
+
+    assert incident.started_at == alert.created_at == START
+    assert incident.resolved_at == START + timedelta(seconds=600)
+
+
+async def simulate_into(engine, empty: bytes, options: SimulationOptions):
+    """
+    Run a simulation on the test database, reset to the ``empty`` file
+    contents first, and return the result, the incidents and the file's
+    digest.
+    """
+    path = Path(engine.url.database)
+    path.write_bytes(empty)
+    async with engine.connect() as connection:
+        async with AsyncSession(bind=connection, expire_on_commit=False) as session:
+            result = await run_simulation(session, options)
+            incidents = (
+                await session.execute(select(Incident).order_by(Incident.id))
+            ).scalars().all()
+    return result, incidents, hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_same_seed_gives_identical_database(engine, monkeypatch):
+    """Test that the same seed gives a byte-identical database."""
+    monkeypatch.setattr(settings, "ALERT_CHANNELS", {"ops": "http://unused"})
+    empty = Path(engine.url.database).read_bytes()
+    options = SimulationOptions(
+        monitors=5, days=0.25, seed=4, failure_rate=0.002, start=START
+    )
+    first, incidents, digest = await simulate_into(engine, empty, options)
+    second, _, same_digest = await simulate_into(engine, empty, options)
+    _, _, other_digest = await simulate_into(
+        engine, empty, SimulationOptions(**{**options.__dict__, "seed": 5})
+    )
+
+    assert replace(first, elapsed_seconds=0) == replace(second, elapsed_seconds=0)
+    assert digest == same_digest != other_digest
+
+    # Six hours of checks ran, with every timestamp on the virtual timeline
+    assert first.end == START + timedelta(hours=6)
+    assert first.checks > 5 * 6 * 3600 / 300
+    assert first.outages > 0 and first.incidents == len(incidents)
+    # Dedup is on for the run, so each outage has a single incident
+    assert first.incidents == first.outages
+    assert first.failed_checks >= first.incidents
+    for incident in incidents:
+        assert START <= incident.started_at < first.end
+        if incident.resolved_at is not None:
+            assert incident.started_at < incident.resolved_at < first.end
+    assert sum(i.resolved_at is not None for i in incidents) == first.resolved
+
+    # The in-memory lookups it loaded are dropped again
+    assert get_monitor_registry() is None
+    assert get_open_incident_index() is None
+    assert settings.INCIDENT_DEDUP_ENABLED is False
+
+
+@pytest.mark.asyncio
+async def test_failed_simulation_restores_settings_and_lookups(
+    db_session, monkeypatch
+):
+    """Test that a failed simulation restores dedup and unloads its lookups."""
+    async def fail(*args):
+        raise RuntimeError("check failed")
+
+    monkeypatch.setattr(run_simulation_module, "simulate_failure", fail)
+    options = SimulationOptions(monitors=2, failure_rate=1.0, start=START)
+    with pytest.raises(RuntimeError):
+        await run_simulation(db_session, options)
+
+    assert settings.INCIDENT_DEDUP_ENABLED is False
+    assert get_monitor_registry() is None
+    assert get_open_incident_index() is None
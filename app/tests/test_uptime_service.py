@@ -0,0 +1,52 @@
+"""Test suite for the uptime/SLO calculations."""
+from datetime import datetime, timedelta
+
+from app.services.uptime_service import build_report, merge_downtime
+
+START = datetime(2024, 1, 1)
+END = START + timedelta(hours=10)
+
+
+def at(hours: float) -> datetime:
+    """Time ``hours`` after the start of the report window."""
+    return START + timedelta(hours=hours)
+
+
+def test_merge_downtime_unions_overlaps_and_clips_to_window():
+    """Test that overlapping intervals are merged and clipped to the window."""
+    intervals = [
+        (at(-2), at(1)),  # clipped to 1h
+        (at(2), at(4)),
+        (at(3), at(5)),  # overlaps the previous one
+        (at(4.5), at(4.75)),  # contained
+        (at(6), at(6)),  # zero length
+        (at(9), None),  # still open, runs to the window end
+    ]
+    assert merge_downtime(intervals, START, END) == 3600 * (1 + 3 + 1)
+
+
+def test_merge_downtime_empty():
+    """Test that no incidents means no downtime."""
+    assert merge_downtime([], START, END) == 0.0
+
+
+def test_build_report_error_budget_and_mttr():
+    """Test that the report derives uptime, error budget burn and MTTR."""
+    intervals = [(at(1), at(1.5)), (at(2), at(3))]
+    report = build_report(7, intervals, START, END, slo_target=90.0)
+
+    assert report.downtime_seconds == 5400
+    assert report.uptime_percent == 85.0
+    assert report.error_budget_seconds == 3600
+    assert report.error_budget_burn == 1.5
+    assert report.error_budget_remaining_seconds == -1800
+    assert report.mttr_seconds == 2700
+    assert report.incident_count == 2
+
+
+def test_build_report_without_incidents():
+    """Test that a window without incidents reports full uptime and no MTTR."""
+    report = build_report(7, [], START, END, slo_target=99.9)
+    assert report.uptime_percent == 100.0
+    assert report.error_budget_burn == 0.0
+    assert report.mttr_seconds is None
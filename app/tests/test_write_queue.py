@@ -0,0 +1,89 @@
+"""Test suite for the group-commit write queue."""
+import asyncio
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from app.core.database import WriteQueue
+from app.models.monitor import Monitor
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    """Use a throwaway SQLite file so the queue's sessions share data."""
+    return f"sqlite+aiosqlite:///{tmp_path / 'queue.db'}"
+
+
+def add_monitor(name: str):
+    """Build a write operation that inserts one monitor."""
+    async def op(session: AsyncSession) -> Monitor:
+        monitor = Monitor(name=name, url="https://example.com")
+        session.add(monitor)
+        return monitor
+    return op
+
+
+async def count_monitors(session_factory) -> int:
+    async with session_factory() as session:
+        result = await session.execute(select(func.count()).select_from(Monitor))
+        return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_commits(session_factory):
+    """Test that concurrent writers are grouped into a few transactions."""
+    queue = WriteQueue(session_factory, max_batch=50, max_delay=0.01)
+    queue.start()
+    
+    monitors = await asyncio.gather(
+        *(queue.submit(add_monitor(f"monitor-{i}")) for i in range(200))
+    )
+    await queue.stop()
+    
+    assert all(m.id is not None for m in monitors)
+    assert len({m.id for m in monitors}) == 200
+    assert queue.writes == 200
+    assert queue.batches <= 10
+    assert await count_monitors(session_factory) == 200
+
+
+@pytest.mark.asyncio
+async def test_failing_write_only_fails_its_caller(session_factory):
+    """Test that one bad write does not take the rest of its batch down."""
+    queue = WriteQueue(session_factory, max_batch=50, max_delay=0.01)
+    queue.start()
+    
+    async def broken(session: AsyncSession) -> None:
+        raise ValueError("bad write")
+    
+    results = await asyncio.gather(
+        queue.submit(add_monitor("first")),
+        queue.submit(broken),
+        queue.submit(add_monitor("second")),
+        return_exceptions=True,
+    )
+    await queue.stop()
+    
+    assert isinstance(results[1], ValueError)
+    assert results[0].id is not None
+    assert results[2].id is not None
+    assert await count_monitors(session_factory) == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_writes(session_factory):
+    """Test that stopping the queue commits everything already submitted."""
+    queue = WriteQueue(session_factory, max_batch=10, max_delay=1.0)
+    queue.start()
+    
+    pending = [
+        asyncio.create_task(queue.submit(add_monitor(f"monitor-{i}")))
+        for i in range(25)
+    ]
+    await asyncio.sleep(0)
+    await queue.stop()
+    
+    assert all(task.done() for task in pending)
+    assert await count_monitors(session_factory) == 25